@@ -0,0 +1,561 @@
+# Bitboard recursion/bifurcation engine, used once the heuristic approaches can no longer make progress
+
+import numpy as np
+
+from sudoku_indices import get_cell_units, get_peer_indices, get_unit_indices
+
+
+class SudokuBitboardSolver:
+    """ Class that performs the recursion/bifurcation stage of the sudoku solving.
+        Each row, column, and block keeps a single int whose bits mark the values that have already been placed in
+        that unit, so that placing or removing a value is a constant number of bitwise operations instead of the
+        string slicing and searching of the string representation.
+        Bits are in the same MSB order as the candidate list of the heuristic solver, ie 1 is 0b100000000 and 9 is
+        0b000000001, so that the candidate list can be passed in as is.
+
+        Two branching modes are available. 'first' guesses the empty cells in row-major order, while 'mrv' (minimum
+        remaining values) always guesses the cell with the fewest candidates left. For 'mrv', the candidates of each
+        empty cell and the cells grouped by candidate count are kept up to date as values are placed, so picking the
+        next cell does not need a rescan of the board.
+
+        With propagation enabled, naked and hidden singles are re-run after every guess. Each guess works on its own
+        copy of the candidates of every cell (copy-on-branch), so nothing has to be undone when a guess is wrong, and
+        a guess that leaves a cell or a value with nowhere to go is cut off straight away. The branch also carries the
+        candidate count of every cell, and the empty cells grouped by candidate count as one binary number per count
+        (a bit for each cell), both kept up to date as values are placed. 'mrv' then picks the lowest cell of the
+        lowest non-empty group, without looking at the other empty cells. Hidden singles are only looked for in the
+        units that lost candidates since the last pass.
+    """
+
+    def __init__(self):
+        """ Constructor """
+
+        # Board parameters
+        self.rows = 0                           # Number of rows in the board, block_size ** 2 (9 for 9x9)
+        self.cols = 0                           # Number of cols in the board, block_size ** 2 (9 for 9x9)
+        self.block_size = 0                     # Size of each block, 3 for 9x9 (assumes square blocks)
+        self.blocks_across = 0                  # Number of blocks across the board in one direction, 3 for 9x9
+        self.full_mask = 0                      # Binary number with a bit set for every value, 0b111111111 for 9x9
+
+        # Board state, flattened in row-major order so that each cell is a single index
+        self.board = None                       # Value in each cell, 0 for blanks
+        self.candidate_list = None              # Binary representation of the allowed candidates for each cell
+        self.empty_cells = None                 # Indices of the cells to be filled by bifurcation
+        self.is_valid = False                   # False if the givens already break the sudoku constraints
+
+        # Unit lookup for each cell
+        self.cell_row = None                    # Row number of each cell
+        self.cell_col = None                    # Col number of each cell
+        self.cell_block = None                  # Block number of each cell
+
+        # Binary representation of the values already placed in each unit
+        self.row_used = None
+        self.col_used = None
+        self.block_used = None
+
+        # Minimum remaining values containers
+        self.peers = None                       # Indices of the cells sharing a row, column, or block with each cell
+        self.cell_candidates = None             # Binary representation of the candidates left in each empty cell
+        self.candidate_count = None             # Number of candidates left in each empty cell
+        self.count_buckets = None               # Sets of the empty cells with each number of candidates left
+
+        # Propagation containers
+        self.units = None                       # Indices of the cells in each row, column, and block
+        self.cell_unit_masks = None             # Binary number with a bit for the row, column, and block of each cell
+
+        # Search counters of the last solve
+        self.nodes = 0                          # Number of recursion nodes visited
+        self.max_depth = 0                      # Deepest recursion reached, in guesses
+        self.guesses = 0                        # Number of values tried, including the ones cut off by propagation
+
+        # Solved board state
+        self.solution = None
+
+    def load_board(self, game_board, candidate_list=None, block_size=3):
+        """ Load the sudoku puzzle board and set up the bitboards for each unit
+            :param game_board: The sudoku board state, with 0's as blanks [2D list of ints]
+            :param candidate_list: Binary representation of candidates for each cell. Every value is allowed in every
+                                   blank cell if None [2D numpy array of int]
+            :param block_size: Size of a block, assuming square blocks [int]
+            :return: None
+        """
+
+        # Board should be 2D
+        game_board = np.asarray(game_board)
+        self.rows, self.cols = game_board.shape
+        self.block_size = block_size
+        self.blocks_across = self.rows // self.block_size
+        self.full_mask = (1 << self.rows) - 1
+
+        self.peers = get_peer_indices(self.block_size)
+        self.units = get_unit_indices(self.block_size)
+        self.cell_unit_masks = [(1 << row) | (1 << col) | (1 << block)
+                                for row, col, block in get_cell_units(self.block_size)]
+
+        self.board = [int(value) for value in game_board.flat]
+        if candidate_list is None:
+            self.candidate_list = [self.full_mask] * (self.rows * self.cols)
+        else:
+            self.candidate_list = [int(candidates) for candidates in np.asarray(candidate_list).flat]
+
+        self.cell_row = [cell // self.cols for cell in range(self.rows * self.cols)]
+        self.cell_col = [cell % self.cols for cell in range(self.rows * self.cols)]
+        self.cell_block = [self.blocks_across * (row // self.block_size) + (col // self.block_size)
+                           for row, col in zip(self.cell_row, self.cell_col)]
+
+        self.row_used = [0] * self.rows
+        self.col_used = [0] * self.cols
+        self.block_used = [0] * self.rows
+        self.empty_cells = []
+        self.is_valid = True
+
+        # Mark the givens as used in their units. A repeated value means that the board can never be solved
+        for cell, value in enumerate(self.board):
+            if value == 0:
+                self.empty_cells.append(cell)
+                continue
+            bit = 1 << (self.rows - value)
+            if (self.row_used[self.cell_row[cell]] | self.col_used[self.cell_col[cell]] |
+                    self.block_used[self.cell_block[cell]]) & bit:
+                self.is_valid = False
+            self.place_value(cell, bit)
+
+    def place_value(self, cell, bit):
+        """ Marks the value with binary representation bit as used in the row, column, and block of cell
+            :param cell: The flattened index of the cell [int]
+            :param bit: The binary representation of the value [int]
+            :return: None
+        """
+        self.row_used[self.cell_row[cell]] |= bit
+        self.col_used[self.cell_col[cell]] |= bit
+        self.block_used[self.cell_block[cell]] |= bit
+
+    def remove_value(self, cell, bit):
+        """ Marks the value with binary representation bit as no longer used in the row, column, and block of cell
+            :param cell: The flattened index of the cell [int]
+            :param bit: The binary representation of the value [int]
+            :return: None
+        """
+        self.row_used[self.cell_row[cell]] ^= bit
+        self.col_used[self.cell_col[cell]] ^= bit
+        self.block_used[self.cell_block[cell]] ^= bit
+
+    def recursive_solve(self, k):
+        """ Guesses every remaining candidate of the kth empty cell, and recurses onto the next empty cell
+            :param k: Index into the list of empty cells of the cell to be guessed [int]
+            :return bool: True if the remaining empty cells could all be filled, False otherwise
+        """
+        self.nodes += 1
+        if k > self.max_depth:
+            self.max_depth = k
+
+        # All empty cells have been filled
+        if k == len(self.empty_cells):
+            return True
+
+        cell = self.empty_cells[k]
+        row, col, block = self.cell_row[cell], self.cell_col[cell], self.cell_block[cell]
+
+        # Candidates of this cell that have not yet been placed in its row, column, or block
+        available = self.candidate_list[cell] & ~(self.row_used[row] | self.col_used[col] | self.block_used[block])
+        while available:
+            bit = available & -available
+            available ^= bit
+            self.guesses += 1
+
+            self.row_used[row] |= bit
+            self.col_used[col] |= bit
+            self.block_used[block] |= bit
+            if self.recursive_solve(k + 1):
+                self.board[cell] = self.rows - bit.bit_length() + 1
+                return True
+            self.row_used[row] ^= bit
+            self.col_used[col] ^= bit
+            self.block_used[block] ^= bit
+
+        return False
+
+###################################################################################################
+###################################################################################################
+###################################################################################################
+
+    def get_remaining_candidates(self):
+        """ Sets up the candidates left in each empty cell and groups the empty cells by their candidate count
+            :return: None
+        """
+        self.cell_candidates = [0] * len(self.board)
+        self.candidate_count = [0] * len(self.board)
+        self.count_buckets = [set() for _ in range(self.rows + 1)]
+
+        for cell in self.empty_cells:
+            used = (self.row_used[self.cell_row[cell]] | self.col_used[self.cell_col[cell]] |
+                    self.block_used[self.cell_block[cell]])
+            self.cell_candidates[cell] = self.candidate_list[cell] & ~used
+            self.candidate_count[cell] = bin(self.cell_candidates[cell]).count("1")
+            self.count_buckets[self.candidate_count[cell]].add(cell)
+
+    def place_guess(self, cell, bit):
+        """ Places the value with binary representation bit into the cell, and removes it from the candidates of the
+            empty peers of the cell, moving them down to their new candidate count
+            :param cell: The flattened index of the cell [int]
+            :param bit: The binary representation of the value [int]
+            :return eliminated: The peers that had the value removed from their candidates [list of int]
+        """
+        self.board[cell] = self.rows - bit.bit_length() + 1
+        self.count_buckets[self.candidate_count[cell]].discard(cell)
+
+        eliminated = []
+        for peer in self.peers[cell]:
+            if self.board[peer] == 0 and self.cell_candidates[peer] & bit:
+                count = self.candidate_count[peer]
+                self.cell_candidates[peer] ^= bit
+                self.candidate_count[peer] = count - 1
+                self.count_buckets[count].discard(peer)
+                self.count_buckets[count - 1].add(peer)
+                eliminated.append(peer)
+        return eliminated
+
+    def remove_guess(self, cell, bit, eliminated):
+        """ Undoes place_guess, returning the value to the candidates of the peers it was removed from
+            :param cell: The flattened index of the cell [int]
+            :param bit: The binary representation of the value [int]
+            :param eliminated: The peers that had the value removed from their candidates [list of int]
+            :return: None
+        """
+        for peer in eliminated:
+            count = self.candidate_count[peer]
+            self.cell_candidates[peer] |= bit
+            self.candidate_count[peer] = count + 1
+            self.count_buckets[count].discard(peer)
+            self.count_buckets[count + 1].add(peer)
+
+        self.board[cell] = 0
+        self.count_buckets[self.candidate_count[cell]].add(cell)
+
+    def mrv_recursive_solve(self, depth=0):
+        """ Guesses every remaining candidate of the empty cell with the fewest candidates left, and recurses
+            :param depth: Number of guesses made so far [int]
+            :return bool: True if the remaining empty cells could all be filled, False otherwise
+        """
+        self.nodes += 1
+        if depth > self.max_depth:
+            self.max_depth = depth
+
+        # Find the smallest candidate count that still has empty cells. If there are none, the board is filled
+        for count, bucket in enumerate(self.count_buckets):
+            if bucket:
+                break
+        else:
+            return True
+
+        # An empty cell with no candidates left means that an earlier guess was wrong
+        if count == 0:
+            return False
+
+        cell = next(iter(bucket))
+        available = self.cell_candidates[cell]
+        while available:
+            bit = available & -available
+            available ^= bit
+            self.guesses += 1
+
+            eliminated = self.place_guess(cell, bit)
+            if self.mrv_recursive_solve(depth + 1):
+                return True
+            self.remove_guess(cell, bit, eliminated)
+
+        return False
+
+###################################################################################################
+###################################################################################################
+###################################################################################################
+
+    def assign(self, placed, candidates, counts, buckets, cell, bit, singles):
+        """ Places the value with binary representation bit into the cell of a branch, and removes it from the
+            candidates of the peers of the cell
+            :param placed: Binary representation of the value placed in each cell of the branch, 0 if empty [list]
+            :param candidates: Binary representation of the candidates left in each cell of the branch [list]
+            :param counts: Number of candidates left in each cell of the branch, rows + 1 once placed [list of int]
+            :param buckets: For each candidate count, a bit for each empty cell of the branch with that count [list]
+            :param cell: The flattened index of the cell [int]
+            :param bit: The binary representation of the value [int]
+            :param singles: Cells that are left with a single candidate are appended here [list of int]
+            :return touched: A bit for each unit of the cell and of the peers that lost the value, with the numbering of
+                             get_unit_indices, or 0 if a peer is left without any candidates [int]
+        """
+        placed[cell] = bit
+        candidates[cell] = 0
+        buckets[counts[cell]] ^= 1 << cell
+        counts[cell] = self.rows + 1
+        touched = self.cell_unit_masks[cell]
+        for peer in self.peers[cell]:
+            if candidates[peer] & bit:
+                candidates[peer] ^= bit
+                count = counts[peer] - 1
+                counts[peer] = count
+                if count == 0:
+                    return 0
+                buckets[count + 1] ^= 1 << peer
+                buckets[count] |= 1 << peer
+                touched |= self.cell_unit_masks[peer]
+                if count == 1:
+                    singles.append(peer)
+        return touched
+
+    def propagate(self, placed, candidates, counts, buckets, singles, touched):
+        """ Places naked singles and hidden singles in a branch until neither can be found anymore
+            :param placed: Binary representation of the value placed in each cell of the branch, 0 if empty [list]
+            :param candidates: Binary representation of the candidates left in each cell of the branch [list]
+            :param counts: Number of candidates left in each cell of the branch, rows + 1 once placed [list of int]
+            :param buckets: For each candidate count, a bit for each empty cell of the branch with that count [list]
+            :param singles: Cells that may have been left with a single candidate [list of int]
+            :param touched: A bit for each unit that lost candidates since it was last checked for hidden singles [int]
+            :return bool: False if the branch breaks the sudoku constraints, True otherwise
+        """
+        while True:
+
+            # Naked singles: cells with a single candidate left
+            while singles:
+                cell = singles.pop()
+                if counts[cell] != 1:
+                    continue
+                assigned = self.assign(placed, candidates, counts, buckets, cell, candidates[cell], singles)
+                if not assigned:
+                    return False
+                touched |= assigned
+
+            # Hidden singles: values with a single cell left in a unit, only in the units touched since the last pass
+            units, touched = touched, 0
+            while units:
+                unit_bit = units & -units
+                units ^= unit_bit
+                unit = self.units[unit_bit.bit_length() - 1]
+                once = 0
+                twice = 0
+                used = 0
+                for cell in unit:
+                    used |= placed[cell]
+                    twice |= once & candidates[cell]
+                    once |= candidates[cell]
+
+                # A value that can not go anywhere in the unit means that an earlier guess was wrong
+                if once | used != self.full_mask:
+                    return False
+
+                hidden = once & ~twice & ~used
+                while hidden:
+                    bit = hidden & -hidden
+                    hidden ^= bit
+                    for cell in unit:
+                        if candidates[cell] & bit:
+                            assigned = self.assign(placed, candidates, counts, buckets, cell, bit, singles)
+                            if not assigned:
+                                return False
+                            touched |= assigned
+                            break
+
+            if not singles and not touched:
+                return True
+
+    def get_branching_cell(self, placed, buckets, branching):
+        """ Finds the cell of a branch to guess next
+            :param placed: Binary representation of the value placed in each cell of the branch, 0 if empty [list]
+            :param buckets: For each candidate count, a bit for each empty cell of the branch with that count [list]
+            :param branching: 'first' for the first empty cell, or 'mrv' for the one with the fewest candidates left
+                              [string]
+            :return best: The flattened index of the cell, -1 if every cell is filled [int]
+        """
+        if branching == "first":
+            for cell in self.empty_cells:
+                if not placed[cell]:
+                    return cell
+            return -1
+
+        # The lowest cell of the lowest non-empty bucket, as the cells with no candidates cut the branch off in assign
+        for count in range(1, self.rows + 1):
+            bucket = buckets[count]
+            if bucket:
+                return (bucket & -bucket).bit_length() - 1
+        return -1
+
+    def propagate_recursive_solve(self, placed, candidates, counts, buckets, branching, depth=0):
+        """ Guesses every remaining candidate of an empty cell, each on a copy of the branch, and propagates the
+            singles of each guess before recursing
+            :param placed: Binary representation of the value placed in each cell of the branch, 0 if empty [list]
+            :param candidates: Binary representation of the candidates left in each cell of the branch [list]
+            :param counts: Number of candidates left in each cell of the branch, rows + 1 once placed [list of int]
+            :param buckets: For each candidate count, a bit for each empty cell of the branch with that count [list]
+            :param branching: Order in which the empty cells are guessed, 'first' or 'mrv' [string]
+            :param depth: Number of guesses made so far [int]
+            :return placed: The filled in branch if a solution was found, None otherwise [list of int]
+        """
+        self.nodes += 1
+        if depth > self.max_depth:
+            self.max_depth = depth
+
+        # All empty cells have been filled
+        best = self.get_branching_cell(placed, buckets, branching)
+        if best == -1:
+            return placed
+
+        available = candidates[best]
+        while available:
+            bit = available & -available
+            available ^= bit
+            self.guesses += 1
+
+            branch_placed = placed[:]
+            branch_candidates = candidates[:]
+            branch_counts = counts[:]
+            branch_buckets = buckets[:]
+            singles = []
+            touched = self.assign(branch_placed, branch_candidates, branch_counts, branch_buckets, best, bit, singles)
+            if touched and self.propagate(branch_placed, branch_candidates, branch_counts, branch_buckets, singles,
+                                          touched):
+                solved = self.propagate_recursive_solve(branch_placed, branch_candidates, branch_counts, branch_buckets,
+                                                        branching, depth + 1)
+                if solved is not None:
+                    return solved
+
+        return None
+
+    def get_root_branch(self):
+        """ Sets up the placed values and the candidates left in each empty cell of the loaded board, and propagates
+            its singles
+            :return placed: Binary representation of the value placed in each cell, 0 if empty, or None if the board
+                            breaks the sudoku constraints [list of int]
+            :return candidates: Binary representation of the candidates left in each cell [list of int]
+            :return counts: Number of candidates left in each cell, rows + 1 once placed [list of int]
+            :return buckets: For each candidate count, a bit for each empty cell with that count [list of int]
+        """
+        placed = [0] * len(self.board)
+        candidates = [0] * len(self.board)
+        counts = [self.rows + 1] * len(self.board)
+        buckets = [0] * (self.rows + 1)
+        for cell, value in enumerate(self.board):
+            if value:
+                placed[cell] = 1 << (self.rows - value)
+            else:
+                used = (self.row_used[self.cell_row[cell]] | self.col_used[self.cell_col[cell]] |
+                        self.block_used[self.cell_block[cell]])
+                candidates[cell] = self.candidate_list[cell] & ~used
+                counts[cell] = bin(candidates[cell]).count("1")
+                if candidates[cell] == 0:
+                    return None
+                buckets[counts[cell]] |= 1 << cell
+
+        # Every unit is checked for hidden singles on the first pass
+        if not self.propagate(placed, candidates, counts, buckets, list(self.empty_cells), (1 << len(self.units)) - 1):
+            return None
+        return placed, candidates, counts, buckets
+
+    def solve_with_propagation(self, branching):
+        """ Sets up the candidates left in each empty cell, propagates the singles of the loaded board, and then
+            searches with propagation after every guess
+            :param branching: Order in which the empty cells are guessed, 'first' or 'mrv' [string]
+            :return bool: True if a solution was found, False otherwise
+        """
+        branch = self.get_root_branch()
+        if branch is None:
+            return False
+        placed = self.propagate_recursive_solve(*branch, branching)
+        if placed is None:
+            return False
+
+        self.board = [self.rows - bit.bit_length() + 1 for bit in placed]
+        return True
+
+    def propagate_recursive_count(self, placed, candidates, counts, buckets, branching, limit, depth=0):
+        """ Searches a branch like propagate_recursive_solve, but carries on past the first solution to count them
+            :param placed: Binary representation of the value placed in each cell of the branch, 0 if empty [list]
+            :param candidates: Binary representation of the candidates left in each cell of the branch [list]
+            :param counts: Number of candidates left in each cell of the branch, rows + 1 once placed [list of int]
+            :param buckets: For each candidate count, a bit for each empty cell of the branch with that count [list]
+            :param branching: Order in which the empty cells are guessed, 'first' or 'mrv' [string]
+            :param limit: The search stops as soon as this many solutions have been found [int]
+            :param depth: Number of guesses made so far [int]
+            :return count: Number of solutions found in the branch, at most limit [int]
+        """
+        self.nodes += 1
+        if depth > self.max_depth:
+            self.max_depth = depth
+
+        # All empty cells have been filled. Only the first solution is kept
+        best = self.get_branching_cell(placed, buckets, branching)
+        if best == -1:
+            if self.solution is None:
+                self.solution = np.reshape(np.array([self.rows - bit.bit_length() + 1 for bit in placed]),
+                                           (self.rows, self.cols))
+            return 1
+
+        count = 0
+        available = candidates[best]
+        while available and count < limit:
+            bit = available & -available
+            available ^= bit
+            self.guesses += 1
+
+            branch_placed = placed[:]
+            branch_candidates = candidates[:]
+            branch_counts = counts[:]
+            branch_buckets = buckets[:]
+            singles = []
+            touched = self.assign(branch_placed, branch_candidates, branch_counts, branch_buckets, best, bit, singles)
+            if touched and self.propagate(branch_placed, branch_candidates, branch_counts, branch_buckets, singles,
+                                          touched):
+                count += self.propagate_recursive_count(branch_placed, branch_candidates, branch_counts, branch_buckets,
+                                                        branching, limit - count, depth + 1)
+
+        return count
+
+    def solve(self, branching="mrv", propagate=True):
+        """ Fills in all empty cells of the loaded board through recursion/bifurcation
+            :param branching: Order in which the empty cells are guessed, 'first' for row-major order, or 'mrv' for the
+                              cell with the fewest candidates first [string]
+            :param propagate: Whether naked and hidden singles are propagated after every guess [bool]
+            :return bool: True if a solution was found, False otherwise
+        """
+        self.nodes = 0
+        self.max_depth = 0
+        self.guesses = 0
+        if not self.is_valid:
+            return False
+
+        if branching not in ["first", "mrv"]:
+            raise ValueError("Unknown branching mode: " + str(branching))
+
+        if propagate:
+            if not self.solve_with_propagation(branching):
+                return False
+        elif branching == "mrv":
+            self.get_remaining_candidates()
+            if not self.mrv_recursive_solve():
+                return False
+        else:
+            if not self.recursive_solve(0):
+                return False
+        self.solution = np.reshape(np.array(self.board), (self.rows, self.cols))
+        return True
+
+    def count_solutions(self, limit=2, branching="mrv"):
+        """ Counts the solutions of the loaded board, stopping as soon as limit solutions have been found, so that a
+            limit of 2 tells whether the solution is unique. The first solution found is kept in solution.
+            Always searches with propagation after every guess.
+            :param limit: Largest number of solutions to search for [int]
+            :param branching: Order in which the empty cells are guessed, 'first' or 'mrv' [string]
+            :return count: Number of solutions, at most limit [int]
+        """
+        self.nodes = 0
+        self.max_depth = 0
+        self.guesses = 0
+        self.solution = None
+        if not self.is_valid:
+            return 0
+
+        if branching not in ["first", "mrv"]:
+            raise ValueError("Unknown branching mode: " + str(branching))
+
+        branch = self.get_root_branch()
+        if branch is None:
+            return 0
+        return self.propagate_recursive_count(*branch, branching, limit)
@@ -0,0 +1,120 @@
+# Compact board state of the solvers, with one byte per value and the narrowest unsigned int per candidate mask
+
+import numpy as np
+
+from sudoku_io import pack_nibbles, unpack_nibbles
+
+
+def get_candidate_dtype(size=9):
+    """ Gets the narrowest unsigned int that holds a candidate mask, with one bit per value
+        :param size: Number of values, 9 for 9x9 boards [int]
+        :return dtype: uint16 up to 16x16 boards, uint32 up to 32 values, and uint64 past that [numpy dtype]
+    """
+    for dtype in (np.uint16, np.uint32, np.uint64):
+        if size <= np.iinfo(dtype).bits:
+            return np.dtype(dtype)
+    raise ValueError("Boards larger than 64x64 do not fit in a candidate mask")
+
+
+def get_compact_size(block_size=3):
+    """ Gets the number of bytes taken by the state of one board
+        :param block_size: Size of a block, assuming square blocks [int]
+        :return nbytes: 244 for 9x9 boards, the 81 candidate masks of 2 bytes and the 81 values of 1 byte, padded to a
+                        whole number of candidate masks [int]
+    """
+    size = block_size * block_size
+    itemsize = get_candidate_dtype(size).itemsize
+    return -(-size * size * (itemsize + 1) // itemsize) * itemsize
+
+
+class SudokuCompactBoard:
+    """ Class that holds the state of a board in a single buffer: the candidate mask of every cell (see
+        SudokuRecursiveSolver.get_candidate_list), followed by the value of every cell, both in row-major order.
+        A 9x9 board takes 244 bytes, instead of 1296 bytes for a board and candidate list of int64.
+
+        The values and candidates attributes are numpy views into the buffer, so a board can be made from bytes, a
+        bytearray, a memory map, or any other buffer without copying it, and to_bytes gives the whole state as a
+        single bytes object that is cheap to send to another process. The candidate masks come first and the state is
+        padded, so that the masks stay aligned when many boards are laid out one after the other in the same buffer
+        (see from_buffer). Boards made from a read-only buffer, such as bytes, are read-only.
+    """
+
+    def __init__(self, block_size=3, buffer=None, offset=0):
+        """ Constructor, a blank board with no candidates if there is no buffer
+            :param block_size: Size of a block, assuming square blocks [int]
+            :param buffer: Buffer holding the state of the board, not copied [bytes-like object]
+            :param offset: Byte offset of the state of the board in the buffer [int]
+        """
+        self.block_size = block_size            # Size of each block, 3 for 9x9 (assumes square blocks)
+        self.size = block_size * block_size     # Number of rows and cols in the board, 9 for 9x9
+        self.nbytes = get_compact_size(block_size)  # Number of bytes taken by the state of the board
+        candidate_dtype = get_candidate_dtype(self.size)
+
+        if buffer is None:
+            buffer = bytearray(self.nbytes)
+        elif memoryview(buffer).nbytes < offset + self.nbytes:
+            raise ValueError("Buffer of " + str(memoryview(buffer).nbytes) + " bytes is too short for a " +
+                             str(self.size) + "x" + str(self.size) + " board at offset " + str(offset))
+        num_cells = self.size * self.size
+        self.buffer = buffer                    # Buffer holding the state of the board
+        self.candidates = np.frombuffer(buffer, dtype=candidate_dtype, count=num_cells,
+                                        offset=offset).reshape(self.size, self.size)    # Candidate mask of each cell
+        self.values = np.frombuffer(buffer, dtype=np.uint8, count=num_cells, offset=offset +
+                                    num_cells * candidate_dtype.itemsize).reshape(self.size, self.size)  # Cell values
+
+    def __reduce__(self):
+        return self.__class__, (self.block_size, self.to_bytes())
+
+    @classmethod
+    def from_board(cls, board, block_size=3):
+        """ Makes a board with the given values and no candidates
+            :param board: The sudoku board state, with 0's as blanks [2D numpy array of int]
+            :param block_size: Size of a block, assuming square blocks [int]
+            :return compact_board: The board [SudokuCompactBoard]
+        """
+        compact_board = cls(block_size)
+        compact_board.values[:, :] = board
+        return compact_board
+
+    @classmethod
+    def from_buffer(cls, buffer, block_size=3, index=0):
+        """ Makes a board that is a view of the state at the given index of boards laid out one after the other in a
+            buffer, such as a chunk of states sent by another process
+            :param buffer: Buffer holding the states of the boards [bytes-like object]
+            :param block_size: Size of a block, assuming square blocks [int]
+            :param index: Index of the board in the buffer [int]
+            :return compact_board: The board, without copying the buffer [SudokuCompactBoard]
+        """
+        return cls(block_size, buffer, index * get_compact_size(block_size))
+
+    @classmethod
+    def from_packed(cls, packed, block_size=3):
+        """ Makes a board from values packed two to a byte (see sudoku_io.pack_nibbles), with no candidates
+            :param packed: The packed values [bytes-like object]
+            :param block_size: Size of a block, assuming square blocks [int]
+            :return compact_board: The board [SudokuCompactBoard]
+        """
+        size = block_size * block_size
+        packed = np.frombuffer(packed, dtype=np.uint8).reshape(1, -1)
+        return cls.from_board(unpack_nibbles(packed, size * size).reshape(size, size), block_size)
+
+    def to_bytes(self):
+        """ Gets the whole state of the board, to be read back with from_buffer
+            :return state: The candidate masks and values of the board [bytes]
+        """
+        padding = bytes(self.nbytes - self.candidates.nbytes - self.values.nbytes)
+        return self.candidates.tobytes() + self.values.tobytes() + padding
+
+    def to_packed(self):
+        """ Gets the values of the board packed two to a byte, which only fits boards up to 9x9
+            :return packed: The packed values, 41 bytes for a 9x9 board [bytes]
+        """
+        if self.block_size > 3:
+            raise ValueError("Only boards up to 9x9 can be packed as nibbles")
+        return pack_nibbles(self.values.reshape(1, -1)).tobytes()
+
+    def copy(self):
+        """ Copies the board into a buffer of its own, such as to modify a board made from a read-only buffer
+            :return compact_board: The copy [SudokuCompactBoard]
+        """
+        return self.__class__(self.block_size, bytearray(self.to_bytes()))
@@ -0,0 +1,307 @@
+# Exact cover solver using Knuth's Algorithm X with dancing links (DLX)
+
+import numpy as np
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def build_exact_cover_links(block_size=3):
+    """ Builds the dancing links of the exact cover matrix of an empty board. For a 9x9 board, there is a column for
+        each of the 324 constraints (81 cells filled, 9 values in each of the 9 rows, 9 columns, and 9 blocks) and a
+        row for each of the 729 (cell, value) placements, which covers one constraint of each kind.
+        Node 0 is the root, nodes 1 to 324 are the column headers, and the four nodes of each placement follow.
+        :param block_size: Size of a block, assuming square blocks [int]
+        :return links: The left, right, up, down, column, and placement of each node, and the size of each column,
+                       and the first node of each placement [tuple of tuples of int]
+    """
+    size = block_size * block_size
+    num_cells = size * size
+    num_columns = 4 * num_cells
+
+    # Root and column headers, linked into a circular list
+    left = [i - 1 for i in range(num_columns + 1)]
+    right = [i + 1 for i in range(num_columns + 1)]
+    left[0] = num_columns
+    right[num_columns] = 0
+    up = list(range(num_columns + 1))
+    down = list(range(num_columns + 1))
+    column = list(range(num_columns + 1))
+    placement = [-1] * (num_columns + 1)
+    column_size = [0] * (num_columns + 1)
+    first_node = []
+
+    for cell in range(num_cells):
+        row, col = divmod(cell, size)
+        block = block_size * (row // block_size) + (col // block_size)
+        for value in range(size):
+            constraints = (cell, num_cells + row * size + value, 2 * num_cells + col * size + value,
+                           3 * num_cells + block * size + value)
+            start = len(left)
+            first_node.append(start)
+            for k, constraint in enumerate(constraints):
+                node = start + k
+                header = constraint + 1
+
+                # Link horizontally into the circular list of this placement
+                left.append(start + (k - 1) % 4)
+                right.append(start + (k + 1) % 4)
+
+                # Link vertically at the bottom of the column of this constraint
+                up.append(up[header])
+                down.append(header)
+                down[up[header]] = node
+                up[header] = node
+                column.append(header)
+                placement.append(cell * size + value)
+                column_size[header] += 1
+
+    return (tuple(left), tuple(right), tuple(up), tuple(down), tuple(column), tuple(placement), tuple(column_size),
+            tuple(first_node))
+
+
+class SudokuDancingLinksSolver:
+    """ Class that solves the sudoku as an exact cover problem.
+        Each placement of a value into a cell satisfies exactly one cell, row, column, and block constraint, and a
+        solution is a set of placements that satisfies every constraint exactly once. Algorithm X searches for this set
+        by always branching on the constraint with the fewest placements left, and the dancing links make removing and
+        restoring placements during the search cheap.
+    """
+
+    def __init__(self):
+        """ Constructor """
+
+        # Board parameters
+        self.rows = 0                           # Number of rows in the board, block_size ** 2 (9 for 9x9)
+        self.cols = 0                           # Number of cols in the board, block_size ** 2 (9 for 9x9)
+        self.block_size = 0                     # Size of each block, 3 for 9x9 (assumes square blocks)
+
+        # Dancing links of the exact cover matrix, copied from the cached links of an empty board
+        self.left = None
+        self.right = None
+        self.up = None
+        self.down = None
+        self.column = None                      # Column header of each node
+        self.placement = None                   # Placement (cell * size + value - 1) of each node
+        self.column_size = None                 # Number of placements left in each column
+        self.first_node = None                  # First node of each placement
+
+        # Search state
+        self.given_placements = None            # Placements of the values given in the board
+        self.chosen_placements = None           # Placements chosen so far by the search
+        self.is_valid = False                   # False if the givens already break the sudoku constraints
+        self.nodes = 0                          # Number of recursion nodes visited by the last solve
+        self.max_depth = 0                      # Deepest recursion reached by the last solve, in placements
+
+        # Solved board state
+        self.solution = None
+
+    def load_board(self, game_board, block_size=3):
+        """ Load the sudoku puzzle board and remove the constraints satisfied by the givens from the matrix
+            :param game_board: The sudoku board state, with 0's as blanks [2D list of ints]
+            :param block_size: Size of a block, assuming square blocks [int]
+            :return: None
+        """
+
+        # Board should be 2D
+        game_board = np.asarray(game_board)
+        self.rows, self.cols = game_board.shape
+        self.block_size = block_size
+
+        (left, right, up, down, column, placement, column_size,
+         self.first_node) = build_exact_cover_links(self.block_size)
+        self.left = list(left)
+        self.right = list(right)
+        self.up = list(up)
+        self.down = list(down)
+        self.column = column
+        self.placement = placement
+        self.column_size = list(column_size)
+
+        self.given_placements = []
+        self.chosen_placements = []
+        self.is_valid = True
+
+        # Select the placement of every given. If one of its constraints was already covered, a value is repeated
+        covered = set()
+        for cell, value in enumerate(game_board.flat):
+            if value == 0:
+                continue
+            node = self.first_node[cell * self.rows + int(value) - 1]
+            for k in range(4):
+                header = self.column[node + k]
+                if header in covered:
+                    self.is_valid = False
+                    return
+                covered.add(header)
+                self.cover(header)
+            self.given_placements.append(self.placement[node])
+
+    def cover(self, header):
+        """ Removes a column from the header list, and removes every placement in that column from the other columns
+            :param header: The column header node [int]
+            :return: None
+        """
+        left, right, up, down, column, column_size = (self.left, self.right, self.up, self.down, self.column,
+                                                      self.column_size)
+        right[left[header]] = right[header]
+        left[right[header]] = left[header]
+        i = down[header]
+        while i != header:
+            j = right[i]
+            while j != i:
+                down[up[j]] = down[j]
+                up[down[j]] = up[j]
+                column_size[column[j]] -= 1
+                j = right[j]
+            i = down[i]
+
+    def uncover(self, header):
+        """ Undoes cover, restoring the links in the exact reverse order in which they were removed
+            :param header: The column header node [int]
+            :return: None
+        """
+        left, right, up, down, column, column_size = (self.left, self.right, self.up, self.down, self.column,
+                                                      self.column_size)
+        i = up[header]
+        while i != header:
+            j = left[i]
+            while j != i:
+                column_size[column[j]] += 1
+                down[up[j]] = j
+                up[down[j]] = j
+                j = left[j]
+            i = up[i]
+        right[left[header]] = header
+        left[right[header]] = header
+
+    def recursive_solve(self):
+        """ Algorithm X. Picks the constraint with the fewest placements left, and tries each of those placements
+            :return bool: True if every constraint could be covered, False otherwise
+        """
+        right, down, column_size = self.right, self.down, self.column_size
+        self.nodes += 1
+        if len(self.chosen_placements) > self.max_depth:
+            self.max_depth = len(self.chosen_placements)
+
+        # Every constraint is satisfied
+        header = right[0]
+        if header == 0:
+            return True
+
+        # Find the constraint with the fewest placements left
+        best = header
+        best_size = column_size[header]
+        while header != 0 and best_size > 1:
+            header = right[header]
+            if header != 0 and column_size[header] < best_size:
+                best = header
+                best_size = column_size[header]
+        if best_size == 0:
+            return False
+
+        self.cover(best)
+        node = down[best]
+        while node != best:
+            self.chosen_placements.append(self.placement[node])
+            j = right[node]
+            while j != node:
+                self.cover(self.column[j])
+                j = right[j]
+
+            if self.recursive_solve():
+                return True
+
+            j = self.left[node]
+            while j != node:
+                self.uncover(self.column[j])
+                j = self.left[j]
+            self.chosen_placements.pop()
+            node = down[node]
+        self.uncover(best)
+
+        return False
+
+    def solve(self):
+        """ Fills in all empty cells of the loaded board by solving the exact cover problem
+            :return bool: True if a solution was found, False otherwise
+        """
+        self.nodes = 0
+        self.max_depth = 0
+        if not self.is_valid or not self.recursive_solve():
+            return False
+
+        self.solution = self.get_chosen_board()
+        return True
+
+    def get_chosen_board(self):
+        """ Converts the given placements and the placements chosen so far into a board
+            :return board: The board, with 0's for the cells without a placement [2D numpy array of int]
+        """
+        board = [0] * (self.rows * self.cols)
+        for placement in self.given_placements + self.chosen_placements:
+            cell, value = divmod(placement, self.rows)
+            board[cell] = value + 1
+        return np.reshape(np.array(board), (self.rows, self.cols))
+
+    def recursive_count(self, limit):
+        """ Algorithm X like recursive_solve, but carries on past the first solution to count them
+            :param limit: The search stops as soon as this many solutions have been found [int]
+            :return count: Number of solutions found below the current placements, at most limit [int]
+        """
+        right, down, column_size = self.right, self.down, self.column_size
+        self.nodes += 1
+        if len(self.chosen_placements) > self.max_depth:
+            self.max_depth = len(self.chosen_placements)
+
+        # Every constraint is satisfied. Only the first solution is kept
+        header = right[0]
+        if header == 0:
+            if self.solution is None:
+                self.solution = self.get_chosen_board()
+            return 1
+
+        # Find the constraint with the fewest placements left
+        best = header
+        best_size = column_size[header]
+        while header != 0 and best_size > 1:
+            header = right[header]
+            if header != 0 and column_size[header] < best_size:
+                best = header
+                best_size = column_size[header]
+        if best_size == 0:
+            return 0
+
+        count = 0
+        self.cover(best)
+        node = down[best]
+        while node != best and count < limit:
+            self.chosen_placements.append(self.placement[node])
+            j = right[node]
+            while j != node:
+                self.cover(self.column[j])
+                j = right[j]
+
+            count += self.recursive_count(limit - count)
+
+            j = self.left[node]
+            while j != node:
+                self.uncover(self.column[j])
+                j = self.left[j]
+            self.chosen_placements.pop()
+            node = down[node]
+        self.uncover(best)
+
+        return count
+
+    def count_solutions(self, limit=2):
+        """ Counts the solutions of the loaded board, stopping as soon as limit solutions have been found, so that a
+            limit of 2 tells whether the solution is unique. The first solution found is kept in solution.
+            :param limit: Largest number of solutions to search for [int]
+            :return count: Number of solutions, at most limit [int]
+        """
+        self.nodes = 0
+        self.max_depth = 0
+        self.solution = None
+        if not self.is_valid:
+            return 0
+        return self.recursive_count(limit)
@@ -0,0 +1,194 @@
+# Generation of sudoku puzzles with a unique solution, for building reproducible test and benchmark corpora
+
+import numpy as np
+from multiprocessing import Pool, cpu_count
+
+from SudokuRecursiveSolver import SudokuRecursiveSolver
+
+# Generator of each worker process, created once by the pool initializer and reused for every puzzle
+worker_generator = None
+
+
+def init_worker(seed, block_size, backend):
+    """ Creates the generator of a worker process
+        :param seed: Seed of the whole set of puzzles [int]
+        :param block_size: Size of a block, assuming square blocks [int]
+        :param backend: Engine used for the uniqueness checks [string]
+        :return: None
+    """
+    global worker_generator
+    worker_generator = SudokuGenerator(seed, block_size, backend)
+
+
+def generate_indexed(task):
+    """ Generates the puzzle with the given index of the set in a worker process
+        :param task: The index of the puzzle, the target number of clues, and the maximum number of attempts [tuple]
+        :return puzzle: The puzzle, one byte per cell in row-major order [bytes]
+        :return solution: The solution of the puzzle, one byte per cell in row-major order [bytes]
+    """
+    index, target_clues, max_attempts = task
+    puzzle, solution = worker_generator.generate_indexed(index, target_clues, max_attempts)
+    return puzzle.astype(np.uint8).tobytes(), solution.astype(np.uint8).tobytes()
+
+
+class SudokuGenerator:
+    """ Class that generates sudoku puzzles with a unique solution.
+        A random full grid is made by filling the blocks on the diagonal (which do not constrain each other) with
+        random permutations, solving the rest, and then shuffling the values, the rows within each band, the bands, the
+        cols within each stack, and the stacks. Clues are then removed from the grid in a random order, and a removal
+        is only kept if the puzzle still has a unique solution (see SudokuRecursiveSolver.count_solutions), until the
+        target number of clues is reached or no clue can be removed anymore.
+
+        All randomness comes from the seed, so the same seed always gives the same puzzles. The puzzles of
+        generate_many each get their own random stream from the seed and their index in the set, so that the set does
+        not depend on the number of worker processes.
+    """
+
+    def __init__(self, seed=None, block_size=3, backend=None):
+        """ Constructor
+            :param seed: Seed of the random number generator, a random seed if None [int]
+            :param block_size: Size of a block, assuming square blocks [int]
+            :param backend: Engine used for the uniqueness checks, 'bitboard' or 'dlx', or the default of the board
+                            size if None (see SudokuRecursiveSolver.get_default_backend) [string]
+        """
+        self.seed = int(np.random.SeedSequence(seed).entropy)   # Seed of the generator, random if none was given
+        self.rng = np.random.default_rng(self.seed)             # Random stream of generate
+        self.block_size = block_size            # Size of each block, 3 for 9x9 (assumes square blocks)
+        self.size = block_size * block_size     # Number of rows and cols in the board, 9 for 9x9
+        self.backend = backend                  # Engine used for the uniqueness checks
+
+        # The solver is set up once for the board size, and each board is reloaded into it
+        self.solver = SudokuRecursiveSolver()
+        self.solver.load_board(np.zeros((self.size, self.size), dtype=int), self.block_size, self.backend)
+        self.uniqueness_checks = 0              # Number of uniqueness checks run by the generator
+
+    def count_solutions(self, board, limit=2):
+        """ Counts the solutions of a board, stopping once limit solutions have been found
+            :param board: The sudoku board state, with 0's as blanks [2D numpy array of int]
+            :param limit: Largest number of solutions to search for [int]
+            :return count: Number of solutions, at most limit [int]
+        """
+        self.uniqueness_checks += 1
+        self.solver.reload_board(board)
+        return self.solver.count_solutions(limit)
+
+    def generate_solution(self, rng):
+        """ Generates a random full grid
+            :param rng: Random number generator [numpy.random.Generator]
+            :return grid: The full grid [2D numpy array of int]
+        """
+        # The blocks on the diagonal do not share a row or a col, but on small boards they can still leave the rest
+        # of the grid without a solution, in which case they are filled again
+        grid = np.zeros((self.size, self.size), dtype=int)
+        while True:
+            for block in range(self.block_size):
+                rows = slice(block * self.block_size, (block + 1) * self.block_size)
+                grid[rows, rows] = rng.permutation(self.size).reshape(self.block_size, self.block_size) + 1
+            if self.count_solutions(grid, 1) == 1:
+                break
+        grid = self.solver.solution.copy()
+
+        # The solver fills the rest of the grid the same way every time, so the grid is shuffled with changes that
+        # keep it valid: relabelling the values, and reordering the rows and cols within each band and stack, and
+        # the bands and stacks themselves
+        labels = np.concatenate(([0], rng.permutation(self.size) + 1))
+        grid = labels[grid]
+        for axis in range(2):
+            bands = rng.permutation(self.block_size)
+            order = np.concatenate([band * self.block_size + rng.permutation(self.block_size) for band in bands])
+            grid = np.take(grid, order, axis=axis)
+        return grid
+
+    def remove_clues(self, grid, rng, target_clues):
+        """ Removes the clues of a full grid in a random order, while the puzzle keeps a unique solution
+            :param grid: The full grid [2D numpy array of int]
+            :param rng: Random number generator [numpy.random.Generator]
+            :param target_clues: Number of clues at which to stop removing [int]
+            :return puzzle: The puzzle, with 0's as blanks [2D numpy array of int]
+        """
+        puzzle = grid.copy()
+        flat = puzzle.reshape(-1)
+        clues = flat.size
+        for cell in rng.permutation(flat.size):
+            if clues <= target_clues:
+                break
+            value = flat[cell]
+            flat[cell] = 0
+            if self.count_solutions(puzzle) == 1:
+                clues -= 1
+            else:
+                flat[cell] = value
+        return puzzle
+
+    def generate_puzzle(self, rng, target_clues=None, max_attempts=10):
+        """ Generates a puzzle with a unique solution. If the clues of a grid can not be removed down to the target,
+            new grids are tried, and the puzzle with the fewest clues is kept after max_attempts grids
+            :param rng: Random number generator [numpy.random.Generator]
+            :param target_clues: Number of clues to aim for, as few as possible if None [int]
+            :param max_attempts: Maximum number of grids to try to reach the target [int]
+            :return puzzle: The puzzle, with 0's as blanks [2D numpy array of int]
+            :return solution: The solution of the puzzle [2D numpy array of int]
+        """
+        if target_clues is None:
+            target_clues = 0
+        if target_clues > self.size * self.size:
+            raise ValueError("A board of " + str(self.size) + "x" + str(self.size) + " can not have " +
+                             str(target_clues) + " clues")
+        if max_attempts < 1:
+            raise ValueError("There should be at least 1 attempt, not " + str(max_attempts))
+
+        best_puzzle = None
+        best_solution = None
+        for _ in range(max_attempts):
+            solution = self.generate_solution(rng)
+            puzzle = self.remove_clues(solution, rng, target_clues)
+            if best_puzzle is None or np.count_nonzero(puzzle) < np.count_nonzero(best_puzzle):
+                best_puzzle = puzzle
+                best_solution = solution
+            if np.count_nonzero(best_puzzle) <= target_clues or target_clues == 0:
+                break
+        return best_puzzle, best_solution
+
+    def generate(self, target_clues=None, max_attempts=10):
+        """ Generates the next puzzle from the random stream of the generator
+            :param target_clues: Number of clues to aim for, as few as possible if None [int]
+            :param max_attempts: Maximum number of grids to try to reach the target [int]
+            :return puzzle: The puzzle, with 0's as blanks [2D numpy array of int]
+            :return solution: The solution of the puzzle [2D numpy array of int]
+        """
+        return self.generate_puzzle(self.rng, target_clues, max_attempts)
+
+    def generate_indexed(self, index, target_clues=None, max_attempts=10):
+        """ Generates the puzzle with the given index of the set of the seed, which is the same whichever process
+            generates it
+            :param index: Index of the puzzle in the set [int]
+            :param target_clues: Number of clues to aim for, as few as possible if None [int]
+            :param max_attempts: Maximum number of grids to try to reach the target [int]
+            :return puzzle: The puzzle, with 0's as blanks [2D numpy array of int]
+            :return solution: The solution of the puzzle [2D numpy array of int]
+        """
+        rng = np.random.default_rng([self.seed, index])
+        return self.generate_puzzle(rng, target_clues, max_attempts)
+
+    def generate_many(self, count, target_clues=None, max_attempts=10, workers=1, chunk_size=16):
+        """ Generates a set of puzzles, in this process or on a pool of worker processes. The set only depends on the
+            seed, the count, and the targets, so it can be regenerated on any number of workers
+            :param count: Number of puzzles [int]
+            :param target_clues: Number of clues to aim for, as few as possible if None [int]
+            :param max_attempts: Maximum number of grids to try to reach the target [int]
+            :param workers: Number of worker processes, 1 to generate in this process, None for all cores [int]
+            :param chunk_size: Number of puzzles sent to a worker at a time [int]
+            :return: Generator of the puzzle and its solution, in the order of the set [tuple of 2D numpy array]
+        """
+        if workers == 1:
+            for index in range(count):
+                yield self.generate_indexed(index, target_clues, max_attempts)
+            return
+
+        workers = workers if workers is not None else cpu_count()
+        tasks = ((index, target_clues, max_attempts) for index in range(count))
+        shape = (self.size, self.size)
+        with Pool(workers, initializer=init_worker, initargs=(self.seed, self.block_size, self.backend)) as pool:
+            for puzzle, solution in pool.imap(generate_indexed, tasks, chunk_size):
+                yield (np.frombuffer(puzzle, dtype=np.uint8).reshape(shape),
+                       np.frombuffer(solution, dtype=np.uint8).reshape(shape))
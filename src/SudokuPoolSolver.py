@@ -0,0 +1,279 @@
+# Multiprocess solving of large puzzle corpora with the SudokuRecursiveSolver
+
+import time
+import numpy as np
+from collections import deque
+from multiprocessing import Pool, cpu_count
+
+from SudokuRecursiveSolver import SudokuRecursiveSolver, rated_techniques
+from SudokuSolverStats import SudokuSolverStats
+from SudokuSolutionCache import SudokuSolutionCache
+from SudokuSolutionStore import SudokuSolutionStore
+
+# Solver of each worker process, created once by the pool initializer and reused for every chunk
+worker_solver = None
+worker_settings = None
+
+
+def init_worker(block_size, backend, branching, propagate, store_path=None, finned=False):
+    """ Creates the solver of a worker process
+        :param block_size: Size of a block, assuming square blocks [int]
+        :param backend: Engine used to solve the boards [string]
+        :param branching: Order in which empty cells are guessed during recursion/bifurcation [string]
+        :param propagate: Whether naked and hidden singles are re-run after every guess [bool]
+        :param store_path: Path to a store of solved puzzles that are looked up instead of solved, None for no store
+                           [string]
+        :param finned: Whether finned X-wings, swordfish, and jellyfish are searched for [bool]
+        :return: None
+    """
+    global worker_solver, worker_settings
+    worker_solver = SudokuRecursiveSolver()
+    worker_settings = (block_size, backend, branching, propagate, finned)
+    if store_path is not None:
+        worker_solver.set_solution_cache(SudokuSolutionCache(solution_store=SudokuSolutionStore(store_path),
+                                                             canonical=False))
+
+
+def run_chunk(chunk, run_many):
+    """ Runs a batch method of the solver of a worker process over a chunk of boards, with fresh profiling counters
+        :param chunk: The boards of the chunk, one byte per cell in row-major order, concatenated [bytes]
+        :param run_many: Called with the boards of the chunk and the settings of the worker, such as to solve them
+                         with solve_many [function]
+        :return results: The return value of run_many
+        :return stats: The profiling counters of the chunk [SudokuSolverStats]
+    """
+    block_size = worker_settings[0]
+    size = block_size * block_size
+    boards = np.frombuffer(chunk, dtype=np.uint8).reshape(-1, size, size)
+    worker_solver.stats.reset()
+    return run_many(boards, *worker_settings), worker_solver.stats
+
+
+def solve_chunk(chunk):
+    """ Solves a chunk of boards in a worker process
+        :param chunk: The boards of the chunk, one byte per cell in row-major order, concatenated [bytes]
+        :return solutions: The solved boards, one byte per cell in row-major order, concatenated [bytes]
+        :return status: One byte per board, 1 if it was solved and 0 otherwise [bytes]
+        :return stats: The profiling counters of the chunk [SudokuSolverStats]
+    """
+    (solutions, status), stats = run_chunk(chunk, worker_solver.solve_many)
+    return solutions.tobytes(), status.astype(np.uint8).tobytes(), stats
+
+
+def count_chunk(chunk, limit):
+    """ Counts the solutions of a chunk of boards in a worker process
+        :param chunk: The boards of the chunk, one byte per cell in row-major order, concatenated [bytes]
+        :param limit: Largest number of solutions to search for in each board [int]
+        :return counts: Number of solutions of each board, at most limit, as int64 [bytes]
+        :return stats: The profiling counters of the chunk [SudokuSolverStats]
+    """
+    def count_many(boards, block_size, backend, branching, propagate, finned):
+        return worker_solver.count_many(boards, limit, block_size, backend, branching)
+
+    counts, stats = run_chunk(chunk, count_many)
+    return counts.astype(np.int64).tobytes(), stats
+
+
+def rate_chunk(chunk):
+    """ Rates the difficulty of a chunk of boards in a worker process
+        :param chunk: The boards of the chunk, one byte per cell in row-major order, concatenated [bytes]
+        :return ratings: The score, the index into rated_techniques of the strongest technique needed, and the number of
+                         guesses
+                         of each board, as rows of int64 [bytes]
+        :return stats: The profiling counters of the chunk [SudokuSolverStats]
+    """
+    def rate_many(boards, block_size, backend, branching, propagate, finned):
+        return worker_solver.rate_many(boards, block_size, branching, finned)
+
+    ratings, stats = run_chunk(chunk, rate_many)
+    return np.column_stack(ratings).astype(np.int64).tobytes(), stats
+
+
+class SudokuPoolSolver:
+    """ Class that solves a corpus of sudoku puzzles on all cores.
+        The corpus is split into chunks of boards, and each chunk is sent to a pool of worker processes as rows of
+        bytes (one byte per cell) rather than as pickled numpy arrays. The workers and their solvers are reused for
+        every chunk and every corpus until the pool is closed. Only a bounded number of chunks are in flight at a
+        time, and the results are streamed back in the order of the corpus. The profiling counters of the workers are
+        added up into the stats attribute.
+    """
+
+    def __init__(self, workers=None, chunk_size=256, block_size=3, backend=None, branching="mrv",
+                 propagate=True, store_path=None, finned=False):
+        """ Constructor
+            :param workers: Number of worker processes, all cores if None [int]
+            :param chunk_size: Number of boards sent to a worker at a time [int]
+            :param block_size: Size of a block, assuming square blocks [int]
+            :param backend: Engine used to solve the boards, the default of the board size if None (see
+                            SudokuRecursiveSolver.get_default_backend) [string]
+            :param branching: Order in which empty cells are guessed during recursion/bifurcation [string]
+            :param propagate: Whether naked and hidden singles are re-run after every guess [bool]
+            :param store_path: Path to a store of solved puzzles (see SudokuSolutionStore) that every worker maps
+                               into memory and looks boards up in before solving them, None for no store [string]
+            :param finned: Whether finned X-wings, swordfish, and jellyfish are searched for [bool]
+        """
+
+        # Pool parameters
+        self.workers = workers if workers is not None else cpu_count()
+        self.chunk_size = chunk_size
+        self.max_chunks_in_flight = 4 * self.workers
+        self.block_size = block_size
+        self.size = block_size * block_size
+        self.settings = (block_size, backend, branching, propagate, store_path, finned)
+        self.pool = None
+
+        # Throughput of the last corpus
+        self.puzzles_solved = 0                 # Number of boards that were solved
+        self.puzzles_total = 0                  # Number of boards in the corpus
+        self.elapsed_time = 0.0                 # Wall time to solve the corpus in seconds
+        self.stats = SudokuSolverStats()        # Profiling counters of every technique, added up over the workers
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def start(self):
+        """ Starts the worker processes if they are not already running
+            :return: None
+        """
+        if self.pool is None:
+            self.pool = Pool(self.workers, initializer=init_worker, initargs=self.settings)
+
+    def close(self):
+        """ Stops the worker processes
+            :return: None
+        """
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+
+    def encode_board(self, board):
+        """ Converts a board into byte form. A board that does not fit, with the wrong shape or values outside of 0 to
+            255, is sent with 255 in every cell instead of being cut down to bytes, so that the worker records it as
+            not valid (see SudokuRecursiveSolver.check_board) rather than solving a different board
+            :param board: The sudoku board state, with 0's as blanks [2D numpy array of int]
+            :return board_bytes: One byte per cell in row-major order [bytes]
+        """
+        board = np.asarray(board)
+        if board.shape != (self.size, self.size) or board.min() < 0 or board.max() > 255:
+            return bytes([255]) * (self.size * self.size)
+        return board.astype(np.uint8).tobytes()
+
+    def get_chunks(self, boards):
+        """ Splits the corpus into chunks of boards in byte form (see encode_board)
+            :param boards: The sudoku board states, with 0's as blanks [3D numpy array of int, or iterable of boards]
+            :return: Generator of the chunks [bytes]
+        """
+        if isinstance(boards, np.ndarray) and boards.shape[1:] == (self.size, self.size):
+            for k in range(0, len(boards), self.chunk_size):
+                chunk = boards[k:k + self.chunk_size]
+                yield np.where((chunk < 0) | (chunk > 255), 255, chunk).astype(np.uint8).tobytes()
+            return
+
+        chunk = []
+        for board in boards:
+            chunk.append(self.encode_board(board))
+            if len(chunk) == self.chunk_size:
+                yield b"".join(chunk)
+                chunk = []
+        if chunk:
+            yield b"".join(chunk)
+
+    def solve_corpus(self, boards):
+        """ Solves every board of the corpus on the worker processes
+            :param boards: The sudoku board states, with 0's as blanks [3D numpy array of int, or iterable of boards]
+            :return: Generator of the solved board and whether it was solved for each board, in the order of the
+                     corpus [tuple of 2D numpy array of uint8 and bool]
+        """
+        start = time.time()
+        for solutions, status, stats in self.map_chunks(boards, solve_chunk):
+            self.stats.merge(stats)
+            solutions = np.frombuffer(solutions, dtype=np.uint8).reshape(-1, self.size, self.size)
+
+            self.puzzles_total += len(status)
+            self.puzzles_solved += sum(status)
+            self.elapsed_time = time.time() - start
+
+            for solution, solved in zip(solutions, status):
+                yield solution, bool(solved)
+
+    def count_corpus(self, boards, limit=2):
+        """ Counts the solutions of every board of the corpus on the worker processes, such as to check that a large
+            set of generated puzzles all have a unique solution. A board counts as solved if it has exactly one
+            solution.
+            :param boards: The sudoku board states, with 0's as blanks [3D numpy array of int, or iterable of boards]
+            :param limit: Largest number of solutions to search for in each board [int]
+            :return: Generator of the number of solutions of each board, at most limit or -1 if the board is not
+                     valid, in the order of the corpus [int]
+        """
+        if limit < 1:
+            raise ValueError("The solution limit should be at least 1, not " + str(limit))
+
+        start = time.time()
+        for counts, stats in self.map_chunks(boards, count_chunk, limit):
+            self.stats.merge(stats)
+            counts = np.frombuffer(counts, dtype=np.int64)
+
+            self.puzzles_total += len(counts)
+            self.puzzles_solved += int(np.count_nonzero(counts == 1))
+            self.elapsed_time = time.time() - start
+
+            for count in counts:
+                yield int(count)
+
+    def rate_corpus(self, boards):
+        """ Rates the difficulty of every board of the corpus on the worker processes (see
+            SudokuRecursiveSolver.rate_sudoku). A board counts as solved if it could be rated.
+            :param boards: The sudoku board states, with 0's as blanks [3D numpy array of int, or iterable of boards]
+            :return: Generator of the score, the strongest technique needed (None if none), and the number of guesses of
+                     each board, in the order of the corpus [tuple of int, string, and int]
+        """
+        start = time.time()
+        for ratings, stats in self.map_chunks(boards, rate_chunk):
+            self.stats.merge(stats)
+            ratings = np.frombuffer(ratings, dtype=np.int64).reshape(-1, 3)
+
+            self.puzzles_total += len(ratings)
+            self.puzzles_solved += int(np.count_nonzero(ratings[:, 0] >= 0))
+            self.elapsed_time = time.time() - start
+
+            for score, hardest, guesses in ratings:
+                yield int(score), rated_techniques[hardest] if hardest >= 0 else None, int(guesses)
+
+    def map_chunks(self, boards, task, *args):
+        """ Runs a task over every chunk of the corpus on the worker processes, and resets the throughput counters
+            :param boards: The sudoku board states, with 0's as blanks [3D numpy array of int, or iterable of boards]
+            :param task: Module level function called as task(chunk, *args) in a worker process [function]
+            :param args: Extra arguments of the task
+            :return: Generator of the result of each chunk, in the order of the corpus
+        """
+        self.start()
+        self.puzzles_solved = 0
+        self.puzzles_total = 0
+        self.elapsed_time = 0.0
+        self.stats.reset()
+
+        in_flight = deque()
+        chunks = self.get_chunks(boards)
+        for chunk in chunks:
+            in_flight.append(self.pool.apply_async(task, (chunk,) + args))
+
+            # Wait for the oldest chunk once enough are queued, so that the corpus is never held in memory at once
+            if len(in_flight) >= self.max_chunks_in_flight:
+                yield in_flight.popleft().get()
+
+        while in_flight:
+            yield in_flight.popleft().get()
+
+    def get_throughput(self):
+        """ Gets the throughput of the last corpus, counting every board processed whether it was solved or not, as
+            the command line does
+            :return puzzles_per_second: Number of boards processed per second of wall time [float]
+        """
+        if self.elapsed_time == 0:
+            return 0.0
+        return self.puzzles_total / self.elapsed_time
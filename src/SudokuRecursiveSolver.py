@@ -1,81 +1,304 @@
 # Introduces heuristic approaches to decrease the number of paths for recursive solving
 
 import time
+import logging
 import numpy as np
 from itertools import combinations
 
-# Mapping from binary numbers to decimal numbers
-binary_to_real = {
-    1: 9,       2: 8,       4: 7,
-    8: 6,       16: 5,      32: 4,
-    64: 3,      128: 2,     256: 1
-}
+from SudokuBitboardSolver import SudokuBitboardSolver
+from SudokuCompactBoard import SudokuCompactBoard
+from SudokuDancingLinksSolver import SudokuDancingLinksSolver
+from SudokuSolverStats import SudokuSolverStats
+from sudoku_indices import (get_peer_array, get_unit_indices, get_cell_unit_array, get_single_bit_table,
+                            get_binary_rep, get_binary_to_real, value_characters)
 
-# List of binary numbers
-binary_rep = [0b100000000, 0b010000000, 0b001000000, 0b000100000, 0b000010000, 0b000001000, 0b000000100,
-              0b000000010, 0b000000001]
+# Engines that can be used to solve the board
+backends = ["bitboard", "dlx", "string"]
 
+# Base difficulty score of each technique of solve_sudoku, from the weakest to the strongest. A board scores the base
+# score of the strongest technique it needs, plus one for every guess when it needs recursion/bifurcation. The subset
+# stage counts as hidden singles if it only ever finds subsets of one cell, and otherwise as hidden sets, which score
+# one more for each cell of the largest subset past a pair (5 for pairs up to 7 for quads)
+technique_scores = {"naked_singles": 1, "hidden_singles": 2, "pointing_sets": 3, "box_line_reduction": 4,
+                    "hidden_sets": 5, "x_sword_jelly": 8, "finned_x_sword_jelly": 9, "bifurcation": 10}
 
-def binary_string_to_candidates(binary):
-    """ Converts a binary number to a concatenated string of decimal numbers.
-        For example, 0b001011001 becomes '3569'
+# Techniques that a rating can give, as indexed by rate_many
+rated_techniques = list(technique_scores)
+
+# Largest naked or hidden subset searched for, larger subsets are the complements of smaller ones
+max_subset_size = 4
+
+# Largest fish searched for (jellyfish). On 9x9 boards, larger fish are the complements of smaller ones in the other
+# direction
+max_fish_size = 4
+
+# Largest board that each engine can search. The bitboard and string searches only ever guess the value of a cell, and
+# on sparse 25x25 boards they are often several times slower than exact cover, which also guesses the cell of a value in
+# a unit, or do not finish at all. Exact cover recurses once per cell it fills, so a sparse 36x36 board (1296 cells)
+# would go past the recursion limit of Python
+backend_max_sizes = {"bitboard": 16, "dlx": 25, "string": 16}
+
+
+def get_default_backend(size):
+    """ Gets the engine used when none is given: bitboard up to the largest board it supports, and dlx past that
+        :param size: Number of rows in the board, 9 for 9x9 boards [int]
+        :return backend: One of backends [string]
+    """
+    return "bitboard" if size <= backend_max_sizes["bitboard"] else "dlx"
+
+
+def check_backend(backend, size=None):
+    """ Checks that the backend exists and supports boards of the given size
+        :param backend: Engine used to solve the board [string]
+        :param size: Number of rows in the board, 9 for 9x9 boards, or None to only check that the backend exists [int]
+        :return: None
+    """
+    if backend not in backends:
+        raise ValueError("Unknown backend: " + str(backend))
+    if size is not None and size > backend_max_sizes[backend]:
+        raise ValueError("The " + backend + " backend only supports boards up to " + str(backend_max_sizes[backend]) +
+                         "x" + str(backend_max_sizes[backend]))
+
+
+def check_board(game_board, block_size=3):
+    """ Checks that a board is 2D, with block_size x block_size blocks of block_size x block_size cells, that its
+        values are between 0 (blank) and the size of the board, and that no value is given twice in a row, col, or
+        block, which no engine could solve
+        :param game_board: The sudoku board state, with 0's as blanks [2D numpy array of int]
+        :param block_size: Size of a block, assuming square blocks [int]
+        :return: None
+    """
+    size = block_size * block_size
+    if game_board.shape != (size, size):
+        raise ValueError("Board of shape " + str(game_board.shape) + " does not match a block size of " +
+                         str(block_size))
+    if game_board.min() < 0 or game_board.max() > size:
+        raise ValueError("Board values should be between 0 (blank) and " + str(size))
+
+    # Sorted values of every unit, where a repeated given sits next to itself
+    units = np.sort(game_board.reshape(-1)[np.array(get_unit_indices(block_size))], axis=1)
+    repeated = np.flatnonzero(np.any((units[:, 1:] == units[:, :-1]) & (units[:, 1:] > 0), axis=1))
+    if len(repeated) > 0:
+        unit_type, index = divmod(int(repeated[0]), size)
+        raise ValueError("Board gives a value twice in " + ["row", "col", "block"][unit_type] + " " + str(index))
+
+
+def binary_string_to_candidates(binary, size=9):
+    """ Converts a binary number to a concatenated string of the characters of its values (see value_characters).
+        For example, 0b001011001 becomes '3569' for a 9x9 board
         :param binary: Binary number [int]
+        :param size: Number of values, 9 for 9x9 boards [int]
         :return candidates: Concatenated string list [string]
     """
     candidates = ""
-    for i, rep in enumerate(binary_rep):
+    for i, rep in enumerate(get_binary_rep(size)):
         if binary & rep > 0:
-            candidates += str(i + 1)
+            candidates += value_characters[i]
     return candidates
 
 
+def count_bits(values, bits):
+    """ Counts the set bits over every binary number of an array
+        :param values: Binary numbers [numpy array of int]
+        :param bits: Number of bits that can be set in each number [int]
+        :return count: Total number of set bits [int]
+    """
+    return int(sum(np.count_nonzero(values & (1 << k)) for k in range(bits)))
+
+
+def find_subsets(masks, size, cover_size=None, ignored=0, start=0, items=0, union=0, count=0):
+    """ Finds every group of size masks whose union has exactly size bits set, such as size cells of a unit whose
+        candidates hold size values. With a cover_size, finds every group whose union has at most cover_size bits set
+        outside of the ignored bits instead, such as the base lines of a finned fish with the fins in the ignored bits.
+        The masks are added in order, and a group is dropped as soon as its union has too many bits set, so that the
+        combinations that can not work are never built.
+        :param masks: The binary masks to choose from, 0 for the masks that are not to be used [list of int]
+        :param size: Number of masks in a group [int]
+        :param cover_size: Largest number of bits set in the union outside of the ignored bits, or None for groups
+                           whose union has exactly size bits set [int]
+        :param ignored: Binary mask of the bits that are not counted in the union [int]
+        :param start: Index of the first mask that can still be added to the group [int]
+        :param items: Binary mask of the indices of the masks in the group so far [int]
+        :param union: Union of the masks in the group so far [int]
+        :param count: Number of masks in the group so far [int]
+        :return: Generator of the binary mask of the indices of the masks of each group, and their union [tuple]
+    """
+    if count == size:
+        if cover_size is not None or bin(union).count("1") == size:
+            yield items, union
+        return
+
+    bound = size if cover_size is None else cover_size
+    for k in range(start, len(masks) - (size - count) + 1):
+        if masks[k] == 0:
+            continue
+        next_union = union | masks[k]
+        if bin(next_union & ~ignored).count("1") > bound:
+            continue
+        yield from find_subsets(masks, size, cover_size, ignored, k + 1, items | (1 << k), next_union, count + 1)
+
+
+def print_event_sink(technique, details):
+    """ Event sink that prints every deduction event on its own line
+        :param technique: Name of the technique that made the deduction [string]
+        :param details: Where the deduction was made and what it found [dict]
+        :return: None
+    """
+    print(technique + ": " + ", ".join(key + "=" + str(value) for key, value in details.items()))
+
+
+def get_logging_event_sink(logger=None, level=logging.DEBUG):
+    """ Creates an event sink that sends every deduction event to a logger. The technique and details are attached
+        to each log record as the 'technique' and 'details' attributes for structured handlers.
+        :param logger: Logger to send the events to, the 'SudokuRecursiveSolver' logger if None [logging.Logger]
+        :param level: Logging level of the events [int]
+        :return sink: The event sink [function]
+    """
+    if logger is None:
+        logger = logging.getLogger("SudokuRecursiveSolver")
+
+    def logging_event_sink(technique, details):
+        logger.log(level, "%s: %s", technique, details, extra={"technique": technique, "details": details})
+
+    return logging_event_sink
+
+
 class SudokuRecursiveSolver:
     """ Class that performs the sudoku solving.
         Currently uses v5 of the sudoku_base_solvers.
         Uses heuristic methods first (with binary representation), then recursion/bifurcation over the remaining
-        candidates for each cell (with string representation)
+        candidates for each cell (with bitboard representation, see SudokuBitboardSolver)
+
+        The backend selects the engine that is used:
+            - 'bitboard': Heuristic methods, then recursion/bifurcation with the bitboard representation
+            - 'dlx': Exact cover with dancing links over the whole board, no heuristic methods needed
+            - 'string': Heuristic methods, then recursion/bifurcation with the string representation of v5
+
+        Deductions are not reported by default. To trace them, set an event sink with set_event_sink, which is called
+        with the name of the technique and a dict of details for every deduction. When no event sink is set, the
+        details are never built.
+
+        The calls, eliminations, and wall time of every technique, and the recursion nodes and depth of bifurcation,
+        add up in the stats attribute (see SudokuSolverStats) over every board solved until stats.reset is called.
     """
 
     def __init__(self):
         """ Constructor """
 
         # Board parameters
-        self.rows = 0                           # Number of rows in the board, should be 9
-        self.cols = 0                           # Number of cols in the board, should be 9
-        self.block_size = 0                     # Size of each block, should be 3 (assumes square blocks)
-        self.blocks_across = 0                  # Number of blocks across the board in one direction, should be 3
+        self.rows = 0                           # Number of rows in the board, block_size ** 2 (9 for 9x9)
+        self.cols = 0                           # Number of cols in the board, block_size ** 2 (9 for 9x9)
+        self.block_size = 0                     # Size of each block, 3 for 9x9 (assumes square blocks)
+        self.blocks_across = 0                  # Number of blocks across the board in one direction, 3 for 9x9
+        self.binary_rep = None                  # Binary representation of each value, from 1 to the size of the board
+        self.binary_to_real = None              # Mapping from the binary representation of each value to the value
+        self.backend = "bitboard"               # Engine used to solve the board, one of backends
+        self.event_sink = None                  # Called with every deduction event, no tracing if None
+        self.solution_cache = None              # Solutions of boards solved before, not cached if None
+        self.solve_time = 0.0                   # Time taken by the last solve_sudoku in seconds
+        self.hardest_technique = None           # Strongest technique needed by the last solve_sudoku, None if none
+        self.largest_subset = 0                 # Number of cells of the largest subset found by the last solve_sudoku
+        self.guesses = 0                        # Number of guesses made by the last recursion/bifurcation
+        self.stats = SudokuSolverStats()        # Profiling counters of every technique, added up over the boards
 
         # Main containers for the board state
+        self.compact_board = None               # Values and candidate list of the board in a single buffer
         self.board = None                       # Current board (used as initial and for recursion/bifurcation)
         self.solution = None                    # Solved board state
 
         # Heuristic approach container
         self.candidate_list = None              # Binary representation of candidates for each cell
+        self.peer_indices = None                # Indices of the cells sharing a row, col, or block with each cell
+        self.cell_and_peer_indices = None       # Index of each cell followed by the indices of its peers
+        self.value_bits = None                  # Binary representation of each value, from 1 to the size of the board
+        self.segment_weights = None             # Bit of each segment (or sub line) in an occupancy pattern
+        self.single_bit_table = None            # Index of the single set bit of each occupancy pattern, -1 if not one
+        self.unit_indices = None                # Indices of the cells in each row, col, and block
+
+        # Dirty unit tracking, so that each technique only revisits the units that lost candidates since it last ran
+        self.cell_units = None                  # Row, col, and block unit numbers of each cell
+        self.unit_modified = None               # Value of modification_count when each unit last lost candidates
+        self.modification_count = 0             # Number of times candidates were removed from the candidate list
+        self.technique_last_run = None          # Value of modification_count when each technique last started
+        self.eliminations = 0                   # Number of candidates removed from the candidate list
 
         # Recursion/bifurcation approach containers
         self.row_list = None                    # List of cell values for each row in string representation
         self.col_list = None                    # List of cell values for each col in string representation
         self.block_list = None                  # List of block values for each block in string representation
         self.candidate_string_list = None       # List of candidates for each cell in string representation
+        self.recursion_nodes = 0                # Number of recursion nodes visited by the string representation
+        self.recursion_max_depth = 0            # Deepest recursion reached by the string representation
+        self.bitboard_solver = SudokuBitboardSolver()   # Bitboard engine used for recursion/bifurcation
+        self.dancing_links_solver = SudokuDancingLinksSolver()  # Exact cover engine used for the dlx backend
 
-    def load_board(self, game_board, block_size=3):
+    def load_board(self, game_board, block_size=3, backend=None):
         """ Load the sudoku puzzle board and gets the board characteristics
             :param game_board: The sudoku board state, with 0's as blanks [2D list of ints]
             :param block_size: Size of a block, assuming square blocks [int]
+            :param backend: Engine used to solve the board, one of backends, or the one of get_default_backend for the
+                            size of the board if None [string]
             :return: None
         """
-
-        # Set up initial state of board and solution as the game_board
-        self.board = np.array(game_board)
+        if backend is None:
+            backend = get_default_backend(block_size * block_size)
+        check_backend(backend, block_size * block_size)
+        self.backend = backend
+
+        # Board should be 2D, with block_size x block_size blocks of block_size x block_size cells
+        game_board = np.asarray(game_board)
+        check_board(game_board, block_size)
+
+        # Set up initial state of board and solution as the game_board. The board and the candidate list are views of
+        # a compact board (one byte per value and one uint16 per candidate mask on boards up to 16x16)
+        self.compact_board = SudokuCompactBoard.from_board(game_board, block_size)
+        self.board = self.compact_board.values
         self.solution = self.board.copy()
-
-        # Board should be 2D
         self.rows, self.cols = self.board.shape
         self.block_size = block_size
         self.blocks_across = int(self.rows / self.block_size)
+        self.binary_rep = get_binary_rep(self.rows)
+        self.binary_to_real = get_binary_to_real(self.rows)
 
         # Initialize candidate list as empty
-        self.candidate_list = np.zeros((self.rows, self.cols), dtype=int)
+        self.candidate_list = self.compact_board.candidates
+        self.peer_indices = get_peer_array(self.block_size)
+        self.cell_and_peer_indices = np.column_stack((np.arange(self.rows * self.cols), self.peer_indices))
+        self.value_bits = np.left_shift(self.candidate_list.dtype.type(1),
+                                        np.arange(self.rows - 1, -1, -1, dtype=self.candidate_list.dtype))
+        self.segment_weights = np.left_shift(1, np.arange(self.block_size))
+        self.single_bit_table = get_single_bit_table(self.block_size)
+        self.unit_indices = get_unit_indices(self.block_size)
+        self.cell_units = get_cell_unit_array(self.block_size)
+
+    def set_event_sink(self, event_sink):
+        """ Sets the function that is called with every deduction event, such as print_event_sink or the sink from
+            get_logging_event_sink. Can be changed between boards to trace only some of them.
+            :param event_sink: Called as event_sink(technique, details), or None to disable tracing [function]
+            :return: None
+        """
+        self.event_sink = event_sink
+
+    def set_solution_cache(self, solution_cache):
+        """ Sets the cache that solve_sudoku looks boards up in before solving them, and puts their solutions in after.
+            Can be shared between solvers of the same process.
+            :param solution_cache: The cache, or None to always solve [SudokuSolutionCache]
+            :return: None
+        """
+        self.solution_cache = solution_cache
+
+    def reload_board(self, game_board):
+        """ Load the next sudoku puzzle board into the containers of the currently loaded board, instead of creating
+            new ones. The board must have the same size as the currently loaded board, and is checked like in
+            load_board before it is copied in, so that a batch can record a board that is not valid and carry on.
+            :param game_board: The sudoku board state, with 0's as blanks [2D list of ints]
+            :return: None
+        """
+        game_board = np.asarray(game_board)
+        check_board(game_board, self.block_size)
+        self.board[:, :] = game_board
+        self.solution[:, :] = game_board
+        self.candidate_list.fill(0)
 
     def block_top_left(self, x, y):
         """ Returns the (i, j) cell index of the top left cell of block (x, y)
@@ -105,6 +328,7 @@ class SudokuRecursiveSolver:
         the candidate list corresponds to the possible candidates/values that the cell can take.
         They are represented in the form 0bxxxxxxxxx, where x is 1 if that value is a candidate 
         for this cell, and 0 if that value cannot be a candidate, from 1 to 9 in MSB order.
+        Larger boards work the same way with one bit per value, ie 16 bits for 16x16 boards.
         
         In other words, say for example cell (1, 3) has candidates 1, 3, 4, 7, 8. Then, in cell
         (1, 3) (which is index (0, 2)) in candidate list is 0b101100110. We see the first, third,
@@ -131,9 +355,9 @@ class SudokuRecursiveSolver:
             return False
 
         # Checks that the blocks are valid
-        row_block = (x // 3) * 3
-        col_block = (y // 3) * 3
-        if candidate in self.board[row_block:row_block + 3, col_block:col_block + 3]:
+        row_block = (x // self.block_size) * self.block_size
+        col_block = (y // self.block_size) * self.block_size
+        if candidate in self.board[row_block:row_block + self.block_size, col_block:col_block + self.block_size]:
             return False
 
         return True
@@ -161,46 +385,137 @@ class SudokuRecursiveSolver:
     def get_candidate_list(self):
         """ Creates the candidate list for each cell on in the board. If the cell is already filled, the candidate
             list is composed of only 0's.
+            Instead of checking every value against every cell, the values used in each row, column, and block are
+            collected into binary numbers with array operations, and the candidates of every cell are the values not
+            used by its row, column, or block.
         """
+        full_mask = (1 << self.rows) - 1
 
-        # Loops through each cell on the board
-        for i in range(self.rows):
-            for j in range(self.cols):
+        # Binary representation of the value in each cell, 0 for blanks, in the unsigned type of the candidate list
+        candidate_type = self.candidate_list.dtype.type
+        values = self.board.astype(candidate_type)
+        binary_board = np.where(values > 0, np.left_shift(candidate_type(1), self.rows - values), candidate_type(0))
+
+        # Values used in each row, column, and block
+        row_used = np.bitwise_or.reduce(binary_board, axis=1)
+        col_used = np.bitwise_or.reduce(binary_board, axis=0)
+        block_used = np.bitwise_or.reduce(np.bitwise_or.reduce(
+            binary_board.reshape(self.blocks_across, self.block_size, self.blocks_across, self.block_size), axis=3),
+            axis=1)
 
-                valid_candidates = 0b0
+        # Broadcast the used values of each unit back onto its cells, and keep the unused values of the empty cells
+        used = (row_used[:, np.newaxis] | col_used[np.newaxis, :] |
+                np.repeat(np.repeat(block_used, self.block_size, axis=0), self.block_size, axis=1))
+        self.candidate_list[:, :] = np.where(values == 0, full_mask & ~used, 0)
+
+    """ 
+        Dirty unit tracking.
+
+        A technique can only find something new in a unit once that unit has lost candidates. Every removal of
+        candidates goes through remove_candidates, which stamps the row, column, and block of every cell that lost
+        candidates with a running modification count. Each technique remembers the count when it last started, and only
+        revisits the units stamped since. A technique made progress if the count went up while it ran, so the candidate
+        list does not have to be copied and compared.
+    """
+
+    def reset_dirty_units(self):
+        """ Marks every unit as dirty for every technique, such as after the candidate list is built
+            :return: None
+        """
+        self.unit_modified = np.zeros(3 * self.rows, dtype=np.int64)
+        self.modification_count = 0
+        self.technique_last_run = {}
+
+    def get_dirty_units(self, technique):
+        """ Gets the units that lost candidates since the technique last started, and marks the technique as started
+            :param technique: Name of the technique [string]
+            :return units: The sorted unit numbers, with the numbering of get_unit_indices [1D numpy array of int]
+        """
+        last_run = self.technique_last_run.get(technique, -1)
+        self.technique_last_run[technique] = self.modification_count
+        return np.flatnonzero(self.unit_modified > last_run)
+
+    def get_dirty_mask(self, dirty_units, modification_count):
+        """ Marks the dirty units of a technique, along with the units that lost candidates since it started
+            :param dirty_units: The units that get_dirty_units gave the technique [1D numpy array of int]
+            :param modification_count: The modification count when the technique started [int]
+            :return dirty_mask: True for each unit to be checked, with the numbering of get_unit_indices
+                                [1D numpy array of bool]
+        """
+        dirty_mask = self.unit_modified > modification_count
+        dirty_mask[dirty_units] = True
+        return dirty_mask
+
+    def remove_candidates(self, cells, binary_value):
+        """ Removes candidates from cells of the candidate list, and marks the units of the cells that lost any as dirty
+            :param cells: The flattened indices of the cells [list or 1D numpy array of int]
+            :param binary_value: Binary representation of the candidates to be removed [int]
+            :return bool: True if candidates were removed, False otherwise
+        """
+        flat_candidate_list = self.candidate_list.reshape(-1)
+        cells = np.asarray(cells, dtype=np.intp)
+        removed = flat_candidate_list[cells] & binary_value
+        changed = cells[removed != 0]
+        if len(changed) == 0:
+            return False
 
-                # We skip this cell if it already has a value
-                if self.board[i][j] == 0:
+        flat_candidate_list[changed] &= ((1 << self.rows) - 1) ^ binary_value
+        if binary_value & (binary_value - 1):
+            self.eliminations += count_bits(removed, self.rows)
+        else:
+            self.eliminations += len(changed)
+        self.modification_count += 1
+        self.unit_modified[self.cell_units[changed]] = self.modification_count
+        return True
 
-                    # We go through all numbers, and if they yield a valid sudoku puzzle, the candidate list is updated
-                    # accordingly (that is, if x put into cell (i, j) gives a valid sudoku, the xth bit of the candidate
-                    # list binary number is set to 1. It is set to 0 otherwise.
-                    for candidate in range(1, 10):
-                        valid_candidates = valid_candidates << 1
-                        if self.is_valid_board(i, j, candidate):
-                            valid_candidates += 0b1
+    def run_technique(self, technique, solve_technique):
+        """ Runs a heuristic technique and records its call, eliminations, and wall time in the stats
+            :param technique: Name of the technique in the stats [string]
+            :param solve_technique: The solve method of the technique [function]
+            :return modified_board: The return value of solve_technique [bool]
+        """
+        eliminations = self.eliminations
+        start = time.perf_counter()
+        modified_board = solve_technique()
+        elapsed = time.perf_counter() - start
+        self.stats.record(technique, self.eliminations - eliminations, elapsed)
+        if technique == "hidden_sets" and self.largest_subset == 1:
+            technique = "hidden_singles"
+        if modified_board and (self.hardest_technique is None or
+                               self.get_technique_score(technique) > self.get_technique_score(self.hardest_technique)):
+            self.hardest_technique = technique
+        return modified_board
 
-                # Save the candidates
-                self.candidate_list[i][j] = valid_candidates
+    def get_technique_score(self, technique):
+        """ Gets the difficulty score of a technique, with the largest subset found so far for the hidden sets
+            :param technique: Name of the technique, one of technique_scores [string]
+            :return score: The difficulty score [int]
+        """
+        if technique == "hidden_sets":
+            return technique_scores[technique] + max(self.largest_subset - 2, 0)
+        return technique_scores[technique]
 
     """ Heuristic: Naked Singles """
 
     def solve_naked_singles(self):
         """ Finds all naked singles from the candidate list and update the board and candidate list accordingly
-            by placing those values into those cells.
+            by placing those values into those cells. A cell can only become a naked single by losing candidates, so
+            only the cells of the rows that lost candidates since the last call are checked.
             :return modified_board: True if the board was updated, false otherwise
         """
         modified_board = False
 
-        # Loops through each cell
-        for i in range(self.rows):
+        # Loops through each cell of the dirty rows, which come first in the unit numbering
+        for i in self.get_dirty_units("naked_singles"):
+            if i >= self.rows:
+                break
             for j in range(self.cols):
 
                 # If there is only one possible candidate in that cell
                 if bin(self.candidate_list[i][j]).count("1") == 1:
 
                     # Update the board by placing that value into that cell and update the candidate list
-                    self.insert_value_and_update_candidate_list(self.candidate_list[i][j], i, j)
+                    self.insert_value_and_update_candidate_list(int(self.candidate_list[i][j]), i, j)
                     modified_board = True
 
         # Return true if the board was updated, false otherwise.
@@ -215,168 +530,190 @@ class SudokuRecursiveSolver:
         """
 
         # Since we want decimal numbers in the board, we find the decimal equivalent to the binary value
-        decimal_value = binary_to_real[binary_value]
+        decimal_value = self.binary_to_real[binary_value]
 
         # Update the board with this value
         self.board[x][y] = decimal_value
 
-        # Remove this candidate from all other cells that share the same row as cell (x, y)
-        for i, candidates in enumerate(self.candidate_list[x, :]):
-            self.candidate_list[x, i] = candidates & (~binary_value & 0b111111111)
+        # Remove this candidate from cell (x, y) and from all the cells that share the same row, column, or block as
+        # cell (x, y), using the precomputed peers of the cell as an index into the flattened candidate list
+        cell = x * self.cols + y
+        self.remove_candidates(self.cell_and_peer_indices[cell], binary_value)
 
-        # Remove this candidate from all other cells that share the same column as cell (x, y)
-        for j, candidates in enumerate(self.candidate_list[:, y]):
-            self.candidate_list[j, y] = candidates & (~binary_value & 0b111111111)
+    """ Heuristic: Hidden Sets
 
-        # Remove this candidate from all other cells that share the same block as cell (x, y)
-        top_x, top_y = self.block_top_left(x, y)
-        for i in range(top_x, top_x + 3):
-            for j in range(top_y, top_y + 3):
-                self.candidate_list[i, j] = self.candidate_list[i][j] & (~binary_value & 0b111111111)
+        Naked subsets are n cells of a unit whose candidates together hold exactly n values, so those values can be
+        removed from the rest of the unit. Hidden subsets are n values of a unit that together fit in exactly n cells,
+        so the other candidates of those cells can be removed. A naked subset of n cells is the complement of a hidden
+        subset of the other empty cells of the unit, so searching both up to max_subset_size covers every subset of a
+        9x9 unit.
 
-    """ Heuristic: Hidden Sets """
+        Both are the same search: the cells of a unit as masks of their candidate values (naked), or the values of a
+        unit as masks of the cells that can hold them (hidden), looking for n masks whose union has n bits set.
+    """
 
     def solve_hidden_sets(self):
-        candidate_list_copy = self.candidate_list.copy()
-        for i in range(1, 9):
-            self.solve_hidden_sets_rows(i)
-            self.solve_hidden_sets_cols(i)
-            self.solve_hidden_sets_blocks(i)
-        return not np.array_equal(candidate_list_copy, self.candidate_list)
-
-    def solve_hidden_sets_rows(self, hidden_rate):
-        for i, row in enumerate(self.candidate_list):
-
-            # Make sure that we're not finding combinations of all the remaining empty cells
-            non_zeros = np.where(self.board[i, :] == 0)[0]
-            if len(non_zeros) <= hidden_rate:
-                continue
-
-            values = None
-            col_cells = None
-
-            # Go through all combinations of size hidden_rate of nonzero cells
-            # Take the union, if the set size after the union is equivalent to the number of cells
-            # Then we have found a naked set (which is the conjugate of a hidden set of size 9 - n)
-            for comb in list(combinations(non_zeros, hidden_rate)):
-                base = 0b000000000
-                for col in comb:
-                    base = base | self.candidate_list[i][col]
-                if bin(base).count("1") == hidden_rate:
-                    values = base
-                    col_cells = comb
-                    print("Found number: " + str(bin(base)) + " in position " + str(i) + ", " + str(comb))
-                    break
-
-            if values is not None and col_cells is not None:
-                for k in range(9):
-                    if k not in col_cells:
-                        self.candidate_list[i][k] = self.candidate_list[i][k] & (~values & 0b111111111)
-        return
-
-    def solve_hidden_sets_cols(self, hidden_rate):
-        for i, col in enumerate(self.candidate_list.transpose()):
-
-            # Make sure that we're not finding combinations of all the remaining empty cells
-            non_zeros = np.where(self.board[:, i] == 0)[0]
-            if len(non_zeros) <= hidden_rate:
-                continue
-
-            values = None
-            row_cells = None
-            for comb in list(combinations(non_zeros, hidden_rate)):
-                base = 0b000000000
-                for row in comb:
-                    base = base | self.candidate_list[row][i]
-                if bin(base).count("1") == hidden_rate:
-                    values = base
-                    row_cells = comb
-                    print("Found number: " + str(bin(base)) + " in position " + str(comb) + ", " + str(i))
-                    break
-
-            if values is not None and row_cells is not None:
-                for k in range(9):
-                    if k not in row_cells:
-                        self.candidate_list[k][i] = self.candidate_list[k][i] & (~values & 0b111111111)
-        return
-
-    def solve_hidden_sets_blocks(self, hidden_rate):
-        for x in range(3):
-            for y in range(3):
-                block_candidate_list = np.reshape(self.candidate_list[x * 3: x * 3 + 3, y * 3: y * 3 + 3], (1, 9))[0]
-                block_board_list = np.reshape(self.board[x * 3: x * 3 + 3, y * 3: y * 3 + 3], (1, 9))[0]
-
-                # Make sure that we're not finding combinations of all the remaining empty cells
-                non_zeros = np.where(block_board_list == 0)[0]
-                if len(non_zeros) <= hidden_rate:
+        """ Finds naked and hidden subsets in every dirty row, column, and block, and removes the candidates they rule
+            out
+            :return modified_board: True if candidates were removed, False otherwise
+        """
+        modification_count = self.modification_count
+        flat_candidate_list = self.candidate_list.reshape(-1)
+        for unit_number in self.get_dirty_units("hidden_sets"):
+            cells = list(self.unit_indices[unit_number])
+
+            # Keep going until the unit has no subset left that removes candidates
+            while self.solve_unit_subsets(unit_number, cells, flat_candidate_list):
+                pass
+        return self.modification_count > modification_count
+
+    def solve_unit_subsets(self, unit_number, cells, flat_candidate_list):
+        """ Finds the smallest naked or hidden subset of a unit that removes candidates, and removes them
+            :param unit_number: Number of the unit, with the numbering of get_unit_indices [int]
+            :param cells: The flattened indices of the cells of the unit [list of int]
+            :param flat_candidate_list: The flattened view of the candidate list [1D numpy array of int]
+            :return size: Number of cells of the subset, 0 if none removes candidates [int]
+        """
+        candidates = flat_candidate_list[cells].tolist()
+        empty_cells = sum(1 for cell_candidates in candidates if cell_candidates)
+
+        # Cells that can hold each value, with bit k of the candidates as value k (so digit masks are candidates)
+        positions = [0] * self.rows
+        for position, cell_candidates in enumerate(candidates):
+            while cell_candidates:
+                bit = cell_candidates & -cell_candidates
+                cell_candidates ^= bit
+                positions[bit.bit_length() - 1] |= 1 << position
+
+        for size in range(1, min(max_subset_size, empty_cells - 1) + 1):
+
+            # Naked subset: remove its values from the other cells of the unit
+            for subset_cells, values in find_subsets(candidates, size):
+                others = [position for position in range(len(cells)) if not subset_cells >> position & 1]
+                if not any(candidates[position] & values for position in others):
                     continue
-
-                values = None
-                block_cells = None
-                for comb in list(combinations(non_zeros, hidden_rate)):
-                    base = 0b000000000
-                    for cell in comb:
-                        base = base | block_candidate_list[cell]
-                    if bin(base).count("1") == hidden_rate:
-                        values = base
-                        block_cells = comb
-                        print("Found number: " + str(bin(base)) + " in position " + str(comb) + " in block " +
-                              str(x) + ", " + str(y))
-                        break
-
-                if values is not None and block_cells is not None:
-                    for k in range(9):
-                        if k not in block_cells:
-                            block_candidate_list[k] = block_candidate_list[k] & (~values & 0b111111111)
-                    self.candidate_list[x * 3: x * 3 + 3, y * 3: y * 3 + 3] = np.reshape(block_candidate_list, (3, 3))
-        return
+                self.remove_candidates([cells[position] for position in others], values)
+                self.send_subset_event("naked_set", unit_number, subset_cells, values)
+                self.largest_subset = max(self.largest_subset, size)
+                return size
+
+            # Hidden subset: remove the other values from the cells of the subset
+            for values, subset_cells in find_subsets(positions, size):
+                inside = [position for position in range(len(cells)) if subset_cells >> position & 1]
+                if not any(candidates[position] & ~values for position in inside):
+                    continue
+                self.remove_candidates([cells[position] for position in inside], ((1 << self.rows) - 1) & ~values)
+                self.send_subset_event("hidden_set", unit_number, subset_cells, values)
+                self.largest_subset = max(self.largest_subset, size)
+                return size
+
+        return 0
+
+    def send_subset_event(self, technique, unit_number, subset_cells, values):
+        """ Sends a naked or hidden subset to the event sink, if one is set
+            :param technique: 'naked_set' or 'hidden_set' [string]
+            :param unit_number: Number of the unit, with the numbering of get_unit_indices [int]
+            :param subset_cells: Bit mask of the positions of the subset in the unit [int]
+            :param values: Binary representation of the values of the subset [int]
+            :return: None
+        """
+        if self.event_sink is None:
+            return
+        unit_type, index = divmod(unit_number, self.rows)
+        if unit_type == 2:
+            index = divmod(index, self.blocks_across)
+        self.event_sink(technique, {"unit": ["row", "col", "block"][unit_type], "index": index,
+                                    "cells": tuple(k for k in range(self.rows) if subset_cells >> k & 1),
+                                    "values": bin(values)})
 
 ###################################################################################################
 ###################################################################################################
 ###################################################################################################
 
+    """ 
+        Intersection removal: pointing sets and box-line reduction.
+
+        Each row (or col) crosses blocks_across blocks, and the cells that a line shares with a block are a segment.
+        For every value, the segments that can still hold it are worked out for a band of lines at once with array
+        operations, and are packed into occupancy patterns: for each line, a bit for each block it crosses, and for each
+        block, a bit for each of its sub rows (or sub cols). A lookup table from an occupancy pattern to its single set
+        bit (or -1) then gives every action at once:
+            - Pointing set: a block pattern with a single sub row means the value can be removed from the rest of that
+              row, if the row holds it outside the block.
+            - Box-line reduction: a line pattern with a single block means the value can be removed from the rest of
+              that block, if the block holds it outside the line.
+        A pointing set only depends on the candidates of its block, and a box-line reduction only on those of its line,
+        so only the dirty blocks (or lines) are checked, and the patterns are only built for the bands that hold them.
+    """
+
+    def get_segment_patterns(self, transposed, bands):
+        """ Gets the occupancy patterns of every value in the segments of the rows (or cols) of some bands
+            :param transposed: False for the rows, True for the cols [bool]
+            :param bands: The bands of block_size lines to get the patterns of, in increasing order
+                          [1D numpy array of int]
+            :return line_patterns: For each value and line of the bands, a bit for each block that can hold the value in
+                                   the segment of the line [2D numpy array of int (value, line of the bands)]
+            :return block_patterns: For each value and block of the bands, a bit for each sub line of the block that can
+                                    hold the value [3D numpy array of int (value, band, block across the lines)]
+        """
+        candidate_list = self.candidate_list.T if transposed else self.candidate_list
+        candidate_list = candidate_list.reshape(self.blocks_across, self.block_size, self.rows)[bands]
+        has_value = (candidate_list.reshape(1, -1, self.rows) & self.value_bits[:, np.newaxis, np.newaxis]) != 0
+        segments = has_value.reshape(self.rows, -1, self.blocks_across, self.block_size).any(axis=3)
+
+        line_patterns = segments.dot(self.segment_weights)
+        block_patterns = segments.reshape(self.rows, len(bands), self.block_size,
+                                          self.blocks_across).transpose(0, 1, 3, 2).dot(self.segment_weights)
+        return line_patterns, block_patterns
+
     def solve_pointing_sets(self):
-        candidate_list_copy = self.candidate_list.copy()
-        for x in range(3):
-            for y in range(3):
-                block_candidate_list = np.reshape(self.candidate_list[x * 3: x * 3 + 3, y * 3: y * 3 + 3], (1, 9))[0]
-
-                for num in binary_rep:
-                    b_rep = 0b0
-                    for candidate in block_candidate_list:
-                        b_rep = b_rep << 1
-                        if candidate & num > 0:
-                            b_rep = b_rep | 0b1
-                    if b_rep == 0b110000000 or b_rep == 0b111000000 or b_rep == 0b011000000 or b_rep == 0b101000000:
-                        self.eliminate_pointing_row(x, y, num, 0)
-                    elif b_rep == 0b000110000 or b_rep == 0b000111000 or b_rep == 0b000011000 or b_rep == 0b000101000:
-                        self.eliminate_pointing_row(x, y, num, 1)
-                    elif b_rep == 0b000000110 or b_rep == 0b000000111 or b_rep == 0b000000011 or b_rep == 0b000000101:
-                        self.eliminate_pointing_row(x, y, num, 2)
-                    elif b_rep == 0b100100000 or b_rep == 0b100100100 or b_rep == 0b000100100 or b_rep == 0b100000100:
-                        self.eliminate_pointing_col(x, y, num, 0)
-                    elif b_rep == 0b010010000 or b_rep == 0b010010010 or b_rep == 0b000010010 or b_rep == 0b010000010:
-                        self.eliminate_pointing_col(x, y, num, 1)
-                    elif b_rep == 0b001001000 or b_rep == 0b001001001 or b_rep == 0b000001001 or b_rep == 0b001000001:
-                        self.eliminate_pointing_col(x, y, num, 2)
-        return not np.array_equal(candidate_list_copy, self.candidate_list)
+        """ Finds the values that can only go in one row (or col) of a block, and removes them from the rest of that row
+            (or col)
+            :return modified_board: True if candidates were removed, False otherwise
+        """
+        modification_count = self.modification_count
+
+        # Only the dirty blocks can hold a new pointing set, which come last in the unit numbering
+        dirty_units = self.get_dirty_units("pointing_sets")
+        if not np.any(dirty_units >= 2 * self.rows):
+            return False
+
+        for transposed in (False, True):
+            # The blocks that lost candidates to the rows are checked again along the cols. Along the cols, the bands
+            # are the stacks of blocks, and a block is found by its stack first
+            dirty_blocks = self.get_dirty_mask(dirty_units, modification_count)[2 * self.rows:]
+            dirty_blocks = dirty_blocks.reshape(self.blocks_across, self.blocks_across)
+            if transposed:
+                dirty_blocks = dirty_blocks.T
+            bands = np.flatnonzero(dirty_blocks.any(axis=1))
+
+            line_patterns, block_patterns = self.get_segment_patterns(transposed, bands)
+            sub_lines = self.single_bit_table[block_patterns]
+            for value, band_num, y in zip(*np.nonzero((sub_lines >= 0) & dirty_blocks[bands])):
+                x = bands[band_num]
+                sub_line = int(sub_lines[value, band_num, y])
+                if line_patterns[value, band_num * self.block_size + sub_line] == 1 << y:
+                    continue
+                if transposed:
+                    self.eliminate_pointing_col(int(y), int(x), int(self.value_bits[value]), sub_line)
+                else:
+                    self.eliminate_pointing_row(int(x), int(y), int(self.value_bits[value]), sub_line)
+        return self.modification_count > modification_count
 
     def eliminate_pointing_row(self, x, y, candidate, sub_row_num):
-        print("Block (" + str(x) + ", " + str(y) + ") sub row " + str(sub_row_num) + " number: " + str(candidate))
-        row_num = (x * 3) + sub_row_num
-        col_num = [y * 3, y * 3 + 1, y * 3 + 2]
-        for j, cell in enumerate(self.candidate_list[row_num, :]):
-            if j not in col_num:
-                self.candidate_list[row_num, j] = cell & (~candidate & 0b111111111)
+        row_num = (x * self.block_size) + sub_row_num
+        cells = [cell for cell in self.unit_indices[row_num] if (cell % self.cols) // self.block_size != y]
+        if self.remove_candidates(cells, candidate) and self.event_sink is not None:
+            self.event_sink("pointing_set", {"block": (x, y), "sub_row": sub_row_num,
+                                             "value": self.rows - candidate.bit_length() + 1})
         return
 
     def eliminate_pointing_col(self, x, y, candidate, sub_col_num):
-        print("Block (" + str(x) + ", " + str(y) + ") sub col " + str(sub_col_num) + " number: " + str(candidate))
-        row_num = [x * 3, x * 3 + 1, x * 3 + 2]
-        col_num = (y * 3) + sub_col_num
-        for i, cell in enumerate(self.candidate_list[:, col_num]):
-            if i not in row_num:
-                self.candidate_list[i, col_num] = cell & (~candidate & 0b111111111)
+        col_num = (y * self.block_size) + sub_col_num
+        cells = [cell for cell in self.unit_indices[self.rows + col_num] if (cell // self.cols) // self.block_size != x]
+        if self.remove_candidates(cells, candidate) and self.event_sink is not None:
+            self.event_sink("pointing_set", {"block": (x, y), "sub_col": sub_col_num,
+                                             "value": self.rows - candidate.bit_length() + 1})
         return
 
 ###################################################################################################
@@ -384,158 +721,199 @@ class SudokuRecursiveSolver:
 ###################################################################################################
 
     def solve_box_line_reduction(self):
-        candidate_list_copy = self.candidate_list.copy()
-        self.solve_box_line_reduction_row()
-        self.solve_box_line_reduction_col()
-        return not np.array_equal(candidate_list_copy, self.candidate_list)
-
-    def solve_box_line_reduction_row(self):
-        for i, row in enumerate(self.candidate_list):
-            for num in binary_rep:
-                r_reps = 0b0
-                for candidate in row:
-                    r_reps = r_reps << 1
-                    if candidate & num > 0:
-                        r_reps = r_reps | 0b1
-                if r_reps == 0b110000000 or r_reps == 0b111000000 or r_reps == 0b011000000 or r_reps == 0b101000000:
-                    self.eliminate_box_row(i, num, 0)
-                elif r_reps == 0b000110000 or r_reps == 0b000111000 or r_reps == 0b000011000 or r_reps == 0b000101000:
-                    self.eliminate_box_row(i, num, 1)
-                elif r_reps == 0b000000110 or r_reps == 0b000000111 or r_reps == 0b000000011 or r_reps == 0b000000101:
-                    self.eliminate_box_row(i, num, 2)
-        return
+        """ Finds the values that can only go in one block of a row (or col), and removes them from the rest of that
+            block
+            :return modified_board: True if candidates were removed, False otherwise
+        """
+        modification_count = self.modification_count
 
-    def eliminate_box_row(self, row_num, candidate, box_y_num):
-        sub_row_num = row_num % 3
-        avoid_cells = [sub_row_num * 3, sub_row_num * 3 + 1, sub_row_num * 3 + 2]
-        x = row_num // 3
-        y = box_y_num
-        block_candidate_list = np.reshape(self.candidate_list[x * 3: x * 3 + 3, y * 3: y * 3 + 3], (1, 9))[0]
+        # Only the dirty rows and cols can hold a new box-line reduction, which come first in the unit numbering
+        dirty_units = self.get_dirty_units("box_line_reduction")
+        if not np.any(dirty_units < 2 * self.rows):
+            return False
 
-        print("B-R R: Box (" + str(x) + ", " + str(y) + ") sub row " + str(sub_row_num) + " number: " + str(candidate))
+        for transposed in (False, True):
+            # The cols that lost candidates to the rows are checked as well
+            first_line = self.rows if transposed else 0
+            dirty_lines = self.get_dirty_mask(dirty_units, modification_count)[first_line:first_line + self.rows]
+            dirty_lines = dirty_lines.reshape(self.blocks_across, self.block_size)
+            bands = np.flatnonzero(dirty_lines.any(axis=1))
+            if len(bands) == 0:
+                continue
 
-        for k, cell in enumerate(block_candidate_list):
-            if k not in avoid_cells:
-                block_candidate_list[k] = block_candidate_list[k] & (~candidate & 0b111111111)
-            self.candidate_list[x * 3: x * 3 + 3, y * 3: y * 3 + 3] = np.reshape(block_candidate_list, (3, 3))
-        return
+            line_patterns, block_patterns = self.get_segment_patterns(transposed, bands)
+            blocks = self.single_bit_table[line_patterns]
+            for value, line_num in zip(*np.nonzero((blocks >= 0) & dirty_lines[bands].reshape(-1))):
+                y = int(blocks[value, line_num])
+                band_num, sub_line = divmod(int(line_num), self.block_size)
+                if block_patterns[value, band_num, y] == 1 << sub_line:
+                    continue
+                line = int(bands[band_num]) * self.block_size + sub_line
+                if transposed:
+                    self.eliminate_box_col(line, int(self.value_bits[value]), y)
+                else:
+                    self.eliminate_box_row(line, int(self.value_bits[value]), y)
+        return self.modification_count > modification_count
 
-    def solve_box_line_reduction_col(self):
-        for i, col in enumerate(self.candidate_list.transpose()):
-            for num in binary_rep:
-                c_reps = 0b0
-                for candidate in col:
-                    c_reps = c_reps << 1
-                    if candidate & num > 0:
-                        c_reps = c_reps | 0b1
-                if c_reps == 0b110000000 or c_reps == 0b111000000 or c_reps == 0b011000000 or c_reps == 0b101000000:
-                    self.eliminate_box_col(i, num, 0)
-                elif c_reps == 0b000110000 or c_reps == 0b000111000 or c_reps == 0b000011000 or c_reps == 0b000101000:
-                    self.eliminate_box_col(i, num, 1)
-                elif c_reps == 0b000000110 or c_reps == 0b000000111 or c_reps == 0b000000011 or c_reps == 0b000000101:
-                    self.eliminate_box_col(i, num, 2)
+    def eliminate_box_row(self, row_num, candidate, box_y_num):
+        sub_row_num = row_num % self.block_size
+        x = row_num // self.block_size
+        y = box_y_num
+        block = 2 * self.rows + x * self.blocks_across + y
+        cells = [cell for cell in self.unit_indices[block] if cell // self.cols != row_num]
+
+        if self.remove_candidates(cells, candidate) and self.event_sink is not None:
+            self.event_sink("box_line_reduction", {"block": (x, y), "sub_row": sub_row_num,
+                                                   "value": self.rows - candidate.bit_length() + 1})
         return
 
     def eliminate_box_col(self, col_num, candidate, box_x_num):
-        sub_col_num = col_num % 3
-        avoid_cells = [sub_col_num, sub_col_num + 3, sub_col_num + 6]
+        sub_col_num = col_num % self.block_size
         x = box_x_num
-        y = col_num // 3
-        block_candidate_list = np.reshape(self.candidate_list[x * 3: x * 3 + 3, y * 3: y * 3 + 3], (1, 9))[0]
+        y = col_num // self.block_size
+        block = 2 * self.rows + x * self.blocks_across + y
+        cells = [cell for cell in self.unit_indices[block] if cell % self.cols != col_num]
 
-        print("B-C R: Box (" + str(x) + ", " + str(y) + ") sub col " + str(sub_col_num) + " number: " + str(candidate))
-
-        for k, cell in enumerate(block_candidate_list):
-            if k not in avoid_cells:
-                block_candidate_list[k] = block_candidate_list[k] & (~candidate & 0b111111111)
-            self.candidate_list[x * 3: x * 3 + 3, y * 3: y * 3 + 3] = np.reshape(block_candidate_list, (3, 3))
+        if self.remove_candidates(cells, candidate) and self.event_sink is not None:
+            self.event_sink("box_line_reduction", {"block": (x, y), "sub_col": sub_col_num,
+                                                   "value": self.rows - candidate.bit_length() + 1})
         return
 
 ###################################################################################################
 ###################################################################################################
 ###################################################################################################
 
-    def solve_x_sword_jelly(self):
-        candidate_list_copy = self.candidate_list.copy()
-        self.solve_x_sword_jelly_row()
-        self.solve_x_sword_jelly_col()
-        return not np.array_equal(candidate_list_copy, self.candidate_list)
-
-    def solve_x_sword_jelly_row(self):
-        for num in binary_rep:
-            x_sword_jelly_list = np.array([0, 0, 0, 0, 0, 0, 0, 0, 0])
-            for i, row in enumerate(self.candidate_list):
-                base = 0b0
-                for j, cell in enumerate(row):
-                    base = base << 1
-                    if cell & num > 0:
-                        base = base | 0b1
-                x_sword_jelly_list[i] = base
-
-            non_zeros = np.where(x_sword_jelly_list != 0)[0]
-
-            for hidden_rate in [2, 3, 4]:
-
-                if len(non_zeros) <= hidden_rate:
-                    continue
+    """ 
+        Fish: X-wing, swordfish, and jellyfish.
 
-                col_cells = None
-                row_cells = None
-                for comb in list(combinations(non_zeros, hidden_rate)):
-                    base = 0b000000000
-                    for row in comb:
-                        base = base | x_sword_jelly_list[row]
-                    if bin(base).count("1") == hidden_rate:
-                        col_cells = base
-                        row_cells = comb
-                        print("Found X Wing size " + str(hidden_rate) + " for num " + str(num) + " in rows " +
-                              str(row_cells) + " in cols " + str(format(base, '09b')))
-                        break
-
-                if col_cells is not None and row_cells is not None:
-                    for j, col in enumerate(binary_rep):
-                        if col & col_cells > 0:
-                            for i in range(self.rows):
-                                if i not in row_cells:
-                                    self.candidate_list[i][j] = self.candidate_list[i][j] & (~num & 0b111111111)
-
-    def solve_x_sword_jelly_col(self):
-        for num in binary_rep:
-            x_sword_jelly_list = np.array([0, 0, 0, 0, 0, 0, 0, 0, 0])
-            for i, col in enumerate(self.candidate_list.transpose()):
-                base = 0b0
-                for j, cell in enumerate(col):
-                    base = base << 1
-                    if cell & num > 0:
-                        base = base | 0b1
-                x_sword_jelly_list[i] = base
-
-            non_zeros = np.where(x_sword_jelly_list != 0)[0]
-
-            for hidden_rate in [2, 3, 4]:
-
-                if len(non_zeros) <= hidden_rate:
-                    continue
+        For a value, the base lines are size rows (or cols) whose cells that can hold the value all lie in the same
+        size cols (or rows), the cover lines. Each base line holds the value once, each in a different cover line, so
+        the base lines fill every cover line with the value, and it can be removed from the rest of the cover lines.
 
-                col_cells = None
-                row_cells = None
-                for comb in list(combinations(non_zeros, hidden_rate)):
-                    base = 0b000000000
-                    for col in comb:
-                        base = base | x_sword_jelly_list[col]
-                    if bin(base).count("1") == hidden_rate:
-                        row_cells = base
-                        col_cells = comb
-                        print("Found X Wing size " + str(hidden_rate) + " for num " + str(num) + " in cols " +
-                              str(col_cells) + " in rows " + str(format(base, '09b')))
-                        break
-
-                if row_cells is not None and col_cells is not None:
-                    for i, row in enumerate(binary_rep):
-                        if row & row_cells > 0:
-                            for j in range(self.cols):
-                                if j not in col_cells:
-                                    self.candidate_list[i][j] = self.candidate_list[i][j] & (~num & 0b111111111)
+        The cells of every line that can hold each value are packed into position masks with array operations, and the
+        base lines are found with find_subsets, which adds the lines one at a time and drops a partial base set as soon
+        as the union of its masks spans more than size cover lines, so the combinations that can not be a fish are
+        never built.
+
+        A finned fish is a set of base lines whose cells lie in size cover lines except for a few fins, all in one
+        block. Either a fin holds the value, or the base lines are a fish, so the value can be removed from the cells
+        of the cover lines that are in the block of the fins. The finned fish are an optional stage of solve_sudoku.
+    """
+
+    def get_position_masks(self, transposed):
+        """ Gets the cells of every row (or col) that can hold each value
+            :param transposed: False for the rows, True for the cols [bool]
+            :return masks: For each value and line, a bit for each cell of the line that can hold the value, with the
+                           first cell as the most significant bit [list of lists of int (value, line)]
+        """
+        candidate_list = self.candidate_list.T if transposed else self.candidate_list
+        has_value = (candidate_list[np.newaxis, :, :] & self.value_bits[:, np.newaxis, np.newaxis]) != 0
+        return has_value.dot(self.value_bits).tolist()
+
+    def get_line_cells(self, transposed, lines, positions):
+        """ Gets the flattened indices of the cells where lines cross positions
+            :param transposed: False if the lines are rows, True if they are cols [bool]
+            :param lines: The rows (or cols) [list of int]
+            :param positions: The positions along the lines, ie the cols (or rows) [list of int]
+            :return cells: The flattened indices of the cells [list of int]
+        """
+        if transposed:
+            return [position * self.cols + line for line in lines for position in positions]
+        return [line * self.cols + position for line in lines for position in positions]
+
+    def solve_x_sword_jelly(self):
+        """ Finds the X-wings, swordfish, and jellyfish of every value, with the rows and then the cols as base lines
+            :return modified_board: True if candidates were removed, False otherwise
+        """
+
+        # Every row and col is searched at once, so the search is only skipped if no unit lost candidates
+        modification_count = self.modification_count
+        if len(self.get_dirty_units("x_sword_jelly")) == 0:
+            return False
+        self.solve_fish(False)
+        self.solve_fish(True)
+        return self.modification_count > modification_count
+
+    def solve_fish(self, transposed):
+        """ Finds the fish with the rows (or cols) as base lines, and removes their values from the rest of their cover
+            lines
+            :param transposed: False for the rows as base lines, True for the cols [bool]
+            :return: None
+        """
+        base_name, cover_name = ("cols", "rows") if transposed else ("rows", "cols")
+        for value, masks in enumerate(self.get_position_masks(transposed)):
+            lines_with_value = sum(1 for mask in masks if mask)
+            for size in range(2, min(max_fish_size, lines_with_value - 1) + 1):
+                for base_lines, cover_lines in find_subsets(masks, size):
+                    other_lines = [line for line in range(self.rows)
+                                   if not base_lines >> line & 1 and masks[line] & cover_lines]
+                    if not other_lines:
+                        continue
+                    positions = [k for k in range(self.rows) if cover_lines >> (self.rows - 1 - k) & 1]
+                    cells = self.get_line_cells(transposed, other_lines, positions)
+                    if self.remove_candidates(cells, int(self.value_bits[value])) and self.event_sink is not None:
+                        self.event_sink("x_sword_jelly", {
+                            "size": size, "value": value + 1,
+                            base_name: tuple(line for line in range(self.rows) if base_lines >> line & 1),
+                            cover_name: format(cover_lines, "0" + str(self.rows) + "b")})
+
+    def solve_finned_x_sword_jelly(self):
+        """ Finds the finned X-wings, swordfish, and jellyfish of every value, with the rows and then the cols as base
+            lines
+            :return modified_board: True if candidates were removed, False otherwise
+        """
+        modification_count = self.modification_count
+        if len(self.get_dirty_units("finned_x_sword_jelly")) == 0:
+            return False
+        self.solve_finned_fish(False)
+        self.solve_finned_fish(True)
+        return self.modification_count > modification_count
+
+    def solve_finned_fish(self, transposed):
+        """ Finds the finned fish with the rows (or cols) as base lines, and removes their values from the cells of
+            their cover lines in the block of their fins.
+            The fins of a fish are all in one block, so they are in the positions of one stack (or band) of the base
+            lines. For each stack, the base lines are found with find_subsets, ignoring the positions of the stack, and
+            the cover lines left to be picked are picked from the positions of the stack. Values are only removed from
+            the cover lines in the stack, so at least one of them is picked.
+            :param transposed: False for the rows as base lines, True for the cols [bool]
+            :return: None
+        """
+        base_name, cover_name = ("cols", "rows") if transposed else ("rows", "cols")
+        for value, masks in enumerate(self.get_position_masks(transposed)):
+            lines_with_value = sum(1 for mask in masks if mask)
+            for size in range(2, min(max_fish_size, lines_with_value - 1) + 1):
+                for stack in range(self.blocks_across):
+                    stack_positions = range(stack * self.block_size, (stack + 1) * self.block_size)
+                    stack_mask = sum(1 << (self.rows - 1 - k) for k in stack_positions)
+
+                    for base_lines, union in find_subsets(masks, size, size - 1, stack_mask):
+                        outside_count = bin(union & ~stack_mask).count("1")
+                        for inside_positions in combinations(stack_positions, size - outside_count):
+                            inside_cover = sum(1 << (self.rows - 1 - k) for k in inside_positions)
+
+                            # The fins are the cells of the base lines in the stack, outside of the cover lines, and
+                            # should all be in one band. Without fins, it is a fish that solve_fish finds
+                            fin_lines = [line for line in range(self.rows)
+                                         if base_lines >> line & 1 and masks[line] & stack_mask & ~inside_cover]
+                            bands = {line // self.block_size for line in fin_lines}
+                            if len(bands) != 1:
+                                continue
+                            band = bands.pop()
+
+                            other_lines = [line for line in range(band * self.block_size, (band + 1) * self.block_size)
+                                           if not base_lines >> line & 1 and masks[line] & inside_cover]
+                            if not other_lines:
+                                continue
+                            cells = self.get_line_cells(transposed, other_lines, inside_positions)
+                            if self.remove_candidates(cells, int(self.value_bits[value])) and \
+                                    self.event_sink is not None:
+                                cover_lines = (union & ~stack_mask) | inside_cover
+                                self.event_sink("finned_x_sword_jelly", {
+                                    "size": size, "value": value + 1,
+                                    base_name: tuple(line for line in range(self.rows) if base_lines >> line & 1),
+                                    cover_name: format(cover_lines, "0" + str(self.rows) + "b"),
+                                    "fin_block": (stack, band) if transposed else (band, stack)})
 
 
 ###################################################################################################
@@ -544,33 +922,36 @@ class SudokuRecursiveSolver:
 
     def convert_board_to_string_list(self):
 
+        # Each cell is a single character: '0' for blanks, and the value_characters for values
+        characters = "0" + value_characters
+
         self.row_list = []
         self.col_list = []
-        self.block_list = ["", "", "", "", "", "", "", "", ""]
-        self.candidate_string_list = [[""] * 9] * 9
+        self.block_list = [""] * self.rows
+        self.candidate_string_list = [[""] * self.cols] * self.rows
 
-        for i in range(9):
+        for i in range(self.rows):
             row = ""
             col = ""
-            for j in range(9):
-                row += str(int(self.board[i][j]))
-                col += str(int(self.board[j][i]))
+            for j in range(self.cols):
+                row += characters[int(self.board[i][j])]
+                col += characters[int(self.board[j][i])]
             self.row_list.append(row)
             self.col_list.append(col)
 
-        for i in range(9):
-            for j in range(9):
-                block = 3 * (i // 3) + (j // 3)
-                self.block_list[block] += str(int(self.board[i][j]))
+        for i in range(self.rows):
+            for j in range(self.cols):
+                block = self.blocks_across * (i // self.block_size) + (j // self.block_size)
+                self.block_list[block] += characters[int(self.board[i][j])]
 
-        for i in range(9):
+        for i in range(self.rows):
             self.candidate_string_list[i] = []
-            for j in range(9):
-                self.candidate_string_list[i].append(binary_string_to_candidates(self.candidate_list[i][j]))
+            for j in range(self.cols):
+                self.candidate_string_list[i].append(binary_string_to_candidates(self.candidate_list[i][j], self.rows))
 
     def insert_candidate_into_lists(self, x, y, candidate):
-        b = 3 * (x // 3) + (y // 3)
-        p = (x % 3) * 3 + (y % 3)
+        b = self.blocks_across * (x // self.block_size) + (y // self.block_size)
+        p = (x % self.block_size) * self.block_size + (y % self.block_size)
         self.row_list[x] = self.row_list[x][:y] + candidate + self.row_list[x][y + 1:]
         self.col_list[y] = self.col_list[y][:x] + candidate + self.col_list[y][x + 1:]
         self.block_list[b] = self.block_list[b][:p] + candidate + self.block_list[b][p + 1:]
@@ -586,7 +967,7 @@ class SudokuRecursiveSolver:
             return False
 
         # Checks that the blocks are valid
-        block_num = 3 * (x // 3) + (y // 3)
+        block_num = self.blocks_across * (x // self.block_size) + (y // self.block_size)
         if candidate in self.block_list[block_num]:
             return False
 
@@ -604,7 +985,10 @@ class SudokuRecursiveSolver:
 
         return True
 
-    def recursive_solve(self, x, y, candidate):
+    def recursive_solve(self, x, y, candidate, depth=0):
+        self.recursion_nodes += 1
+        if depth > self.recursion_max_depth:
+            self.recursion_max_depth = depth
 
         if not self.recursive_is_valid_board(x, y, candidate):
             return None
@@ -616,39 +1000,283 @@ class SudokuRecursiveSolver:
                     continue
 
                 for candidate in self.candidate_string_list[i][j]:
-                    if self.recursive_solve(i, j, candidate) is not None:
+                    if self.recursive_solve(i, j, candidate, depth + 1) is not None:
                         return True
                 self.insert_candidate_into_lists(i, j, '0')
                 return None
 
         return True
 
-    def solve_sudoku(self):
+    def solve_bifurcation(self, backend, branching, propagate):
+        """ Fills in the cells left empty by the heuristic approaches through recursion/bifurcation
+            :param backend: Engine used for recursion/bifurcation, one of backends [string]
+            :param branching: Order in which empty cells are guessed by the bitboard engine [string]
+            :param propagate: Whether the bitboard engine propagates singles after every guess [bool]
+            :return: None
+        """
+        start = time.perf_counter()
+        if backend == "string":
+            self.recursion_nodes = 0
+            self.recursion_max_depth = 0
+            self.convert_board_to_string_list()
+            if self.recursive_solve(0, 0, -1):
+                for i, row in enumerate(self.row_list):
+                    for j, value in enumerate(row):
+                        self.solution[i][j] = value_characters.index(value) + 1
+            self.stats.record_search(self.recursion_nodes, self.recursion_max_depth)
+
+            # Every value tried is checked in a recursion node of its own
+            self.guesses = max(self.recursion_nodes - 1, 0)
+        elif backend == "dlx":
+            self.dancing_links_solver.load_board(self.board, self.block_size)
+            if self.dancing_links_solver.solve():
+                self.solution[:, :] = self.dancing_links_solver.solution
+            self.stats.record_search(self.dancing_links_solver.nodes, self.dancing_links_solver.max_depth)
+
+            # Every placement tried is covered in a recursion node of its own
+            self.guesses = max(self.dancing_links_solver.nodes - 1, 0)
+        else:
+            self.bitboard_solver.load_board(self.board, self.candidate_list, self.block_size)
+            if self.bitboard_solver.solve(branching, propagate):
+                self.solution[:, :] = self.bitboard_solver.solution
+            self.stats.record_search(self.bitboard_solver.nodes, self.bitboard_solver.max_depth)
+            self.guesses = self.bitboard_solver.guesses
+        self.stats.record("bifurcation", 0, time.perf_counter() - start)
+        self.hardest_technique = "bifurcation"
+
+    def solve_sudoku(self, branching="mrv", backend=None, propagate=True, use_cache=True, finned=False,
+                     heuristics=None):
+        """ Solves the loaded board with the heuristic approaches, then recursion/bifurcation if they get stuck
+            :param branching: Order in which empty cells are guessed during recursion/bifurcation, 'first' for
+                              row-major order, or 'mrv' for the cell with the fewest candidates first [string]
+            :param backend: Engine used to solve the board, one of backends. Uses the one from load_board if None
+                            [string]
+            :param propagate: Whether naked and hidden singles are re-run after every guess of the bitboard engine
+                              [bool]
+            :param use_cache: Whether the solution cache is used, if one is set (see set_solution_cache) [bool]
+            :param finned: Whether finned X-wings, swordfish, and jellyfish are searched for before
+                           recursion/bifurcation [bool]
+            :param heuristics: Whether the heuristic approaches are run before recursion/bifurcation. If None, they
+                               are run for every backend but dlx, which searches the whole board by itself [bool]
+            :return bool: True if a solution was found, False otherwise
+        """
+        if backend is None:
+            backend = self.backend
+        else:
+            check_backend(backend, self.rows)
+        if heuristics is None:
+            heuristics = backend != "dlx"
+
         start = time.time()
         is_using_recursion = False
-        self.get_candidate_list()
-        while np.count_nonzero(self.board) < 81:
-            if self.solve_naked_singles():
+        self.hardest_technique = None
+        self.largest_subset = 0
+        self.guesses = 0
+        self.stats.boards += 1
+
+        # A board that was solved before (up to its symmetries) is only looked up
+        cache_key = None
+        if use_cache and self.solution_cache is not None:
+            cached_solution, cache_key = self.solution_cache.get(self.board, self.block_size)
+            if cached_solution is not None:
+                self.solution[:, :] = cached_solution
+                self.solve_time = time.time() - start
+                if self.event_sink is not None:
+                    self.event_sink("solved", {"backend": "cache", "time": self.solve_time, "bifurcation": False})
+                return True
+
+        # Exact cover searches the whole board by itself, so the heuristic approaches can be skipped
+        if not heuristics:
+            is_using_recursion = True
+            self.solve_bifurcation(backend, branching, propagate)
+        else:
+            self.get_candidate_list()
+            self.reset_dirty_units()
+
+        while not is_using_recursion and np.count_nonzero(self.board) < self.rows * self.cols:
+            if self.run_technique("naked_singles", self.solve_naked_singles):
                 continue
-            elif self.solve_hidden_sets():
+            elif self.run_technique("hidden_sets", self.solve_hidden_sets):
                 continue
-            elif self.solve_pointing_sets():
+            elif self.run_technique("pointing_sets", self.solve_pointing_sets):
                 continue
-            elif self.solve_box_line_reduction():
+            elif self.run_technique("box_line_reduction", self.solve_box_line_reduction):
                 continue
-            elif self.solve_x_sword_jelly():
+            elif self.run_technique("x_sword_jelly", self.solve_x_sword_jelly):
+                continue
+            elif finned and self.run_technique("finned_x_sword_jelly", self.solve_finned_x_sword_jelly):
                 continue
             else:
                 is_using_recursion = True
-                self.convert_board_to_string_list()
-                if self.recursive_solve(0, 0, -1):
-                    for i, row in enumerate(self.row_list):
-                        for j, value in enumerate(row):
-                            self.solution[i][j] = int(value)
+                self.solve_bifurcation(backend, branching, propagate)
                 break
         if not is_using_recursion:
-            self.solution = self.board.copy()
-        if np.count_nonzero(self.solution) < 81:
-            return False
-        print(time.time() - start)
-        return True
+            self.solution[:, :] = self.board
+
+        has_solution = np.count_nonzero(self.solution) == self.rows * self.cols
+        if has_solution and cache_key is not None:
+            self.solution_cache.put(cache_key, self.solution)
+        self.solve_time = time.time() - start
+        if self.event_sink is not None:
+            self.event_sink("solved" if has_solution else "unsolved", {"backend": backend, "time": self.solve_time,
+                                                                       "bifurcation": is_using_recursion})
+        return has_solution
+
+    def solve_many(self, boards, block_size=3, backend=None, branching="mrv", propagate=True, finned=False):
+        """ Solves a batch of sudoku puzzle boards of the same size. The containers of the solver are set up once and
+            reused for every board, so that the per board cost is only the solving itself.
+            :param boards: The sudoku board states, with 0's as blanks [3D numpy array of int, or iterable of boards]
+            :param block_size: Size of a block, assuming square blocks [int]
+            :param backend: Engine used to solve the boards, one of backends, or the one of get_default_backend for
+                            the size of the boards if None [string]
+            :param branching: Order in which empty cells are guessed during recursion/bifurcation [string]
+            :param propagate: Whether naked and hidden singles are re-run after every guess [bool]
+            :param finned: Whether finned X-wings, swordfish, and jellyfish are searched for [bool]
+            :return solutions: The solved board of each board, unsolvable boards are left partially filled, and boards
+                               that are not valid (see check_board) or too large for the backend are left as 0's
+                               [3D numpy array of uint8]
+            :return status: True for each board that was solved, False otherwise [1D numpy array of bool]
+        """
+        def solve_board():
+            return self.solve_sudoku(branching, propagate=propagate, finned=finned), self.solution.copy()
+
+        size = block_size * block_size
+        results = self.map_boards(boards, block_size, backend, solve_board)
+        solutions = np.zeros((len(results), size, size), dtype=np.uint8)
+        status = np.zeros(len(results), dtype=bool)
+        for k, result in enumerate(results):
+            if result is not None:
+                status[k], solutions[k] = result
+
+        return solutions, status
+
+    def map_boards(self, boards, block_size, backend, operation):
+        """ Runs an operation on every board of a batch of sudoku puzzle boards of the same size. The containers of the
+            solver are set up once, and each board is checked (see check_board) and loaded into them in turn, so that
+            the per board cost is only the operation itself. A board that is not valid is recorded and skipped, so the
+            rest of the batch carries on. Boards that are too large for the backend are recorded in the same way.
+            :param boards: The sudoku board states, with 0's as blanks [3D numpy array of int, or iterable of boards]
+            :param block_size: Size of a block, assuming square blocks [int]
+            :param backend: Engine used for the boards, one of backends, or the one of get_default_backend for the size
+                            of the boards if None [string]
+            :param operation: Called with no arguments once each board is loaded, such as to solve it [function]
+            :return results: The return value of the operation for each board, None for the boards that are not
+                             valid [list]
+        """
+        if backend is not None:
+            check_backend(backend)
+        if not isinstance(boards, np.ndarray):
+            boards = [np.asarray(board) for board in boards]
+        if len(boards) == 0:
+            return []
+
+        size = block_size * block_size
+        try:
+            self.load_board(np.zeros((size, size), dtype=int), block_size, backend)
+        except ValueError:
+            return [None] * len(boards)
+        results = []
+        for board in boards:
+            try:
+                self.reload_board(board)
+            except ValueError:
+                results.append(None)
+                continue
+            results.append(operation())
+        return results
+
+    def rate_sudoku(self, branching="mrv", finned=False):
+        """ Solves the loaded board and rates its difficulty from the strongest technique of solve_sudoku that it
+            needs, and the number of guesses if it needs recursion/bifurcation (see technique_scores). The heuristic
+            approaches are always run first, and the guesses are always made by the engine of get_default_backend (the
+            bitboard engine with propagation up to 16x16), so that the scores of boards of the same size are on the
+            same scale.
+            The solution cache is not used, since a cached board would not show the techniques it needs.
+            :param branching: Order in which empty cells are guessed during recursion/bifurcation [string]
+            :param finned: Whether finned X-wings, swordfish, and jellyfish are tried before recursion/bifurcation
+                           [bool]
+            :return score: The difficulty score, 0 for a full board, or -1 if the board could not be solved [int]
+            :return hardest_technique: The strongest technique needed, one of technique_scores, None for a full board
+                                       [string]
+            :return guesses: Number of values tried during recursion/bifurcation, including the ones that were ruled
+                             out straight away [int]
+        """
+        if not self.solve_sudoku(branching, get_default_backend(self.rows), propagate=True, use_cache=False,
+                                 finned=finned, heuristics=True):
+            return -1, self.hardest_technique, self.guesses
+        if self.hardest_technique is None:
+            return 0, None, 0
+        return self.get_technique_score(self.hardest_technique) + self.guesses, self.hardest_technique, self.guesses
+
+    def rate_many(self, boards, block_size=3, branching="mrv", finned=False):
+        """ Rates the difficulty of a batch of sudoku puzzle boards of the same size (see rate_sudoku), such as to sort
+            a corpus by difficulty. The containers of the solver are set up once and reused.
+            :param boards: The sudoku board states, with 0's as blanks [3D numpy array of int, or iterable of boards]
+            :param block_size: Size of a block, assuming square blocks [int]
+            :param branching: Order in which empty cells are guessed during recursion/bifurcation [string]
+            :param finned: Whether finned X-wings, swordfish, and jellyfish are tried [bool]
+            :return scores: The difficulty score of each board, -1 if it could not be solved or is not valid (see
+                            check_board), or too large to be searched [1D numpy array of int]
+            :return hardest: Index into rated_techniques of the strongest technique needed by each board, -1 if none
+                             [1D numpy array of int]
+            :return guesses: Number of guesses made for each board [1D numpy array of int]
+        """
+        results = self.map_boards(boards, block_size, None, lambda: self.rate_sudoku(branching, finned))
+        scores = np.full(len(results), -1, dtype=int)
+        hardest = np.full(len(results), -1, dtype=int)
+        guesses = np.zeros(len(results), dtype=int)
+        for k, result in enumerate(results):
+            if result is not None:
+                scores[k], technique, guesses[k] = result
+                if technique is not None:
+                    hardest[k] = rated_techniques.index(technique)
+
+        return scores, hardest, guesses
+
+    def count_solutions(self, limit=2, backend=None, branching="mrv"):
+        """ Counts the solutions of the loaded board, stopping as soon as limit solutions have been found. With the
+            default limit of 2, a count of 1 means that the solution is unique. The first solution found is kept in
+            solution. The heuristic approaches are skipped, since the search engine propagates the singles after every
+            guess by itself. The string representation has no counting search, so it counts with the bitboard engine.
+            :param limit: Largest number of solutions to search for [int]
+            :param backend: Engine used to search the board, one of backends. Uses the one from load_board if None
+                            [string]
+            :param branching: Order in which empty cells are guessed by the bitboard engine [string]
+            :return count: Number of solutions, at most limit [int]
+        """
+        if backend is None:
+            backend = self.backend
+        else:
+            check_backend(backend, self.rows)
+        if limit < 1:
+            raise ValueError("The solution limit should be at least 1, not " + str(limit))
+
+        start = time.perf_counter()
+        self.stats.boards += 1
+        if backend == "dlx":
+            engine = self.dancing_links_solver
+            engine.load_board(self.board, self.block_size)
+            count = engine.count_solutions(limit)
+        else:
+            engine = self.bitboard_solver
+            engine.load_board(self.board, None, self.block_size)
+            count = engine.count_solutions(limit, branching)
+        self.solution[:, :] = engine.solution if count > 0 else self.board
+        self.stats.record_search(engine.nodes, engine.max_depth)
+        self.stats.record("bifurcation", 0, time.perf_counter() - start)
+        return count
+
+    def count_many(self, boards, limit=2, block_size=3, backend=None, branching="mrv"):
+        """ Counts the solutions of a batch of sudoku puzzle boards of the same size, such as to check that generated
+            or scraped puzzles have a unique solution. The containers of the solver are set up once and reused.
+            :param boards: The sudoku board states, with 0's as blanks [3D numpy array of int, or iterable of boards]
+            :param limit: Largest number of solutions to search for in each board [int]
+            :param block_size: Size of a block, assuming square blocks [int]
+            :param backend: Engine used to search the boards, one of backends, or the one of get_default_backend for
+                            the size of the boards if None [string]
+            :param branching: Order in which empty cells are guessed by the bitboard engine [string]
+            :return counts: Number of solutions of each board, at most limit, or -1 if the board is not valid (see
+                            check_board) or too large for the backend [1D numpy array of int]
+        """
+        results = self.map_boards(boards, block_size, backend, lambda: self.count_solutions(limit, branching=branching))
+        return np.array([-1 if count is None else count for count in results], dtype=int)
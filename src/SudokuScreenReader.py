@@ -1,13 +1,19 @@
 # Necessary imports
-import cv2
+# OpenCV, imutils, PyAutoGUI, and PyTesseract are only imported once a board is actually captured and read, as they
+# take a long time to import and need a display. This keeps the solver importable on headless machines.
+import sys
 import math
 import numpy as np
-from imutils import contours
 
-# PyAutoGUI and PyTesseract imports
-import pyautogui
-import pytesseract
-pytesseract.pytesseract.tesseract_cmd = r'C:\\Program Files\\Tesseract-OCR\\tesseract.exe'
+
+def load_pytesseract():
+    """ Imports PyTesseract and points it at the Tesseract install on Windows
+        :return pytesseract: The PyTesseract module [module]
+    """
+    import pytesseract
+    if sys.platform == "win32":
+        pytesseract.pytesseract.tesseract_cmd = r'C:\\Program Files\\Tesseract-OCR\\tesseract.exe'
+    return pytesseract
 
 
 class SudokuScreenReader:
@@ -56,6 +62,7 @@ class SudokuScreenReader:
 
         # If no screenshot image is passed in, take a screenshot at the specified location
         if open_cv_image is None:
+            import pyautogui
             im1 = pyautogui.screenshot(region=(x, y, w, h))
             open_cv_image = np.array(im1)
 
@@ -81,6 +88,7 @@ class SudokuScreenReader:
         """ Gets the contours of the image to find the location of the lines
             :return: None
         """
+        import cv2
 
         # Convert to gray, threshold and invert the image. Also save a thresholded but non-inverted image copy
         gray = cv2.cvtColor(self.image, cv2.COLOR_BGR2GRAY)
@@ -103,6 +111,7 @@ class SudokuScreenReader:
             We can do this because we know that the lines of the grid should be straight
             :return: None
         """
+        import cv2
 
         # Creates a vertical 1x5 kernel and applies binary closing based on that kernel
         vertical_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (1, 5))
@@ -117,6 +126,8 @@ class SudokuScreenReader:
             Each contour should correspond to a cell in the sudoku puzzle
             :return: None
         """
+        import cv2
+        from imutils import contours
 
         # Get the contours again
         invert = 255 - self.thresh_invert
@@ -149,6 +160,8 @@ class SudokuScreenReader:
         """ Use the OCR to read each digit from the sudoku board
             :return: None
         """
+        import cv2
+        pytesseract = load_pytesseract()
 
         # Iterate through each contour/cell
         for row in self.game_board_contours:
@@ -1,10 +1,5 @@
-# Necessary imports
-import cv2
-import math
-import numpy as np
-
-# PyAutoGUI imports
-import pyautogui
+# PyAutoGUI is only imported once the solution is actually written, as it takes a long time to import and needs a
+# display. This keeps the solver importable on headless machines.
 
 
 class SudokuScreenWriter:
@@ -62,6 +57,7 @@ class SudokuScreenWriter:
         """ Writes the sudoku solution into the on-screen sudoku puzzle
             :return: None
         """
+        import pyautogui
 
         # Goes through all cells
         for i, row in enumerate(self.game_board_centers):
@@ -0,0 +1,142 @@
+# Memoisation of solved boards, keyed by their canonical form
+
+import numpy as np
+from collections import OrderedDict
+
+from sudoku_canonical import get_canonical_form, to_canonical_form, from_canonical_form
+
+
+class SudokuSolutionCache:
+    """ Class that keeps the solutions of the most recently solved boards, so that a board that is seen again does not
+        have to be solved again.
+        Each solution is kept under two keys. The exact key is the board itself, so that seeing the exact same board
+        again costs a single dict lookup. The canonical key is the canonical form of the board (see
+        sudoku_canonical.get_canonical_form), which is the same for every relabelling, band/row/stack/col reordering,
+        transposition, and rotation of the board, and the solution is kept in the orientation of the canonical form.
+        A board that only matches through its canonical form gets the cached solution mapped back onto its own
+        orientation and labels.
+
+        Boards larger than 9x9, and boards with so few clues that the canonical form is not searched for, are only
+        cached under their exact key. The cache holds at most max_size keys, and the least recently used ones are
+        dropped first.
+
+        A SudokuSolutionStore can be put behind the cache, so that boards that are not in memory are looked up on
+        disk before their canonical form is searched for. Boards found in the store are then kept in memory too.
+    """
+
+    def __init__(self, max_size=10000, solution_store=None, canonical=True):
+        """ Constructor
+            :param max_size: Largest number of keys kept, each board takes up to two [int]
+            :param solution_store: Store of solved puzzles that is looked in after the exact key, None for no store
+                                   [SudokuSolutionStore]
+            :param canonical: Whether boards are also cached under their canonical key. Without it, each board costs
+                              a single lookup, but only exact repeats are found [bool]
+        """
+        if max_size < 1:
+            raise ValueError("The cache should hold at least 1 key, not " + str(max_size))
+        self.max_size = max_size                # Largest number of keys kept
+        self.solution_store = solution_store    # Store of solved puzzles on disk, None for no store
+        self.canonical = canonical              # Whether boards are also cached under their canonical key
+        self.entries = OrderedDict()            # Solution of each key, from the least to the most recently used
+        self.exact_hits = 0                     # Number of boards found under their exact key
+        self.store_hits = 0                     # Number of boards found in the store
+        self.canonical_hits = 0                 # Number of boards found under their canonical key only
+        self.misses = 0                         # Number of boards that were not found
+
+    def __len__(self):
+        return len(self.entries)
+
+    def clear(self):
+        """ Drops every cached solution and sets the counters back to zero
+            :return: None
+        """
+        self.entries.clear()
+        self.exact_hits = 0
+        self.store_hits = 0
+        self.canonical_hits = 0
+        self.misses = 0
+
+    def lookup(self, key):
+        """ Gets the solution kept under a key, and marks the key as the most recently used
+            :param key: The exact or canonical key [tuple]
+            :return solution: The cached solution, None if the key is not cached [2D numpy array of uint8]
+        """
+        solution = self.entries.get(key)
+        if solution is not None:
+            self.entries.move_to_end(key)
+        return solution
+
+    def store(self, key, solution):
+        """ Keeps a solution under a key, dropping the least recently used keys once the cache is full
+            :param key: The exact or canonical key [tuple]
+            :param solution: The solution to keep [2D numpy array of uint8]
+            :return: None
+        """
+        solution.setflags(write=False)
+        self.entries[key] = solution
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def get(self, board, block_size=3):
+        """ Gets the cached solution of a board, first under its exact key, then from the store, then under its
+            canonical key
+            :param board: The sudoku board state, with 0's as blanks [2D numpy array of int]
+            :param block_size: Size of a block, assuming square blocks [int]
+            :return solution: The solution in the orientation of the board, None if it is not cached
+                              [2D numpy array of uint8]
+            :return key: The exact key, the canonical key (None if there is no canonical form), and the transform of
+                         the canonical form, to put the solution of the board in the cache with [tuple]
+        """
+        exact_key = ("exact", block_size, np.asarray(board, dtype=np.uint8).tobytes())
+        solution = self.lookup(exact_key)
+        if solution is not None:
+            self.exact_hits += 1
+            return solution, (exact_key, None, None)
+
+        if self.solution_store is not None and self.solution_store.block_size == block_size:
+            solution = self.solution_store.get(board)
+            if solution is not None:
+                self.store_hits += 1
+                solution = np.array(solution)
+                self.store(exact_key, solution)
+                return solution, (exact_key, None, None)
+
+        if not self.canonical:
+            self.misses += 1
+            return None, (exact_key, None, None)
+
+        canonical_board, transform = get_canonical_form(board, block_size)
+        if canonical_board is None:
+            self.misses += 1
+            return None, (exact_key, None, None)
+
+        canonical_key = ("canonical", block_size, canonical_board.tobytes())
+        canonical_solution = self.lookup(canonical_key)
+        if canonical_solution is None:
+            self.misses += 1
+            return None, (exact_key, canonical_key, transform)
+
+        self.canonical_hits += 1
+        solution = from_canonical_form(canonical_solution, transform)
+        self.store(exact_key, solution)
+        return solution, (exact_key, canonical_key, transform)
+
+    def put(self, key, solution):
+        """ Puts the solution of a board in the cache, under its exact and canonical keys
+            :param key: The key from get [tuple]
+            :param solution: The solution in the orientation of the board [2D numpy array of int]
+            :return: None
+        """
+        exact_key, canonical_key, transform = key
+        solution = np.asarray(solution, dtype=np.uint8).copy()
+        if canonical_key is not None:
+            self.store(canonical_key, to_canonical_form(solution, transform))
+        self.store(exact_key, solution)
+
+    def get_hit_rate(self):
+        """ Gets the share of the boards that were found in the cache
+            :return hit_rate: Hits over lookups, 0 if nothing was looked up [float]
+        """
+        lookups = self.exact_hits + self.store_hits + self.canonical_hits + self.misses
+        return (self.exact_hits + self.store_hits + self.canonical_hits) / lookups if lookups > 0 else 0.0
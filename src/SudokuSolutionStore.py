@@ -0,0 +1,205 @@
+# Persistent store of solved puzzles in a fixed-width binary file, read through a memory map
+
+import os
+import tempfile
+import numpy as np
+
+from sudoku_io import pack_nibbles, unpack_nibbles
+
+# File header: magic, format version, block size, whether the cells are packed as nibbles, number of records, and
+# padding up to 32 bytes. Every field is little-endian
+store_magic = b"SUDOKUDB"
+store_version = 1
+header_dtype = np.dtype([("magic", "S8"), ("version", "<u2"), ("block_size", "u1"), ("packed", "u1"),
+                         ("reserved", "<u4"), ("count", "<u8"), ("padding", "V8")])
+
+
+def get_record_size(block_size=3, packed=False):
+    """ Gets the number of bytes taken by one board in a record
+        :param block_size: Size of a block, assuming square blocks [int]
+        :param packed: Whether the cells are packed two to a byte [bool]
+        :return record_size: 81 for 9x9 boards, or 41 if packed [int]
+    """
+    num_cells = block_size ** 4
+    return (num_cells + 1) // 2 if packed else num_cells
+
+
+def encode_boards(boards, block_size=3, packed=False):
+    """ Converts boards into the fixed-width form of the records of a store
+        :param boards: The sudoku board states, with 0's as blanks [3D numpy array of int]
+        :param block_size: Size of a block, assuming square blocks [int]
+        :param packed: Whether the cells are packed two to a byte [bool]
+        :return encoded: The bytes of each board [2D numpy array of uint8]
+    """
+    cells = np.asarray(boards, dtype=np.uint8).reshape(-1, block_size ** 4)
+    return pack_nibbles(cells) if packed else cells
+
+
+class SudokuSolutionStore:
+    """ Class that looks up the solutions of puzzles in a store file, so that a warm start does not have to solve any
+        puzzle that was solved before.
+        The file has a 32 byte header (see header_dtype) followed by fixed-width records, each a puzzle followed by its
+        solution, with one byte per cell (81 bytes for 9x9 boards) or with the cells packed two to a byte (41 bytes).
+        The records are sorted by their puzzle bytes, so that a puzzle is found by a binary search (numpy searchsorted)
+        over the memory map of the file. Nothing is read into memory up front, and every process that opens the same
+        file shares the same pages of the OS cache. Stores are made with write, which replaces the file atomically so
+        that readers never see a partial file.
+    """
+
+    def __init__(self, path):
+        """ Constructor, opens the store file read-only
+            :param path: Path to the store file [string]
+        """
+        self.path = path                        # Path to the store file
+        self.data = np.memmap(path, dtype=np.uint8, mode="r").view(np.ndarray)     # Memory map of the whole file
+
+        if len(self.data) < header_dtype.itemsize:
+            raise ValueError(str(path) + " is too short to be a solution store")
+        header = self.data[:header_dtype.itemsize].view(header_dtype)[0]
+        if header["magic"] != store_magic:
+            raise ValueError(str(path) + " is not a solution store")
+        if header["version"] != store_version:
+            raise ValueError(str(path) + " is a version " + str(header["version"]) + " solution store, only version " +
+                             str(store_version) + " can be read")
+
+        self.block_size = int(header["block_size"])     # Size of each block, 3 for 9x9
+        self.size = self.block_size ** 2                # Number of rows and cols in each board, 9 for 9x9
+        self.packed = bool(header["packed"])            # Whether the cells are packed two to a byte
+        self.count = int(header["count"])               # Number of records
+        self.record_size = get_record_size(self.block_size, self.packed)    # Bytes taken by one board
+
+        if len(self.data) != header_dtype.itemsize + 2 * self.record_size * self.count:
+            raise ValueError(str(path) + " should hold " + str(self.count) + " records, but its size does not match")
+
+        # Views of the puzzles and the solutions of the records, without copying them out of the memory map. The
+        # puzzles are fixed-width byte strings, which compare in the same order as they were sorted in
+        records = self.data[header_dtype.itemsize:].reshape(self.count, 2 * self.record_size)
+        self.puzzles = np.ndarray(self.count, dtype="S" + str(self.record_size), buffer=self.data,
+                                  offset=header_dtype.itemsize, strides=(2 * self.record_size,))
+        self.solutions = records[:, self.record_size:]
+
+    def __len__(self):
+        return self.count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """ Drops the memory map of the file
+            :return: None
+        """
+        self.puzzles = None
+        self.solutions = None
+        self.data = None
+
+    def find(self, boards):
+        """ Finds the records of boards by binary search
+            :param boards: The sudoku board states, with 0's as blanks [3D numpy array of int]
+            :return index: The record of each board, -1 for the boards that are not in the store [1D numpy array of int]
+        """
+        keys = encode_boards(boards, self.block_size, self.packed)
+        keys = np.ascontiguousarray(keys).view("S" + str(self.record_size)).reshape(-1)
+        index = np.searchsorted(self.puzzles, keys)
+        found = index < self.count
+        found[found] = self.puzzles[index[found]] == keys[found]
+        return np.where(found, index, -1)
+
+    def get_solutions(self, index):
+        """ Gets the solutions of records
+            :param index: The records [1D numpy array of int]
+            :return solutions: The solution of each record [3D numpy array of uint8]
+        """
+        solutions = self.solutions[index]
+        if self.packed:
+            solutions = unpack_nibbles(solutions, self.size * self.size)
+        return solutions.reshape(-1, self.size, self.size)
+
+    def get(self, board):
+        """ Gets the solution of a board. Unpacked stores give a read-only view into the memory map
+            :param board: The sudoku board state, with 0's as blanks [2D numpy array of int]
+            :return solution: The solution, None if the board is not in the store [2D numpy array of uint8]
+        """
+        if np.shape(board) != (self.size, self.size):
+            return None
+        index = int(self.find(np.asarray(board)[None])[0])
+        if index < 0:
+            return None
+        if self.packed:
+            return self.get_solutions([index])[0]
+        return self.solutions[index].reshape(self.size, self.size)
+
+    def get_many(self, boards):
+        """ Gets the solutions of a batch of boards with a single vectorised search
+            :param boards: The sudoku board states, with 0's as blanks [3D numpy array of int]
+            :return solutions: The solution of each board, all 0's for the boards that are not in the store
+                               [3D numpy array of uint8]
+            :return found: True for each board that is in the store [1D numpy array of bool]
+        """
+        index = self.find(boards)
+        found = index >= 0
+        solutions = np.zeros((len(index), self.size, self.size), dtype=np.uint8)
+        solutions[found] = self.get_solutions(index[found])
+        return solutions, found
+
+    def get_records(self):
+        """ Gets every record of the store, such as to write a larger store with new records added
+            :return puzzles: The puzzle of each record, in the sorted order of the store [3D numpy array of uint8]
+            :return solutions: The solution of each record [3D numpy array of uint8]
+        """
+        records = self.data[header_dtype.itemsize:].reshape(self.count, 2 * self.record_size)
+        puzzles = records[:, :self.record_size]
+        if self.packed:
+            puzzles = unpack_nibbles(puzzles, self.size * self.size)
+        return puzzles.reshape(-1, self.size, self.size), self.get_solutions(np.arange(self.count))
+
+    @staticmethod
+    def write(path, puzzles, solutions, block_size=3, packed=False):
+        """ Writes a store file of puzzles and their solutions. The records are sorted by puzzle, and repeated puzzles
+            are only kept once. The file is written to a temporary file of its own next to path and then moved over it,
+            so that processes reading an older store at the same path are not affected, and two writers of the same
+            path never write into the same temporary file.
+            :param path: Path to the store file [string]
+            :param puzzles: The sudoku puzzle boards, with 0's as blanks [3D numpy array of int]
+            :param solutions: The solution of each puzzle [3D numpy array of int]
+            :param block_size: Size of a block, assuming square blocks [int]
+            :param packed: Whether the cells are packed two to a byte, which only fits boards up to 9x9 [bool]
+            :return count: Number of records written [int]
+        """
+        if packed and block_size > 3:
+            raise ValueError("Only boards up to 9x9 can be packed as nibbles")
+        puzzles = encode_boards(puzzles, block_size, packed)
+        solutions = encode_boards(solutions, block_size, packed)
+        if len(puzzles) != len(solutions):
+            raise ValueError("There are " + str(len(puzzles)) + " puzzles but " + str(len(solutions)) + " solutions")
+
+        record_size = get_record_size(block_size, packed)
+        keys = np.ascontiguousarray(puzzles).view("S" + str(record_size)).reshape(-1)
+        _, first = np.unique(keys, return_index=True)
+        records = np.concatenate((puzzles[first], solutions[first]), axis=1)
+
+        header = np.zeros(1, dtype=header_dtype)
+        header["magic"] = store_magic
+        header["version"] = store_version
+        header["block_size"] = block_size
+        header["packed"] = packed
+        header["count"] = len(records)
+
+        store_file = tempfile.NamedTemporaryFile(dir=os.path.dirname(os.path.abspath(path)),
+                                                 prefix=os.path.basename(path) + ".", suffix=".tmp", delete=False)
+        try:
+            with store_file:
+                store_file.write(header.tobytes())
+                store_file.write(records.tobytes())
+
+            # Temporary files are only readable by their owner, so the store gets the mode of any new file instead
+            umask = os.umask(0)
+            os.umask(umask)
+            os.chmod(store_file.name, 0o666 & ~umask)
+            os.replace(store_file.name, path)
+        finally:
+            if os.path.exists(store_file.name):
+                os.remove(store_file.name)
+        return len(records)
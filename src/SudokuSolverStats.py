@@ -0,0 +1,113 @@
+# Per-technique profiling counters of the SudokuRecursiveSolver
+
+# Stages of solve_sudoku, in the order in which they are tried
+techniques = ["naked_singles", "hidden_sets", "pointing_sets", "box_line_reduction", "x_sword_jelly",
+              "finned_x_sword_jelly", "bifurcation"]
+
+
+class SudokuSolverStats:
+    """ Class that accumulates where the solver spends its time.
+        For each technique, it counts the calls, the candidates eliminated from the candidate list (including the
+        candidates of the cells that got filled), and the wall time. Bifurcation covers the recursion of every engine,
+        and is measured by the recursion nodes visited and the deepest recursion instead of eliminations.
+
+        The counters add up over every board solved until reset is called, and the stats of several solvers (such as
+        the workers of a SudokuPoolSolver) can be added together with merge, so that the hot spots of a whole batch
+        can be found.
+    """
+
+    def __init__(self):
+        """ Constructor """
+        self.boards = 0                         # Number of boards solved (or attempted)
+        self.calls = None                       # Number of calls of each technique
+        self.eliminations = None                # Number of candidates eliminated by each technique
+        self.time = None                        # Wall time spent in each technique in seconds
+        self.nodes = 0                          # Number of recursion nodes visited during bifurcation
+        self.max_depth = 0                      # Deepest recursion reached during bifurcation
+        self.reset()
+
+    def reset(self):
+        """ Sets every counter back to zero
+            :return: None
+        """
+        self.boards = 0
+        self.calls = dict.fromkeys(techniques, 0)
+        self.eliminations = dict.fromkeys(techniques, 0)
+        self.time = dict.fromkeys(techniques, 0.0)
+        self.nodes = 0
+        self.max_depth = 0
+
+    def record(self, technique, eliminations, elapsed):
+        """ Adds a call of a technique
+            :param technique: Name of the technique, one of techniques [string]
+            :param eliminations: Number of candidates eliminated by the call [int]
+            :param elapsed: Wall time of the call in seconds [float]
+            :return: None
+        """
+        self.calls[technique] += 1
+        self.eliminations[technique] += eliminations
+        self.time[technique] += elapsed
+
+    def record_search(self, nodes, max_depth):
+        """ Adds the recursion of a bifurcation
+            :param nodes: Number of recursion nodes visited [int]
+            :param max_depth: Deepest recursion reached [int]
+            :return: None
+        """
+        self.nodes += nodes
+        self.max_depth = max(self.max_depth, max_depth)
+
+    def merge(self, other):
+        """ Adds the counters of other stats into these stats
+            :param other: The stats to add [SudokuSolverStats]
+            :return: None
+        """
+        self.boards += other.boards
+        for technique in techniques:
+            self.calls[technique] += other.calls[technique]
+            self.eliminations[technique] += other.eliminations[technique]
+            self.time[technique] += other.time[technique]
+        self.nodes += other.nodes
+        self.max_depth = max(self.max_depth, other.max_depth)
+
+    def get_total_time(self):
+        """ Gets the wall time spent in all the techniques
+            :return total_time: Wall time in seconds [float]
+        """
+        return sum(self.time.values())
+
+    def get_hot_spots(self):
+        """ Gets the techniques that were called, from the one that took the most time to the one that took the least
+            :return hot_spots: The technique, its wall time in seconds, and its share of the total time [list of tuple]
+        """
+        total_time = self.get_total_time()
+        hot_spots = []
+        for technique in sorted(techniques, key=lambda name: self.time[name], reverse=True):
+            if self.calls[technique] > 0:
+                share = self.time[technique] / total_time if total_time > 0 else 0.0
+                hot_spots.append((technique, self.time[technique], share))
+        return hot_spots
+
+    def as_dict(self):
+        """ Gets the counters as plain types, such as for saving to JSON
+            :return stats: The counters [dict]
+        """
+        return {
+            "boards": self.boards,
+            "calls": dict(self.calls),
+            "eliminations": dict(self.eliminations),
+            "time": dict(self.time),
+            "nodes": self.nodes,
+            "max_depth": self.max_depth,
+        }
+
+    def __str__(self):
+        lines = ["{:<20} {:>10} {:>14} {:>12} {:>8}".format("technique", "calls", "eliminations", "time ms", "share")]
+        total_time = self.get_total_time()
+        for technique in techniques:
+            share = self.time[technique] / total_time if total_time > 0 else 0.0
+            lines.append("{:<20} {:>10} {:>14} {:>12.3f} {:>7.1%}".format(
+                technique, self.calls[technique], self.eliminations[technique], self.time[technique] * 1000, share))
+        lines.append("boards: " + str(self.boards) + ", recursion nodes: " + str(self.nodes) + ", max depth: " +
+                     str(self.max_depth))
+        return "\n".join(lines)
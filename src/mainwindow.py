@@ -1,7 +1,6 @@
 # Normal system imports
 import sys
 import numpy as np
-import pyautogui
 
 # PyQt5 imports
 from PyQt5 import QtGui
@@ -15,7 +14,8 @@ from PyQt5.QtWidgets import QApplication, QMainWindow, QWidget
 from BoardWindow import BoardWindow
 from SudokuScreenReader import SudokuScreenReader
 from SudokuScreenWriter import SudokuScreenWriter
-from SudokuRecursiveSolver import SudokuRecursiveSolver
+from SudokuRecursiveSolver import SudokuRecursiveSolver, print_event_sink
+from SudokuSolutionCache import SudokuSolutionCache
 
 
 class SudokuSolver(QWidget):
@@ -34,6 +34,8 @@ class SudokuSolver(QWidget):
         self.reader = SudokuScreenReader()
         self.writer = SudokuScreenWriter()
         self.solver = SudokuRecursiveSolver()
+        self.solver.set_event_sink(print_event_sink)    # Prints the deductions made for debugging
+        self.solver.set_solution_cache(SudokuSolutionCache())   # Puzzles captured again are only looked up
 
         # Initializes member variables so PyCharm does not complain
         self.status_text = None
@@ -198,6 +200,7 @@ class SudokuSolver(QWidget):
         """
 
         # Take a screenshot of what's in the window, and convert it to an OpenCV Image
+        import pyautogui
         im1 = pyautogui.screenshot(region=(x, y, w, h))
         open_cv_image = np.array(im1)
 
@@ -266,14 +269,20 @@ class SudokuSolver(QWidget):
         # Prints the sudoku board that was read in for debugging
         print(self.reader.game_board)
 
-        # Use the SudokuRecursiveSolver to solve the sudoku puzzle
-        self.solver.load_board(self.reader.game_board)
-        has_solution = self.solver.solve_sudoku()
+        # Use the SudokuRecursiveSolver to solve the sudoku puzzle. A board that was misread, such as with a value given
+        # twice in a row, is shown as an invalid puzzle
+        try:
+            self.solver.load_board(self.reader.game_board)
+            has_solution = self.solver.solve_sudoku()
+            self.grid_values = self.solver.solution
+        except ValueError as error:
+            print(error)
+            has_solution = False
+            self.grid_values = np.array(self.reader.game_board)
 
         # Update the appearance of the board shown based on validity of the puzzle/solution
         self.capture_widget.valid_board(has_solution)   # Board is green if valid solution, red if invalid puzzle
         self.fill_button.setEnabled(has_solution)       # Fill button is enabled if valid solution, disabled if not
-        self.grid_values = self.solver.solution
         return has_solution
 
     def button_solve_clicked(self):
@@ -0,0 +1,155 @@
+# Canonical form of sudoku boards under the symmetries that keep a board valid
+
+import numpy as np
+from itertools import permutations, product
+from functools import lru_cache
+
+# Largest block size with a canonical form. The col orders of larger boards are too many to search, ie 24^5 for 16x16
+max_canonical_block_size = 3
+
+# Largest number of partial transforms kept while searching for the canonical form. Boards with so few clues that
+# more transforms than this are still tied are not given a canonical form
+max_canonical_states = 100000
+
+
+@lru_cache(maxsize=None)
+def get_line_orders(block_size=3):
+    """ Gets every order of the rows (or cols) of a board that keeps the rows of each band together, ie every order of
+        the bands combined with every order of the rows within each band. There are 1296 orders for a 9x9 board.
+        :param block_size: Size of a block, assuming square blocks [int]
+        :return orders: The original row of each row of the reordered board, for each order [2D numpy array of int]
+    """
+    line_orders = list(permutations(range(block_size)))
+    orders = []
+    for bands in line_orders:
+        for lines in product(line_orders, repeat=block_size):
+            orders.append([band * block_size + line for band, order in zip(bands, lines) for line in order])
+    orders = np.array(orders, dtype=np.intp)
+    orders.setflags(write=False)
+    return orders
+
+
+@lru_cache(maxsize=None)
+def get_blank_code_table(block_size=3):
+    """ Gets the blanks of a row reordered by each col order, for every set of blanks the row can have. The blanks of
+        a row are a binary number with a bit set for each blank, with the first col as the most significant bit.
+        :param block_size: Size of a block, assuming square blocks [int]
+        :return table: The reordered blanks for each col order (first index) and each set of blanks of the row
+                       [2D numpy array of int]
+    """
+    size = block_size * block_size
+    weights = 2 ** np.arange(size - 1, -1, -1, dtype=np.int64)
+    blanks = (np.arange(2 ** size)[:, None] // weights) % 2
+    table = np.ascontiguousarray((blanks[:, get_line_orders(block_size)] @ weights).T)
+    table.setflags(write=False)
+    return table
+
+
+def get_canonical_form(board, block_size=3):
+    """ Gets the canonical form of a board, which is the same for every board that can be turned into it by relabelling
+        the values, reordering the bands, the rows within a band, the stacks, or the cols within a stack, transposing,
+        or rotating (a rotation is a transposition followed by reversing the cols). The canonical form is the smallest
+        of all these boards, compared row by row with the values relabelled in their order of first appearance, and
+        blanks coming after every value. It is found row by row, only keeping the partial transforms that are tied for
+        the smallest rows so far.
+        :param board: The sudoku board state, with 0's as blanks [2D numpy array of int]
+        :param block_size: Size of a block, assuming square blocks [int]
+        :return canonical_board: The canonical form, or None if the board is too large or has too few clues to search
+                                 [2D numpy array of uint8]
+        :return transform: Whether the board is transposed, the original row of each row, the original col of each
+                           col, and the new label of each value, for from_canonical_form [tuple]
+    """
+    if block_size > max_canonical_block_size:
+        return None, None
+
+    size = block_size * block_size
+    blank = size + 1
+    boards = np.stack((board, np.transpose(board))).astype(np.intp)
+    col_orders = get_line_orders(block_size)
+    row_weights = (size + 2) ** np.arange(size - 1, -1, -1, dtype=np.int64)
+    bands = np.arange(size) // block_size
+
+    # The values of a row are all different, so once they are relabelled in their order of first appearance, the first
+    # row only depends on where its blanks are. The smallest first row is the one whose blanks come the latest, over
+    # every row (in either orientation) and every col order
+    blank_codes = get_blank_code_table(block_size)[:, (boards == 0) @ (2 ** np.arange(size - 1, -1, -1))]
+    col_order, transposed, first_row = np.nonzero(blank_codes == blank_codes.min())
+    if len(transposed) > max_canonical_states:
+        return None, None
+
+    # Partial transforms: transposition, col order, rows picked so far, new label of each value, and next free label
+    rows = first_row[:, None]
+    first_values = boards[transposed[:, None], rows, col_orders[col_order]]
+    first_labels = np.cumsum(first_values > 0, axis=1)
+    labels = np.zeros((len(transposed), size + 1), dtype=np.intp)
+    labels[np.arange(len(transposed))[:, None], first_values] = np.where(first_values > 0, first_labels, 0)
+    next_label = first_labels[:, -1] + 1
+
+    for k in range(1, size):
+
+        # Rows that can come next: any row of a band that is not used yet at the start of a band, or else any row of
+        # the current band that is not used yet
+        if k % block_size == 0:
+            allowed = ~(bands[None, :, None] == bands[rows][:, None, :]).any(axis=2)
+        else:
+            allowed = bands[None, :] == bands[rows[:, -1]][:, None]
+            allowed[np.arange(len(rows))[:, None], rows] = False
+        state, row = np.nonzero(allowed)
+        if len(state) > max_canonical_states:
+            return None, None
+
+        # Relabel the values of each candidate row in their order of first appearance
+        values = boards[transposed[state][:, None], row[:, None], col_orders[col_order[state]]]
+        state_labels = labels[state]
+        state_next_label = next_label[state]
+        relabelled = np.empty_like(values)
+        index = np.arange(len(state))
+        for j in range(size):
+            value = values[:, j]
+            label = state_labels[index, value]
+            new = (value > 0) & (label == 0)
+            state_labels[index[new], value[new]] = state_next_label[new]
+            state_next_label += new
+            relabelled[:, j] = np.where(value > 0, state_labels[index, value], blank)
+
+        # Only keep the partial transforms tied for the smallest row
+        codes = relabelled @ row_weights
+        keep = codes == codes.min()
+        state = state[keep]
+        transposed = transposed[state]
+        col_order = col_order[state]
+        rows = np.column_stack((rows[state], row[keep]))
+        labels = state_labels[keep]
+        next_label = state_next_label[keep]
+
+    # Any tied transform gives the same canonical form. Values that are not on the board get the labels left over
+    labels = labels[0]
+    missing = np.flatnonzero(labels[1:] == 0) + 1
+    labels[missing] = np.arange(next_label[0], size + 1)
+    transform = (bool(transposed[0]), rows[0], col_orders[col_order[0]], labels)
+    return to_canonical_form(board, transform), transform
+
+
+def to_canonical_form(board, transform):
+    """ Applies the transform of a canonical form to a board, such as to its solution
+        :param board: The sudoku board state, with 0's as blanks [2D numpy array of int]
+        :param transform: The transform from get_canonical_form [tuple]
+        :return canonical_board: The transformed board [2D numpy array of uint8]
+    """
+    transposed, rows, cols, labels = transform
+    board = np.transpose(board) if transposed else np.asarray(board)
+    return labels[board[np.ix_(rows, cols)]].astype(np.uint8)
+
+
+def from_canonical_form(canonical_board, transform):
+    """ Undoes the transform of a canonical form, such as to map the solution of a canonical form back onto the board
+        :param canonical_board: The transformed board [2D numpy array of int]
+        :param transform: The transform from get_canonical_form [tuple]
+        :return board: The board in its original orientation and labels [2D numpy array of uint8]
+    """
+    transposed, rows, cols, labels = transform
+    values = np.zeros(len(labels), dtype=np.uint8)
+    values[labels] = np.arange(len(labels))
+    board = np.zeros((len(rows), len(cols)), dtype=np.uint8)
+    board[np.ix_(rows, cols)] = values[canonical_board]
+    return np.transpose(board) if transposed else board
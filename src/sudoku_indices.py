@@ -0,0 +1,109 @@
+# Precomputed cell, unit, and value tables shared by the sudoku solvers
+
+import numpy as np
+from functools import lru_cache
+
+# Characters of the values 1 to 35, so that boards larger than 9x9 can be written with one character per cell. Blanks
+# are '0' (or '.'), so the values of 9x9 boards are their own digits
+value_characters = "123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+
+@lru_cache(maxsize=None)
+def get_unit_indices(block_size=3):
+    """ Gets the flattened (row-major) cell indices of every unit of the board, with the rows first, then the columns,
+        then the blocks. For a 9x9 board, units 0-8 are the rows, 9-17 are the columns, and 18-26 are the blocks.
+        :param block_size: Size of a block, assuming square blocks [int]
+        :return units: The cell indices of each unit [tuple of tuples of int]
+    """
+    size = block_size * block_size
+    rows = [tuple(i * size + j for j in range(size)) for i in range(size)]
+    cols = [tuple(i * size + j for i in range(size)) for j in range(size)]
+    blocks = [tuple((x * block_size + i) * size + (y * block_size + j)
+                    for i in range(block_size) for j in range(block_size))
+              for x in range(block_size) for y in range(block_size)]
+    return tuple(rows + cols + blocks)
+
+
+@lru_cache(maxsize=None)
+def get_cell_units(block_size=3):
+    """ Gets the (row, col, block) unit numbers of every flattened cell index, with the numbering of get_unit_indices
+        :param block_size: Size of a block, assuming square blocks [int]
+        :return cell_units: The row, col, and block unit numbers of each cell [tuple of tuples of int]
+    """
+    size = block_size * block_size
+    return tuple((cell // size, size + cell % size,
+                  2 * size + block_size * (cell // size // block_size) + (cell % size) // block_size)
+                 for cell in range(size * size))
+
+
+@lru_cache(maxsize=None)
+def get_peer_indices(block_size=3):
+    """ Gets the flattened cell indices of the peers of every cell, that is the cells that share a row, column, or
+        block with it (excluding the cell itself). Each cell of a 9x9 board has 20 peers.
+        :param block_size: Size of a block, assuming square blocks [int]
+        :return peers: The sorted cell indices of the peers of each cell [tuple of tuples of int]
+    """
+    units = get_unit_indices(block_size)
+    peers = []
+    for cell, cell_units in enumerate(get_cell_units(block_size)):
+        cell_peers = set()
+        for unit in cell_units:
+            cell_peers.update(units[unit])
+        cell_peers.discard(cell)
+        peers.append(tuple(sorted(cell_peers)))
+    return tuple(peers)
+
+
+@lru_cache(maxsize=None)
+def get_peer_array(block_size=3):
+    """ Gets the peers of get_peer_indices as a read-only array, to be used as a fancy index into a flattened board
+        :param block_size: Size of a block, assuming square blocks [int]
+        :return peers: The sorted cell indices of the peers of each cell [2D numpy array of int]
+    """
+    peers = np.array(get_peer_indices(block_size), dtype=np.intp)
+    peers.flags.writeable = False
+    return peers
+
+
+@lru_cache(maxsize=None)
+def get_cell_unit_array(block_size=3):
+    """ Gets the unit numbers of get_cell_units as a read-only array, to be used as a fancy index into per-unit arrays
+        :param block_size: Size of a block, assuming square blocks [int]
+        :return cell_units: The row, col, and block unit numbers of each cell [2D numpy array of int]
+    """
+    cell_units = np.array(get_cell_units(block_size), dtype=np.intp)
+    cell_units.flags.writeable = False
+    return cell_units
+
+
+@lru_cache(maxsize=None)
+def get_single_bit_table(bits=3):
+    """ Gets the lookup table from every binary number of the given number of bits to the index of its set bit (with
+        bit k as 1 << k), or -1 if it does not have exactly one bit set. For 3 bits, 0b100 gives 2 and 0b101 gives -1.
+        :param bits: Number of bits of the binary numbers [int]
+        :return table: The index of the set bit of each binary number [1D numpy array of int]
+    """
+    table = np.full(1 << bits, -1, dtype=np.intp)
+    table[np.left_shift(1, np.arange(bits))] = np.arange(bits)
+    table.flags.writeable = False
+    return table
+
+
+@lru_cache(maxsize=None)
+def get_binary_rep(size=9):
+    """ Gets the binary representation of every value of a board, in the MSB order of the candidate lists. For a 9x9
+        board, 1 is 0b100000000 and 9 is 0b000000001
+        :param size: Number of values, 9 for 9x9 boards [int]
+        :return binary_rep: The binary representation of the values 1 to size [tuple of int]
+    """
+    return tuple(1 << (size - value) for value in range(1, size + 1))
+
+
+@lru_cache(maxsize=None)
+def get_binary_to_real(size=9):
+    """ Gets the mapping from the binary representation of every value of a board back to the value. The mapping is
+        shared between callers and must not be modified
+        :param size: Number of values, 9 for 9x9 boards [int]
+        :return binary_to_real: The value of each binary representation [dict of int to int]
+    """
+    return {binary: value for value, binary in enumerate(get_binary_rep(size), 1)}
@@ -0,0 +1,134 @@
+# Streaming reading and writing of sudoku puzzle files with one puzzle per line
+
+import os
+import sys
+import gzip
+import numpy as np
+
+from sudoku_indices import value_characters
+
+# Character code of each value, from 0 (written as '0') up to the largest value of value_characters
+character_codes = np.frombuffer(("0" + value_characters).encode(), dtype=np.uint8)
+
+# Value of each character code, 255 for characters that are not values. Blanks are '0' or '.', and letters for the
+# values past 9 can be either case
+character_values = np.full(256, 255, dtype=np.uint8)
+character_values[character_codes] = np.arange(len(character_codes))
+lower_codes = np.frombuffer(value_characters[9:].lower().encode(), dtype=np.uint8)
+character_values[lower_codes] = np.arange(10, len(character_codes))
+character_values[ord(".")] = 0
+
+
+def open_puzzle_file(path, mode="r"):
+    """ Opens a puzzle file for streaming in binary mode. Files ending in .gz are (de)compressed on the fly, and '-' is
+        stdin or stdout
+        :param path: Path to the puzzle file, or '-' for stdin/stdout [string]
+        :param mode: 'r' to read or 'w' to write [string]
+        :return file: The opened file [binary file object]
+    """
+    if path == "-":
+        return sys.stdin.buffer if mode == "r" else sys.stdout.buffer
+    if str(path).endswith(".gz"):
+        return gzip.open(path, mode + "b")
+    return open(path, mode + "b")
+
+
+def parse_puzzle_line(line, block_size=3):
+    """ Converts a puzzle line into a board. The first field of the line (up to a space, tab, or comma) holds the
+        cells in row-major order, with '.' or '0' for blanks. Values past 9 are letters (see value_characters), ie
+        16x16 boards use 1-9 and A-G.
+        :param line: The puzzle line [bytes]
+        :param block_size: Size of a block, assuming square blocks [int]
+        :return board: The sudoku board state, with 0's as blanks [2D numpy array of uint8]
+    """
+    size = block_size * block_size
+    field = line.split(b",", 1)[0].split(None, 1)[0]
+    if len(field) != size * size:
+        raise ValueError("Puzzle line should have " + str(size * size) + " cells, found " + str(len(field)))
+
+    values = character_values[np.frombuffer(field, dtype=np.uint8)]
+    if np.any(values > size):
+        raise ValueError("Puzzle line has characters other than '.', '0', and the values 1 to " + str(size) + ": " +
+                         field.decode(errors="replace"))
+    return values.reshape(size, size)
+
+
+def read_puzzles(source, block_size=3):
+    """ Streams the boards of a puzzle file one line at a time, so that files of any size can be read in constant
+        memory. Blank lines and lines starting with '#' are skipped.
+        :param source: Path to the puzzle file, '-' for stdin, or an opened file [string or binary file object]
+        :param block_size: Size of a block, assuming square blocks [int]
+        :return: Generator of the sudoku board states, with 0's as blanks [2D numpy array of uint8]
+    """
+    puzzle_file = open_puzzle_file(source, "r") if isinstance(source, (str, os.PathLike)) else source
+    try:
+        for line_number, line in enumerate(puzzle_file, 1):
+            line = line.strip()
+            if not line or line.startswith(b"#"):
+                continue
+            try:
+                yield parse_puzzle_line(line, block_size)
+            except ValueError as error:
+                raise ValueError("Line " + str(line_number) + ": " + str(error)) from None
+    finally:
+        if isinstance(source, (str, os.PathLike)) and puzzle_file not in (sys.stdin.buffer, sys.stdout.buffer):
+            puzzle_file.close()
+
+
+def format_puzzle_line(board, blank="."):
+    """ Converts a board into a puzzle line, with letters for the values past 9 (see value_characters)
+        :param board: The sudoku board state, with 0's as blanks [2D numpy array of int]
+        :param blank: Character used for blank cells, '.' or '0' [string]
+        :return line: The puzzle line, without the line ending [bytes]
+    """
+    line = character_codes[np.asarray(board, dtype=np.intp).reshape(-1)].tobytes()
+    if blank != "0":
+        line = line.replace(b"0", blank.encode())
+    return line
+
+
+def write_puzzles(destination, boards, blank="."):
+    """ Streams boards into a puzzle file, one line per board
+        :param destination: Path to the puzzle file, '-' for stdout, or an opened file [string or binary file object]
+        :param boards: The sudoku board states, with 0's as blanks [iterable of 2D numpy array of int]
+        :param blank: Character used for blank cells, '.' or '0' [string]
+        :return count: Number of boards written [int]
+    """
+    puzzle_file = open_puzzle_file(destination, "w") if isinstance(destination, (str, os.PathLike)) else destination
+    count = 0
+    try:
+        for board in boards:
+            puzzle_file.write(format_puzzle_line(board, blank) + b"\n")
+            count += 1
+    finally:
+        if isinstance(destination, (str, os.PathLike)) and puzzle_file not in (sys.stdin.buffer, sys.stdout.buffer):
+            puzzle_file.close()
+        else:
+            puzzle_file.flush()
+    return count
+
+
+def pack_nibbles(cells):
+    """ Packs the cells of boards two to a byte, the first cell in the high nibble. An odd number of cells is padded
+        with a blank, so that a 9x9 board takes 41 bytes instead of 81. Only boards up to 9x9 fit, since a nibble holds
+        the values 0 to 15.
+        :param cells: The cells of each board, flattened in row-major order, with 0's as blanks [2D numpy array of int]
+        :return packed: The packed cells of each board [2D numpy array of uint8]
+    """
+    cells = np.asarray(cells, dtype=np.uint8)
+    if cells.shape[1] % 2:
+        cells = np.pad(cells, ((0, 0), (0, 1)))
+    return (cells[:, 0::2] << 4) | cells[:, 1::2]
+
+
+def unpack_nibbles(packed, num_cells):
+    """ Undoes pack_nibbles
+        :param packed: The packed cells of each board [2D numpy array of uint8]
+        :param num_cells: Number of cells in a board, 81 for 9x9 boards [int]
+        :return cells: The cells of each board, flattened in row-major order [2D numpy array of uint8]
+    """
+    packed = np.asarray(packed, dtype=np.uint8)
+    cells = np.empty((len(packed), 2 * packed.shape[1]), dtype=np.uint8)
+    cells[:, 0::2] = packed >> 4
+    cells[:, 1::2] = packed & 0x0F
+    return cells[:, :num_cells]
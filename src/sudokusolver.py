@@ -0,0 +1,434 @@
+# Command line entry point for solving sudoku puzzles without the GUI
+#
+# Usage (from the src directory):
+#   python -m sudokusolver solve puzzles.txt > solutions.txt
+#   cat puzzles.txt.gz | gunzip | python -m sudokusolver solve --backend dlx --workers 0
+#   python -m sudokusolver count generated.txt > counts.txt
+#   python -m sudokusolver rate puzzles.txt | sort -n -k 2 > rated.txt
+#   python -m sudokusolver generate -n 1000 --clues 26 --seed 1 --workers 0 > generated.txt
+#   python -m sudokusolver store puzzles.txt -o solutions.sdb --packed
+#   python -m sudokusolver solve --store solutions.sdb puzzles.txt > solutions.txt
+#
+# Only the solver and numpy are imported here, never PyQt5, pyautogui, or pytesseract, so that this can run on
+# headless servers.
+
+import os
+import sys
+import time
+import argparse
+from collections import deque
+import numpy as np
+
+from sudoku_io import read_puzzles, format_puzzle_line, open_puzzle_file
+from SudokuRecursiveSolver import SudokuRecursiveSolver, backends, rated_techniques
+from SudokuSolverStats import SudokuSolverStats
+
+
+def get_chunks(boards, chunk_size):
+    """ Groups a stream of boards into lists of at most chunk_size boards
+        :param boards: The sudoku board states [iterable of 2D numpy array of int]
+        :param chunk_size: Maximum number of boards in a chunk [int]
+        :return: Generator of the chunks [list of 2D numpy array of int]
+    """
+    chunk = []
+    for board in boards:
+        chunk.append(board)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def read_boards(args, kept=None):
+    """ Reads the boards of every input file in order
+        :param args: The parsed command line arguments [argparse.Namespace]
+        :param kept: Every board read is also appended here, if not None [deque or list]
+        :return: Generator of the boards [2D numpy array of int]
+    """
+    for path in args.files:
+        for board in read_puzzles(path, args.block_size):
+            if kept is not None:
+                kept.append(board)
+            yield board
+
+
+def process_boards(boards, args, stats, run_many, run_corpus, store_path=None, **settings):
+    """ Runs a batch method over a stream of boards, in this process or on a pool of worker processes
+        :param boards: The sudoku board states [iterable of 2D numpy array of int]
+        :param args: The parsed command line arguments [argparse.Namespace]
+        :param stats: The profiling counters of the solvers are added into these once every board is done, if not
+                      None [SudokuSolverStats]
+        :param run_many: Called with the solver and a chunk of boards in this process, such as to solve them with
+                         solve_many, returns the result of each board [function]
+        :param run_corpus: Called with the pool and the boards on several cores, such as to solve them with
+                           solve_corpus, returns the result of each board [function]
+        :param store_path: Path to a store of solved puzzles that are looked up instead of solved, None for no store
+                           [string]
+        :param settings: Settings of the pool, such as the backend (see SudokuPoolSolver)
+        :return: Generator of the result of each board, in the order of the boards
+    """
+    if args.workers == 1:
+        solver = SudokuRecursiveSolver()
+        if store_path is not None:
+
+            # Only needed when looking up solved puzzles
+            from SudokuSolutionCache import SudokuSolutionCache
+            from SudokuSolutionStore import SudokuSolutionStore
+
+            solver.set_solution_cache(SudokuSolutionCache(solution_store=SudokuSolutionStore(store_path),
+                                                          canonical=False))
+        for chunk in get_chunks(boards, args.chunk_size):
+            yield from run_many(solver, chunk)
+        if stats is not None:
+            stats.merge(solver.stats)
+        return
+
+    # Only needed when running on several cores
+    from SudokuPoolSolver import SudokuPoolSolver
+
+    workers = args.workers if args.workers > 0 else None
+    with SudokuPoolSolver(workers, args.chunk_size, args.block_size, store_path=store_path, **settings) as pool:
+        yield from run_corpus(pool, boards)
+        if stats is not None:
+            stats.merge(pool.stats)
+
+
+def solve_boards(boards, args, stats=None):
+    """ Solves a stream of boards, in this process or on a pool of worker processes
+        :param boards: The sudoku board states [iterable of 2D numpy array of int]
+        :param args: The parsed command line arguments [argparse.Namespace]
+        :param stats: The profiling counters of the solvers are added into these once every board is solved, if not
+                      None [SudokuSolverStats]
+        :return: Generator of the solved board and whether it was solved for each board [tuple]
+    """
+    finned = getattr(args, "finned", False)
+    return process_boards(boards, args, stats,
+                          lambda solver, chunk: zip(*solver.solve_many(chunk, args.block_size, args.backend,
+                                                                       finned=finned)),
+                          lambda pool, corpus: pool.solve_corpus(corpus),
+                          getattr(args, "store", None), backend=args.backend, finned=finned)
+
+
+def count_boards(boards, args, stats=None):
+    """ Counts the solutions of a stream of boards, in this process or on a pool of worker processes
+        :param boards: The sudoku board states [iterable of 2D numpy array of int]
+        :param args: The parsed command line arguments [argparse.Namespace]
+        :param stats: The profiling counters of the solvers are added into these once every board is counted, if not
+                      None [SudokuSolverStats]
+        :return: Generator of the number of solutions of each board, at most args.limit [int]
+    """
+    return process_boards(boards, args, stats,
+                          lambda solver, chunk: (int(count) for count in
+                                                 solver.count_many(chunk, args.limit, args.block_size, args.backend)),
+                          lambda pool, corpus: pool.count_corpus(corpus, args.limit), backend=args.backend)
+
+
+def rate_boards(boards, args, stats=None):
+    """ Rates the difficulty of a stream of boards, in this process or on a pool of worker processes
+        :param boards: The sudoku board states [iterable of 2D numpy array of int]
+        :param args: The parsed command line arguments [argparse.Namespace]
+        :param stats: The profiling counters of the solvers are added into these once every board is rated, if not
+                      None [SudokuSolverStats]
+        :return: Generator of the score, the strongest technique needed, and the number of guesses of each board [tuple]
+    """
+    def rate_many(solver, chunk):
+        for score, hardest, guesses in zip(*solver.rate_many(chunk, args.block_size, finned=args.finned)):
+            yield int(score), rated_techniques[hardest] if hardest >= 0 else None, int(guesses)
+
+    return process_boards(boards, args, stats, rate_many, lambda pool, corpus: pool.rate_corpus(corpus),
+                          finned=args.finned)
+
+
+def format_board(board, output_format):
+    """ Converts a solved board into its output form
+        :param board: The sudoku board state [2D numpy array of int]
+        :param output_format: 'line' for one board per line, or 'grid' for one row per line [string]
+        :return text: The board, including the line ending(s) [bytes]
+    """
+    if output_format == "grid":
+        rows = [" ".join(str(int(value)) for value in row) for row in board]
+        return ("\n".join(rows) + "\n\n").encode()
+    return format_puzzle_line(board) + b"\n"
+
+
+def run_batch(args, results, format_result, get_summary, kept=None):
+    """ Writes the output of every board of the input files in order, and reports the summary and the profiling
+        counters on stderr
+        :param args: The parsed command line arguments [argparse.Namespace]
+        :param results: Called with a stream of boards and the stats to add the profiling counters into, such as
+                        solve_boards, returns the result of each board [function]
+        :param format_result: Called with the result of a board, returns its output and whether it passed, such as
+                              whether it was solved [function]
+        :param get_summary: Called with the number of boards that passed, the number of boards, the elapsed time, and
+                            the throughput, returns the summary [function]
+        :param kept: Every board read is also appended here, if not None (see read_boards) [deque]
+        :return exit_code: 0 if every board passed, 1 otherwise [int]
+    """
+    output = open_puzzle_file(args.output, "w")
+    start = time.time()
+    total = 0
+    passed = 0
+    stats = SudokuSolverStats()
+
+    for result in results(read_boards(args, kept), stats):
+        text, is_passed = format_result(result)
+        output.write(text)
+        total += 1
+        passed += int(is_passed)
+
+    if args.output == "-":
+        output.flush()
+    else:
+        output.close()
+
+    elapsed = time.time() - start
+    rate = total / elapsed if elapsed > 0 else 0.0
+    if not args.quiet:
+        print(get_summary(passed, total, elapsed, rate), file=sys.stderr)
+    if args.stats:
+        print(stats, file=sys.stderr)
+    return 0 if passed == total else 1
+
+
+def run_solve(args):
+    """ Solves every puzzle of the input files and writes the solutions in the same order
+        :param args: The parsed command line arguments [argparse.Namespace]
+        :return exit_code: 0 if every puzzle was solved, 1 otherwise [int]
+    """
+    return run_batch(args, lambda boards, stats: solve_boards(boards, args, stats),
+                     lambda result: (format_board(result[0], args.format), result[1]),
+                     lambda solved, total, elapsed, rate: "Solved " + str(solved) + "/" + str(total) + " puzzles in " +
+                     format(elapsed, ".3f") + " s (" + format(rate, ".1f") + " puzzles/s)")
+
+
+def run_count(args):
+    """ Counts the solutions of every puzzle of the input files, up to the limit, and writes one count per line in the
+        same order
+        :param args: The parsed command line arguments [argparse.Namespace]
+        :return exit_code: 0 if every puzzle has a unique solution, 1 otherwise [int]
+    """
+    if args.limit < 1:
+        raise ValueError("The solution limit should be at least 1, not " + str(args.limit))
+
+    return run_batch(args, lambda boards, stats: count_boards(boards, args, stats),
+                     lambda count: (str(count).encode() + b"\n", count == 1),
+                     lambda unique, total, elapsed, rate: str(unique) + "/" + str(total) + " puzzles have a unique "
+                     "solution, checked in " + format(elapsed, ".3f") + " s (" + format(rate, ".1f") + " puzzles/s)")
+
+
+def run_rate(args):
+    """ Rates the difficulty of every puzzle of the input files, and writes each puzzle followed by its score, the
+        strongest technique it needs, and its number of guesses, in the same order
+        :param args: The parsed command line arguments [argparse.Namespace]
+        :return exit_code: 0 if every puzzle could be rated, 1 otherwise [int]
+    """
+
+    # The boards are kept until their rating comes back, so that each line can start with its puzzle
+    boards = deque()
+
+    def format_rating(rating):
+        score, hardest, guesses = rating
+        line = format_puzzle_line(boards.popleft()) + b" " + str(score).encode() + b" " + str(hardest).encode()
+        return line + b" " + str(guesses).encode() + b"\n", score >= 0
+
+    return run_batch(args, lambda read, stats: rate_boards(read, args, stats), format_rating,
+                     lambda rated, total, elapsed, rate: "Rated " + str(rated) + "/" + str(total) + " puzzles in " +
+                     format(elapsed, ".3f") + " s (" + format(rate, ".1f") + " puzzles/s)", boards)
+
+
+def run_generate(args):
+    """ Generates puzzles with a unique solution and writes them one per line, followed by their solution if asked
+        :param args: The parsed command line arguments [argparse.Namespace]
+        :return exit_code: 0 [int]
+    """
+    # Only needed when generating puzzles
+    from SudokuGenerator import SudokuGenerator
+
+    generator = SudokuGenerator(args.seed, args.block_size, args.backend)
+    output = open_puzzle_file(args.output, "w")
+    start = time.time()
+    total = 0
+    clues = 0
+
+    workers = args.workers if args.workers > 0 else None
+    for puzzle, solution in generator.generate_many(args.number, args.clues, args.attempts, workers):
+        line = format_puzzle_line(puzzle)
+        if args.solutions:
+            line += b" " + format_puzzle_line(solution)
+        output.write(line + b"\n")
+        total += 1
+        clues += int(np.count_nonzero(puzzle))
+
+    if args.output == "-":
+        output.flush()
+    else:
+        output.close()
+
+    elapsed = time.time() - start
+    rate = total / elapsed if elapsed > 0 else 0.0
+    if not args.quiet:
+        average = clues / total if total > 0 else 0.0
+        print("Generated " + str(total) + " puzzles with " + format(average, ".1f") + " clues on average (seed " +
+              str(generator.seed) + ") in " + format(elapsed, ".3f") + " s (" + format(rate, ".1f") + " puzzles/s)",
+              file=sys.stderr)
+    return 0
+
+
+def run_store(args):
+    """ Solves every puzzle of the input files and writes the solved ones into a store of solved puzzles
+        :param args: The parsed command line arguments [argparse.Namespace]
+        :return exit_code: 0 if every puzzle was solved, 1 otherwise [int]
+    """
+    # Only needed when writing a store
+    from SudokuSolutionStore import SudokuSolutionStore
+
+    start = time.time()
+    puzzles = []
+    solutions = []
+    solved = []
+
+    for solution, is_solved in solve_boards(read_boards(args, puzzles), args):
+        solutions.append(solution)
+        solved.append(is_solved)
+
+    # Only the solved puzzles are stored
+    size = args.block_size * args.block_size
+    total = len(solved)
+    solved_count = sum(solved)
+    solved = np.array(solved, dtype=bool)
+    puzzles = np.array(puzzles, dtype=np.uint8).reshape(-1, size, size)[solved]
+    solutions = np.array(solutions, dtype=np.uint8).reshape(-1, size, size)[solved]
+    if args.append and os.path.exists(args.output):
+        with SudokuSolutionStore(args.output) as store:
+            if store.block_size != args.block_size:
+                raise ValueError(args.output + " holds boards with a block size of " + str(store.block_size))
+            old_puzzles, old_solutions = store.get_records()
+            puzzles = np.concatenate((old_puzzles, puzzles))
+            solutions = np.concatenate((old_solutions, solutions))
+    count = SudokuSolutionStore.write(args.output, puzzles, solutions, args.block_size, args.packed)
+
+    elapsed = time.time() - start
+    if not args.quiet:
+        print("Stored " + str(count) + " solved puzzles (" + str(solved_count) + "/" + str(total) + " solved from "
+              "the input) in " + format(elapsed, ".3f") + " s", file=sys.stderr)
+    return 0 if solved_count == total else 1
+
+
+def get_parser():
+    """ Creates the command line argument parser
+        :return parser: The parser with one sub-command per action [argparse.ArgumentParser]
+    """
+    parser = argparse.ArgumentParser(prog="sudokusolver", description="Headless sudoku solver")
+    subparsers = parser.add_subparsers(dest="command")
+    subparsers.required = True
+
+    solve_parser = subparsers.add_parser("solve", help="Solve puzzles with one puzzle per line ('.' or '0' for "
+                                                       "blanks). Files ending in .gz are decompressed on the fly")
+    solve_parser.add_argument("files", nargs="*", default=["-"], help="Puzzle files, '-' or none for stdin")
+    solve_parser.add_argument("-o", "--output", default="-", help="Output file, '-' for stdout (default)")
+    solve_parser.add_argument("-b", "--backend", choices=backends, default=None,
+                              help="Solving engine, bitboard up to 16x16 boards and dlx past that by default")
+    solve_parser.add_argument("-w", "--workers", type=int, default=1,
+                              help="Worker processes, 1 to solve in this process (default), 0 for all cores")
+    solve_parser.add_argument("-f", "--format", choices=["line", "grid"], default="line",
+                              help="Output one solution per line (default), or one row per line")
+    solve_parser.add_argument("--chunk-size", type=int, default=256, help="Puzzles handed to the solver at a time")
+    solve_parser.add_argument("--block-size", type=int, default=3, help="Size of a block, 3 for 9x9 boards")
+    solve_parser.add_argument("-q", "--quiet", action="store_true", help="Do not report the throughput on stderr")
+    solve_parser.add_argument("--stats", action="store_true",
+                              help="Report the calls, eliminations, and time of every technique on stderr")
+    solve_parser.add_argument("--store", default=None,
+                              help="Store of solved puzzles (see the store command) to look puzzles up in first")
+    solve_parser.add_argument("--finned", action="store_true",
+                              help="Search for finned X-wings, swordfish, and jellyfish before guessing")
+    solve_parser.set_defaults(function=run_solve)
+
+    count_parser = subparsers.add_parser("count", help="Count the solutions of each puzzle up to a limit, such as to "
+                                                       "check that every puzzle has a unique solution")
+    count_parser.add_argument("files", nargs="*", default=["-"], help="Puzzle files, '-' or none for stdin")
+    count_parser.add_argument("-o", "--output", default="-", help="Output file, '-' for stdout (default)")
+    count_parser.add_argument("-b", "--backend", choices=backends, default=None,
+                              help="Search engine, bitboard up to 16x16 boards and dlx past that by default")
+    count_parser.add_argument("-w", "--workers", type=int, default=1,
+                              help="Worker processes, 1 to count in this process (default), 0 for all cores")
+    count_parser.add_argument("-l", "--limit", type=int, default=2,
+                              help="Stop searching a puzzle once this many solutions are found (default 2)")
+    count_parser.add_argument("--chunk-size", type=int, default=256, help="Puzzles handed to the solver at a time")
+    count_parser.add_argument("--block-size", type=int, default=3, help="Size of a block, 3 for 9x9 boards")
+    count_parser.add_argument("-q", "--quiet", action="store_true", help="Do not report the summary on stderr")
+    count_parser.add_argument("--stats", action="store_true",
+                              help="Report the recursion nodes and search time on stderr")
+    count_parser.set_defaults(function=run_count)
+
+    store_parser = subparsers.add_parser("store", help="Solve puzzles and write them into a store of solved puzzles, "
+                                                       "which solve --store looks puzzles up in")
+    store_parser.add_argument("files", nargs="*", default=["-"], help="Puzzle files, '-' or none for stdin")
+    store_parser.add_argument("-o", "--output", required=True, help="Store file")
+    store_parser.add_argument("-b", "--backend", choices=backends, default=None,
+                              help="Solving engine, bitboard up to 16x16 boards and dlx past that by default")
+    store_parser.add_argument("-w", "--workers", type=int, default=1,
+                              help="Worker processes, 1 to solve in this process (default), 0 for all cores")
+    store_parser.add_argument("--chunk-size", type=int, default=256, help="Puzzles handed to the solver at a time")
+    store_parser.add_argument("--block-size", type=int, default=3, help="Size of a block, 3 for 9x9 boards")
+    store_parser.add_argument("--packed", action="store_true",
+                              help="Pack the cells two to a byte (41 bytes instead of 81 for 9x9 boards)")
+    store_parser.add_argument("--append", action="store_true",
+                              help="Keep the puzzles already in the store file, if it exists")
+    store_parser.add_argument("-q", "--quiet", action="store_true", help="Do not report the summary on stderr")
+    store_parser.set_defaults(function=run_store)
+
+    rate_parser = subparsers.add_parser("rate", help="Rate the difficulty of each puzzle from the strongest technique "
+                                                     "it needs and its number of guesses. Writes the puzzle, the "
+                                                     "score, the technique, and the guesses on each line")
+    rate_parser.add_argument("files", nargs="*", default=["-"], help="Puzzle files, '-' or none for stdin")
+    rate_parser.add_argument("-o", "--output", default="-", help="Output file, '-' for stdout (default)")
+    rate_parser.add_argument("-w", "--workers", type=int, default=1,
+                             help="Worker processes, 1 to rate in this process (default), 0 for all cores")
+    rate_parser.add_argument("--chunk-size", type=int, default=256, help="Puzzles handed to the solver at a time")
+    rate_parser.add_argument("--block-size", type=int, default=3, help="Size of a block, 3 for 9x9 boards")
+    rate_parser.add_argument("-q", "--quiet", action="store_true", help="Do not report the throughput on stderr")
+    rate_parser.add_argument("--stats", action="store_true",
+                             help="Report the calls, eliminations, and time of every technique on stderr")
+    rate_parser.add_argument("--finned", action="store_true",
+                             help="Try finned X-wings, swordfish, and jellyfish before guessing")
+    rate_parser.set_defaults(function=run_rate)
+
+    generate_parser = subparsers.add_parser("generate", help="Generate puzzles with a unique solution, one per line")
+    generate_parser.add_argument("-n", "--number", type=int, default=1, help="Number of puzzles (default 1)")
+    generate_parser.add_argument("-c", "--clues", type=int, default=None,
+                                 help="Number of clues to aim for, as few as possible if not given")
+    generate_parser.add_argument("-s", "--seed", type=int, default=None,
+                                 help="Seed of the puzzles, random if not given (it is reported on stderr)")
+    generate_parser.add_argument("-a", "--attempts", type=int, default=10,
+                                 help="Full grids tried per puzzle to reach the number of clues (default 10)")
+    generate_parser.add_argument("-o", "--output", default="-", help="Output file, '-' for stdout (default)")
+    generate_parser.add_argument("-b", "--backend", choices=["bitboard", "dlx"], default=None,
+                                 help="Engine of the uniqueness checks, bitboard up to 16x16 boards and dlx past "
+                                      "that by default")
+    generate_parser.add_argument("-w", "--workers", type=int, default=1,
+                                 help="Worker processes, 1 to generate in this process (default), 0 for all cores")
+    generate_parser.add_argument("--block-size", type=int, default=3, help="Size of a block, 3 for 9x9 boards")
+    generate_parser.add_argument("--solutions", action="store_true",
+                                 help="Write the solution after each puzzle, separated by a space")
+    generate_parser.add_argument("-q", "--quiet", action="store_true", help="Do not report the summary on stderr")
+    generate_parser.set_defaults(function=run_generate)
+
+    return parser
+
+
+def main(argv=None):
+    """ Parses the command line and runs the requested sub-command
+        :param argv: The command line arguments, sys.argv[1:] if None [list of string]
+        :return exit_code: The exit code of the sub-command [int]
+    """
+    args = get_parser().parse_args(argv)
+    try:
+        return args.function(args)
+    except ValueError as error:
+        print("sudokusolver: error: " + str(error), file=sys.stderr)
+        return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,394 @@
+# Benchmark of the current sudoku solver and of the historical solver versions over graded corpora
+#
+# Usage (from the test_scripts directory):
+#   python benchmark.py --output results.json
+#   python benchmark.py --solvers bitboard dlx --corpora 17_clue pathological --compare results.json
+#
+# Every (solver, corpus) pair runs in a child process, so that a solver stuck on a puzzle can be stopped once it
+# reaches the per-puzzle timeout. Puzzles that time out, or are not solved correctly, are reported as DNF and are
+# left out of the latencies. The p99 latency is only reported for corpora of at least 100 solved puzzles, such as the
+# generated corpora, as it would only be the slowest solve of the smaller hand-picked corpora.
+
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import subprocess
+import numpy as np
+from multiprocessing import Process, Pipe
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from sudoku_boards import board, board_17_clue, board_pathological
+
+# Graded corpora, from the technique examples to puzzles built to defeat brute force
+corpora = {
+    "easy": [board[0], board[7], board[8]],
+    "advanced": board[1:7],
+    "17_clue": board_17_clue,
+    "pathological": board_pathological,
+}
+
+# Corpora made by the seeded generator, graded by their number of clues, which are made when they are benchmarked
+generated_corpora = {"generated_40": 40, "generated_30": 30, "generated_24": 24}
+generated_seed = 2024
+
+# Smallest number of solved puzzles for which the p99 latency is reported
+min_tail_puzzles = 100
+
+solver_names = ["bitboard", "dlx", "string", "v1", "v2", "v3", "v4", "v5"]
+
+
+########################################################################################################################
+# Corpora
+########################################################################################################################
+
+def check_unique(corpus_name, boards):
+    """ Checks that every puzzle of a corpus has a single solution, as a puzzle with several solutions can be solved
+        in very different times depending on which solution the solver finds first
+        :param corpus_name: Name of the corpus [string]
+        :param boards: The sudoku board states of the corpus [list of 2D numpy array of int]
+        :return: None
+    """
+    from SudokuDancingLinksSolver import SudokuDancingLinksSolver
+    dancing_links_solver = SudokuDancingLinksSolver()
+    for k, game_board in enumerate(boards):
+        dancing_links_solver.load_board(game_board)
+        if dancing_links_solver.count_solutions(2) != 1:
+            raise ValueError("Puzzle " + str(k) + " of the " + corpus_name + " corpus does not have a unique solution")
+
+
+def get_corpus(corpus_name, generated_size=200):
+    """ Gets the puzzles of a corpus, and checks that they all have a unique solution
+        :param corpus_name: Name of the corpus, one of corpora or generated_corpora [string]
+        :param generated_size: Number of puzzles of the generated corpora [int]
+        :return boards: The sudoku board states of the corpus [list of 2D numpy array of int]
+    """
+    if corpus_name in generated_corpora:
+        from SudokuGenerator import SudokuGenerator
+        generator = SudokuGenerator(generated_seed)
+        boards = [puzzle.astype(int) for puzzle, _ in
+                  generator.generate_many(generated_size, generated_corpora[corpus_name], max_attempts=1, workers=None)]
+    else:
+        boards = corpora[corpus_name]
+    check_unique(corpus_name, boards)
+    return boards
+
+
+########################################################################################################################
+# Solvers
+########################################################################################################################
+
+def get_solve_function(solver_name):
+    """ Creates the solver and wraps it into a function that solves a single board. Imports are done here so that the
+        child process only loads the solver it benchmarks
+        :param solver_name: Name of the solver, one of solver_names [string]
+        :return solve: Function that takes a board and returns its solution, or None [function]
+    """
+    if solver_name in ("bitboard", "dlx", "string"):
+        from SudokuRecursiveSolver import SudokuRecursiveSolver
+        solver = SudokuRecursiveSolver()
+
+        def solve(game_board):
+            solver.load_board(game_board, backend=solver_name)
+            return solver.solution if solver.solve_sudoku() else None
+
+    elif solver_name == "v1":
+        import sudoku_base_solver
+
+        def solve(game_board):
+            return sudoku_base_solver.recursive_solve(game_board.copy())
+
+    elif solver_name == "v2":
+        import sudoku_base_solver_v2
+
+        def solve(game_board):
+            solution = game_board.copy()
+            return solution if sudoku_base_solver_v2.recursive_solve(solution, 0, 0, -1) else None
+
+    elif solver_name in ("v3", "v4", "v5"):
+        from sudoku_base_solver_v3 import SudokuRecursiveSolver3
+        from sudoku_base_solver_v4 import SudokuRecursiveSolver4
+        from sudoku_base_solver_v5 import SudokuRecursiveSolver5
+        solver_class = {"v3": SudokuRecursiveSolver3, "v4": SudokuRecursiveSolver4, "v5": SudokuRecursiveSolver5}
+        solver = solver_class[solver_name]()
+
+        def solve(game_board):
+            solver.load_board(game_board)
+            solver.solve_sudoku()
+            return solver.solution
+
+    else:
+        raise ValueError("Unknown solver '" + str(solver_name) + "', expected one of " + str(solver_names))
+
+    return solve
+
+
+def is_valid_solution(game_board, solution):
+    """ Checks a solution independently of the solvers: every given is kept, and every row, column, and block holds
+        each value exactly once
+        :param game_board: The sudoku board state, with 0's as blanks [2D numpy array of int]
+        :param solution: The solved board state, or None [2D numpy array of int]
+        :return bool: True if the solution solves the board, False otherwise
+    """
+    if solution is None:
+        return False
+    solution = np.asarray(solution, dtype=int)
+    game_board = np.asarray(game_board, dtype=int)
+    if solution.shape != (9, 9) or np.any((game_board != 0) & (game_board != solution)):
+        return False
+
+    blocks = solution.reshape(3, 3, 3, 3).transpose(0, 2, 1, 3).reshape(9, 9)
+    expected = np.arange(1, 10)
+    for units in (solution, solution.T, blocks):
+        if np.any(np.sort(units, axis=1) != expected):
+            return False
+    return True
+
+
+def run_solver(solver_name, boards, repeat, connection):
+    """ Child process that solves the boards in order and sends back one result per solve, as soon as it is done
+        :param solver_name: Name of the solver, one of solver_names [string]
+        :param boards: The sudoku board states to solve [list of 2D numpy array of int]
+        :param repeat: Number of times each board is solved [int]
+        :param connection: Sending end of the pipe to the parent process [Connection]
+        :return: None
+    """
+
+    # The older versions print their progress, which would only measure the terminal
+    sys.stdout = open(os.devnull, "w")
+    solve = get_solve_function(solver_name)
+
+    for game_board in boards:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            solution = solve(np.array(game_board))
+            latency = time.perf_counter() - start
+            connection.send((latency, is_valid_solution(game_board, solution)))
+    connection.close()
+
+
+########################################################################################################################
+# Benchmark
+########################################################################################################################
+
+def receive_puzzle(receiver, repeat, timeout):
+    """ Waits for the solves of a single puzzle from the child process
+        :param receiver: Receiving end of the pipe from the child process [Connection]
+        :param repeat: Number of times the puzzle is solved [int]
+        :param timeout: Time allowed for a single solve in seconds [float]
+        :return status: 'solved', 'failed' if a solution was wrong or the child died, or 'timeout' [string]
+        :return latencies: The latencies of the solves of the puzzle in seconds [list of float]
+    """
+    latencies = []
+    for _ in range(repeat):
+        if not receiver.poll(timeout):
+            return "timeout", latencies
+        try:
+            latency, is_valid = receiver.recv()
+        except EOFError:
+            return "failed", latencies
+        if not is_valid:
+            return "failed", latencies
+        latencies.append(latency)
+    return "solved", latencies
+
+
+def benchmark(solver_name, boards, timeout, repeat):
+    """ Solves a corpus with a solver in a child process. When a puzzle reaches the timeout or fails, the child is
+        stopped and a new one carries on with the next puzzle
+        :param solver_name: Name of the solver, one of solver_names [string]
+        :param boards: The sudoku board states of the corpus [list of 2D numpy array of int]
+        :param timeout: Time allowed for a single solve in seconds [float]
+        :param repeat: Number of times each board is solved [int]
+        :return result: The latency statistics and puzzle counts of the corpus [dict]
+    """
+    latencies = []
+    timeouts = 0
+    failures = 0
+
+    k = 0
+    while k < len(boards):
+        receiver, sender = Pipe(duplex=False)
+        process = Process(target=run_solver, args=(solver_name, boards[k:], repeat, sender), daemon=True)
+        process.start()
+        sender.close()
+
+        # The first puzzle also pays for the imports and set up of the child, so it is given more time
+        wait = 2 * timeout
+        status = "solved"
+        while k < len(boards) and status == "solved":
+            status, puzzle_latencies = receive_puzzle(receiver, repeat, wait)
+            wait = timeout
+            k += 1
+            if status == "solved":
+                latencies.extend(puzzle_latencies)
+            elif status == "failed":
+                failures += 1
+            else:
+                timeouts += 1
+
+        if process.is_alive():
+            process.terminate()
+        process.join()
+        receiver.close()
+
+    return get_summary(latencies, len(boards), timeouts, failures)
+
+
+def get_summary(latencies, puzzles, timeouts, failures):
+    """ Summarises the latencies of a corpus
+        :param latencies: The latencies of the successful solves in seconds [list of float]
+        :param puzzles: Number of puzzles in the corpus [int]
+        :param timeouts: Number of puzzles that reached the timeout [int]
+        :param failures: Number of puzzles that were not solved correctly [int]
+        :return result: The latency statistics and puzzle counts of the corpus [dict]
+    """
+    result = {
+        "puzzles": puzzles,
+        "solved": puzzles - timeouts - failures,
+        "timeouts": timeouts,
+        "failures": failures,
+        "solves": len(latencies),
+        "median_ms": None,
+        "p99_ms": None,
+        "puzzles_per_second": None,
+    }
+    if latencies:
+        latencies = np.array(latencies)
+        result["median_ms"] = float(np.median(latencies) * 1000)
+        if result["solved"] >= min_tail_puzzles:
+            result["p99_ms"] = float(np.percentile(latencies, 99) * 1000)
+        result["puzzles_per_second"] = float(len(latencies) / latencies.sum()) if latencies.sum() > 0 else None
+    return result
+
+
+def get_metadata(args):
+    """ Gets the environment of the benchmark, so that results of different commits and machines can be told apart
+        :param args: The parsed command line arguments [argparse.Namespace]
+        :return metadata: The commit, versions, time, and settings of the benchmark [dict]
+    """
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "timeout": args.timeout,
+        "repeat": args.repeat,
+        "generated_size": args.generated_size,
+        "generated_seed": generated_seed,
+    }
+
+
+########################################################################################################################
+# Reporting
+########################################################################################################################
+
+def format_value(value, spec, missing="DNF"):
+    """ Formats a statistic, which is None when nothing was solved
+        :param value: The statistic [float or None]
+        :param spec: The format specification [string]
+        :param missing: Text of a statistic that is None [string]
+        :return text: The formatted statistic, or the missing text [string]
+    """
+    return missing if value is None else format(value, spec)
+
+
+def print_results(results):
+    """ Prints a table of the results, one line per (solver, corpus) pair
+        :param results: The results of each solver and corpus [dict of dict of dict]
+        :return: None
+    """
+    print("{:<10} {:<13} {:>8} {:>12} {:>12} {:>12}".format("solver", "corpus", "solved", "median ms", "p99 ms",
+                                                             "puzzles/s"))
+    for solver_name, solver_results in results.items():
+        for corpus_name, result in solver_results.items():
+            print("{:<10} {:<13} {:>8} {:>12} {:>12} {:>12}".format(
+                solver_name, corpus_name, str(result["solved"]) + "/" + str(result["puzzles"]),
+                format_value(result["median_ms"], ".3f"),
+                format_value(result["p99_ms"], ".3f", "DNF" if result["median_ms"] is None else "-"),
+                format_value(result["puzzles_per_second"], ".1f")))
+
+
+def print_comparison(results, baseline):
+    """ Prints the ratios of the results over the results of an earlier run. Ratios above 1 for the latencies (or
+        below 1 for the throughput) are regressions
+        :param results: The results of each solver and corpus [dict of dict of dict]
+        :param baseline: The saved benchmark to compare against [dict]
+        :return: None
+    """
+    print()
+    print("Compared to commit " + str(baseline["metadata"].get("commit")) + " (" +
+          str(baseline["metadata"].get("timestamp")) + ")")
+    print("{:<10} {:<13} {:>12} {:>12} {:>12}".format("solver", "corpus", "median x", "p99 x", "puzzles/s x"))
+    for solver_name, solver_results in results.items():
+        for corpus_name, result in solver_results.items():
+            old = baseline["results"].get(solver_name, {}).get(corpus_name)
+            if old is None:
+                continue
+            ratios = []
+            for key in ("median_ms", "p99_ms", "puzzles_per_second"):
+                if result[key] is None or not old[key]:
+                    ratios.append("-")
+                else:
+                    ratios.append(format(result[key] / old[key], ".2f"))
+            print("{:<10} {:<13} {:>12} {:>12} {:>12}".format(solver_name, corpus_name, *ratios))
+
+
+def get_parser():
+    """ Creates the command line argument parser
+        :return parser: The parser of the benchmark options [argparse.ArgumentParser]
+    """
+    parser = argparse.ArgumentParser(description="Benchmark of the sudoku solvers over graded corpora")
+    parser.add_argument("--solvers", nargs="+", choices=solver_names, default=solver_names,
+                        help="Solvers to benchmark, all by default")
+    corpus_names = list(corpora) + list(generated_corpora)
+    parser.add_argument("--corpora", nargs="+", choices=corpus_names, default=corpus_names,
+                        help="Corpora to solve, all by default")
+    parser.add_argument("--generated-size", type=int, default=200, help="Number of puzzles of the generated corpora")
+    parser.add_argument("--timeout", type=float, default=10.0, help="Time allowed for a single solve in seconds")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of times each puzzle is solved")
+    parser.add_argument("-o", "--output", help="JSON file to save the results to")
+    parser.add_argument("--compare", help="JSON file of an earlier run to compare the results with")
+    return parser
+
+
+def main(argv=None):
+    """ Runs the benchmark
+        :param argv: The command line arguments, sys.argv[1:] if None [list of string]
+        :return: None
+    """
+    args = get_parser().parse_args(argv)
+    if args.timeout <= 0 or args.repeat < 1:
+        raise ValueError("The timeout should be positive and the puzzles should be solved at least once")
+    if args.generated_size < 1:
+        raise ValueError("The generated corpora should have at least 1 puzzle")
+
+    boards = {corpus_name: get_corpus(corpus_name, args.generated_size) for corpus_name in args.corpora}
+    results = {}
+    for solver_name in args.solvers:
+        results[solver_name] = {}
+        for corpus_name in args.corpora:
+            results[solver_name][corpus_name] = benchmark(solver_name, boards[corpus_name], args.timeout, args.repeat)
+    print_results(results)
+
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump({"metadata": get_metadata(args), "results": results}, output, indent=2)
+
+    if args.compare:
+        with open(args.compare) as baseline:
+            print_comparison(results, json.load(baseline))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# Check that boards which give a value twice in a row, col, or block are rejected by every backend before they are
+# solved, and that the batch methods record them as not valid and carry on
+#
+# Usage (from the test_scripts directory):
+#   python invalid_board_check.py
+
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from SudokuRecursiveSolver import SudokuRecursiveSolver, backends
+from SudokuSolutionCache import SudokuSolutionCache
+from sudoku_boards import board
+
+
+def get_conflicting_boards():
+    """ Makes boards that give a value twice in a row, in a col, and in a block, from a solved board
+        :return boards: The name and board of each case [list of tuple of string and 2D numpy array of int]
+    """
+    solver = SudokuRecursiveSolver()
+    solver.load_board(board[0])
+    assert solver.solve_sudoku()
+    solution = solver.solution.astype(int)
+
+    # A full board with two of the same value in row 0, and the same board with one blank left
+    full_row = solution.copy()
+    full_row[0, 1] = full_row[0, 0]
+    blank_row = full_row.copy()
+    blank_row[8, 8] = 0
+
+    # A value given twice in col 0, or in block 0 only
+    col = np.zeros((9, 9), dtype=int)
+    col[0, 0] = col[5, 0] = 7
+    block = np.zeros((9, 9), dtype=int)
+    block[0, 0] = block[1, 1] = 3
+    return [("full row", full_row), ("row with a blank", blank_row), ("col", col), ("block", block)]
+
+
+def check_rejected():
+    """ Checks that load_board raises a ValueError for every conflicting board on every backend, and that nothing is
+        put in the solution cache
+        :return: None
+    """
+    for name, game_board in get_conflicting_boards():
+        for backend in backends:
+            solver = SudokuRecursiveSolver()
+            solver.set_solution_cache(SudokuSolutionCache())
+            try:
+                solver.load_board(game_board, 3, backend)
+            except ValueError as error:
+                print(name, backend + ":", error)
+            else:
+                raise AssertionError(backend + " accepted a board with a repeated value in a " + name)
+            assert len(solver.solution_cache) == 0
+
+
+def check_batches():
+    """ Checks that the batch methods record the conflicting boards as not valid, and still solve the valid boards
+        around them
+        :return: None
+    """
+    conflicting = [game_board for _, game_board in get_conflicting_boards()]
+    boards = [board[0]] + conflicting + [board[1]]
+    expected = [True] + [False] * len(conflicting) + [True]
+
+    solver = SudokuRecursiveSolver()
+    for backend in backends:
+        solutions, status = solver.solve_many(boards, backend=backend)
+        assert status.tolist() == expected, backend
+        assert not np.any(solutions[1:-1]), backend
+        counts = solver.count_many(boards, backend=backend)
+        assert counts.tolist() == [1] + [-1] * len(conflicting) + [1], backend
+
+    scores = solver.rate_many(boards)[0]
+    assert np.all(scores[1:-1] == -1) and scores[0] >= 0 and scores[-1] >= 0
+
+
+if __name__ == "__main__":
+    check_rejected()
+    check_batches()
+    print("ok")
@@ -0,0 +1,118 @@
+# Smoke check of the solver on the largest boards, and of the boards that are too large for it
+#
+# Usage (from the test_scripts directory):
+#   python large_board_smoke.py
+
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from SudokuRecursiveSolver import SudokuRecursiveSolver, backends, backend_max_sizes
+from SudokuDancingLinksSolver import SudokuDancingLinksSolver
+from SudokuCompactBoard import SudokuCompactBoard
+
+
+def make_puzzle(block_size, blank_share, seed=0):
+    """ Makes a puzzle by blanking random cells of a relabelled full grid
+        :param block_size: Size of a block, assuming square blocks [int]
+        :param blank_share: Share of the cells that are blanked [float]
+        :param seed: Seed of the random blanks and labels [int]
+        :return puzzle: The puzzle, with 0's as blanks [2D numpy array of int]
+        :return solution: The full grid [2D numpy array of int]
+    """
+    size = block_size * block_size
+    rng = np.random.default_rng(seed)
+
+    # The rows of a full grid are the first row shifted along within and across the bands
+    row = np.arange(size)
+    shifts = (row % block_size) * block_size + row // block_size
+    solution = (rng.permutation(size) + 1)[(row[np.newaxis, :] + shifts[:, np.newaxis]) % size]
+    puzzle = np.where(rng.random((size, size)) < blank_share, 0, solution)
+    return puzzle, solution
+
+
+def check_candidates(solver, solution):
+    """ Checks that the heuristic approaches never remove the value of the solution from a cell
+        :param solver: Solver with a board loaded [SudokuRecursiveSolver]
+        :param solution: The full grid [2D numpy array of int]
+        :return: None
+    """
+    solver.get_candidate_list()
+    solver.reset_dirty_units()
+    for solve_technique in (solver.solve_naked_singles, solver.solve_hidden_sets, solver.solve_pointing_sets,
+                            solver.solve_box_line_reduction, solver.solve_x_sword_jelly,
+                            solver.solve_finned_x_sword_jelly):
+        solve_technique()
+        blank = solver.board == 0
+        candidate_type = solver.candidate_list.dtype.type
+        solution_bits = np.left_shift(candidate_type(1), solver.rows - solution.astype(candidate_type))
+        assert np.all(solver.candidate_list[blank] & solution_bits[blank]), solve_technique.__name__
+        assert np.all(solver.board[~blank] == solution[~blank]), solve_technique.__name__
+
+
+def check_largest_boards():
+    """ Solves the largest board of each backend, and runs the heuristic approaches on it """
+    for backend in backends:
+        block_size = int(np.sqrt(backend_max_sizes[backend]))
+        puzzle, solution = make_puzzle(block_size, 0.5)
+        solver = SudokuRecursiveSolver()
+        solver.load_board(puzzle, block_size, backend)
+        check_candidates(solver, solution)
+
+        solver.load_board(puzzle, block_size, backend)
+        assert solver.solve_sudoku(), backend
+        assert np.all(solver.solution[puzzle > 0] == puzzle[puzzle > 0]), backend
+        print(backend, str(solver.rows) + "x" + str(solver.cols), "solved in", format(solver.solve_time, ".3f"), "s")
+
+    # Sparse 25x25 boards are left to exact cover
+    puzzle, solution = make_puzzle(5, 0.75)
+    dancing_links_solver = SudokuDancingLinksSolver()
+    dancing_links_solver.load_board(puzzle, 5)
+    assert dancing_links_solver.solve()
+
+
+def check_default_backend():
+    """ Checks that the batch methods solve, rate, and count 25x25 boards with the default backend, and that a backend
+        that is too small for them fails each board instead of the whole batch
+        :return: None
+    """
+    puzzles = [make_puzzle(5, 0.8, seed)[0] for seed in range(2)]
+    solver = SudokuRecursiveSolver()
+    solutions, status = solver.solve_many(puzzles, 5)
+    assert np.all(status) and np.all(solutions[0][puzzles[0] > 0] == puzzles[0][puzzles[0] > 0])
+    scores, hardest, guesses = solver.rate_many(puzzles, 5)
+    assert np.all(scores > 0), scores
+    assert np.all(solver.count_many(puzzles, 1, 5) == 1)
+    print("25x25 default backend: rated", scores.tolist())
+
+    solutions, status = solver.solve_many(puzzles, 5, "bitboard")
+    assert not np.any(status) and not np.any(solutions)
+    assert np.all(solver.count_many(puzzles, 2, 5, "string") == -1)
+
+
+def check_too_large_boards():
+    """ Checks that 36x36 boards are rejected by every backend with a ValueError, and that their compact board still
+        works with 64-bit candidate masks
+    """
+    puzzle, solution = make_puzzle(6, 0.6)
+    for backend in backends:
+        try:
+            SudokuRecursiveSolver().load_board(puzzle, 6, backend)
+        except ValueError as error:
+            print(backend, "36x36:", error)
+        else:
+            raise AssertionError(backend + " accepted a 36x36 board")
+
+    compact_board = SudokuCompactBoard.from_board(puzzle, 6)
+    compact_board.candidates[:, :] = np.left_shift(compact_board.candidates.dtype.type(1), 35)
+    assert compact_board.candidates.dtype == np.uint64
+    assert np.array_equal(SudokuCompactBoard.from_buffer(compact_board.to_bytes(), 6).values, puzzle)
+
+
+if __name__ == "__main__":
+    check_largest_boards()
+    check_default_backend()
+    check_too_large_boards()
+    print("ok")
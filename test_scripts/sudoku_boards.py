@@ -119,3 +119,111 @@ board8[6, :] = [0, 6, 0, 9, 0, 0, 0, 2, 0]
 board8[7, :] = [0, 8, 0, 0, 0, 2, 9, 3, 6]
 board8[8, :] = [9, 2, 4, 6, 0, 0, 5, 1, 0]
 board.append(board8)
+
+board_17_clue = []
+
+# Board ID: 17-clue example 1
+board_17_clue_0 = np.zeros((9, 9))
+board_17_clue_0[0, :] = [0, 0, 0, 0, 0, 0, 0, 1, 0]
+board_17_clue_0[1, :] = [4, 0, 0, 0, 0, 0, 0, 0, 0]
+board_17_clue_0[2, :] = [0, 2, 0, 0, 0, 0, 0, 0, 0]
+board_17_clue_0[3, :] = [0, 0, 0, 0, 5, 0, 4, 0, 7]
+board_17_clue_0[4, :] = [0, 0, 8, 0, 0, 0, 3, 0, 0]
+board_17_clue_0[5, :] = [0, 0, 1, 0, 9, 0, 0, 0, 0]
+board_17_clue_0[6, :] = [3, 0, 0, 4, 0, 0, 2, 0, 0]
+board_17_clue_0[7, :] = [0, 5, 0, 1, 0, 0, 0, 0, 0]
+board_17_clue_0[8, :] = [0, 0, 0, 8, 0, 6, 0, 0, 0]
+board_17_clue.append(board_17_clue_0)
+
+# Board ID: 17-clue example 2
+board_17_clue_1 = np.zeros((9, 9))
+board_17_clue_1[0, :] = [0, 0, 0, 0, 0, 0, 0, 1, 0]
+board_17_clue_1[1, :] = [4, 0, 0, 0, 0, 0, 0, 0, 0]
+board_17_clue_1[2, :] = [0, 2, 0, 0, 0, 0, 0, 0, 0]
+board_17_clue_1[3, :] = [0, 0, 0, 0, 5, 0, 6, 0, 4]
+board_17_clue_1[4, :] = [0, 0, 8, 0, 0, 0, 3, 0, 0]
+board_17_clue_1[5, :] = [0, 0, 1, 0, 9, 0, 0, 0, 0]
+board_17_clue_1[6, :] = [3, 0, 0, 4, 0, 0, 2, 0, 0]
+board_17_clue_1[7, :] = [0, 5, 0, 1, 0, 0, 0, 0, 0]
+board_17_clue_1[8, :] = [0, 0, 0, 8, 0, 7, 0, 0, 0]
+board_17_clue.append(board_17_clue_1)
+
+# Board ID: 17-clue example 3
+board_17_clue_2 = np.zeros((9, 9))
+board_17_clue_2[0, :] = [0, 0, 0, 0, 0, 0, 0, 1, 2]
+board_17_clue_2[1, :] = [0, 0, 0, 0, 3, 5, 0, 0, 0]
+board_17_clue_2[2, :] = [0, 0, 0, 6, 0, 0, 0, 7, 0]
+board_17_clue_2[3, :] = [7, 0, 0, 0, 0, 0, 3, 0, 0]
+board_17_clue_2[4, :] = [0, 0, 0, 4, 0, 0, 8, 0, 0]
+board_17_clue_2[5, :] = [1, 0, 0, 0, 0, 0, 0, 0, 0]
+board_17_clue_2[6, :] = [0, 0, 0, 1, 2, 0, 0, 0, 0]
+board_17_clue_2[7, :] = [0, 8, 0, 0, 0, 0, 0, 4, 0]
+board_17_clue_2[8, :] = [0, 5, 0, 0, 0, 0, 6, 0, 0]
+board_17_clue.append(board_17_clue_2)
+
+board_pathological = []
+
+# Board ID: Anti brute force (Wikipedia)
+board_pathological_0 = np.zeros((9, 9))
+board_pathological_0[0, :] = [0, 0, 0, 0, 0, 0, 0, 0, 0]
+board_pathological_0[1, :] = [0, 0, 0, 0, 0, 3, 0, 8, 5]
+board_pathological_0[2, :] = [0, 0, 1, 0, 2, 0, 0, 0, 0]
+board_pathological_0[3, :] = [0, 0, 0, 5, 0, 7, 0, 0, 0]
+board_pathological_0[4, :] = [0, 0, 4, 0, 0, 0, 1, 0, 0]
+board_pathological_0[5, :] = [0, 9, 0, 0, 0, 0, 0, 0, 0]
+board_pathological_0[6, :] = [5, 0, 0, 0, 0, 0, 0, 7, 3]
+board_pathological_0[7, :] = [0, 0, 2, 0, 1, 0, 0, 0, 0]
+board_pathological_0[8, :] = [0, 0, 0, 0, 4, 0, 0, 0, 9]
+board_pathological.append(board_pathological_0)
+
+# Board ID: Platinum Blonde
+board_pathological_1 = np.zeros((9, 9))
+board_pathological_1[0, :] = [0, 0, 0, 0, 0, 0, 0, 1, 2]
+board_pathological_1[1, :] = [0, 0, 0, 0, 0, 0, 0, 0, 3]
+board_pathological_1[2, :] = [0, 0, 2, 3, 0, 0, 4, 0, 0]
+board_pathological_1[3, :] = [0, 0, 1, 8, 0, 0, 0, 0, 5]
+board_pathological_1[4, :] = [0, 6, 0, 0, 7, 0, 8, 0, 0]
+board_pathological_1[5, :] = [0, 0, 0, 0, 0, 9, 0, 0, 0]
+board_pathological_1[6, :] = [0, 0, 8, 5, 0, 0, 0, 0, 0]
+board_pathological_1[7, :] = [9, 0, 0, 0, 4, 0, 5, 0, 0]
+board_pathological_1[8, :] = [4, 7, 0, 0, 0, 6, 0, 0, 0]
+board_pathological.append(board_pathological_1)
+
+# Board ID: Arto Inkala 2012
+board_pathological_2 = np.zeros((9, 9))
+board_pathological_2[0, :] = [8, 0, 0, 0, 0, 0, 0, 0, 0]
+board_pathological_2[1, :] = [0, 0, 3, 6, 0, 0, 0, 0, 0]
+board_pathological_2[2, :] = [0, 7, 0, 0, 9, 0, 2, 0, 0]
+board_pathological_2[3, :] = [0, 5, 0, 0, 0, 7, 0, 0, 0]
+board_pathological_2[4, :] = [0, 0, 0, 0, 4, 5, 7, 0, 0]
+board_pathological_2[5, :] = [0, 0, 0, 1, 0, 0, 0, 3, 0]
+board_pathological_2[6, :] = [0, 0, 1, 0, 0, 0, 0, 6, 8]
+board_pathological_2[7, :] = [0, 0, 8, 5, 0, 0, 0, 1, 0]
+board_pathological_2[8, :] = [0, 9, 0, 0, 0, 0, 4, 0, 0]
+board_pathological.append(board_pathological_2)
+
+# Board ID: Easter Monster
+board_pathological_3 = np.zeros((9, 9))
+board_pathological_3[0, :] = [1, 0, 0, 0, 0, 0, 0, 0, 2]
+board_pathological_3[1, :] = [0, 9, 0, 4, 0, 0, 0, 5, 0]
+board_pathological_3[2, :] = [0, 0, 6, 0, 0, 0, 7, 0, 0]
+board_pathological_3[3, :] = [0, 5, 0, 9, 0, 3, 0, 0, 0]
+board_pathological_3[4, :] = [0, 0, 0, 0, 7, 0, 0, 0, 0]
+board_pathological_3[5, :] = [0, 0, 0, 8, 5, 0, 0, 4, 0]
+board_pathological_3[6, :] = [7, 0, 0, 0, 0, 0, 6, 0, 0]
+board_pathological_3[7, :] = [0, 3, 0, 0, 0, 9, 0, 8, 0]
+board_pathological_3[8, :] = [0, 0, 2, 0, 0, 0, 0, 0, 1]
+board_pathological.append(board_pathological_3)
+
+# Board ID: AI Escargot
+board_pathological_4 = np.zeros((9, 9))
+board_pathological_4[0, :] = [1, 0, 0, 0, 0, 7, 0, 9, 0]
+board_pathological_4[1, :] = [0, 3, 0, 0, 2, 0, 0, 0, 8]
+board_pathological_4[2, :] = [0, 0, 9, 6, 0, 0, 5, 0, 0]
+board_pathological_4[3, :] = [0, 0, 5, 3, 0, 0, 9, 0, 0]
+board_pathological_4[4, :] = [0, 1, 0, 0, 8, 0, 0, 0, 2]
+board_pathological_4[5, :] = [6, 0, 0, 0, 0, 4, 0, 0, 0]
+board_pathological_4[6, :] = [3, 0, 0, 0, 0, 0, 0, 1, 0]
+board_pathological_4[7, :] = [0, 4, 0, 0, 0, 0, 0, 0, 7]
+board_pathological_4[8, :] = [0, 0, 7, 0, 0, 0, 3, 0, 0]
+board_pathological.append(board_pathological_4)